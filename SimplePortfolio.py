@@ -1,9 +1,30 @@
+from freqtrade.enums import RunMode
+from freqtrade.persistence import Trade
 from freqtrade.strategy import IStrategy
 from pandas import DataFrame
 import talib.abstract as ta
+import atexit
 import logging
+import os
+import sys
 import numpy as np
 
+# freqtrade loads strategies by file path; make the helper modules copied
+# alongside this file (see start.STRATEGY_SUPPORT_MODULES) importable
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import candle_ring
+import correlation
+import dca_engine
+import exchange_budget
+import health
+import informative
+import mem_watchdog
+import order_book_cache
+import strategy_params
+import strategy_state
+import trade_events
+
 logger = logging.getLogger(__name__)
 
 class SimplePortfolio(IStrategy):
@@ -27,6 +48,127 @@ class SimplePortfolio(IStrategy):
     position_adjustment_enable = True
     max_entry_position_adjustment = 12
     
+    # Per-pair candle window kept in preallocated ring buffers (matches fetchOHLCVLimit)
+    candle_window = 720
+    ring_indicators = ('rsi', 'ema_9', 'ema_21', 'volume_avg', 'price_change', 'low_5', 'low_20')
+    
+    # 1h/4h trend resampled from the 5m ring (timeframe -> EMA period), no extra downloads
+    informative_timeframes = informative.DEFAULT_TIMEFRAMES
+    use_trend_filter = False  # only enter while no higher timeframe closes below its EMA
+    
+    # Order books are refreshed once per cycle and shared by entry, exit and DCA pricing
+    order_book_ttl = 15
+    order_book_depth = 10
+    
+    # Ring/resampler state survives restarts (see strategy_state.py); seconds between saves
+    checkpoint_interval = 300
+    
+    # DCA ladder: (profit below, stake multiplier, log label), deepest loss first
+    dca_tiers = dca_engine.DEFAULT_TIERS
+    
+    # Open trades whose 24h of 5m returns correlate at least this much with a pair form its cluster;
+    # DCA adds stop once a cluster of several trades holds this share of the wallet (correlation.py)
+    correlation_threshold = 0.75
+    max_correlated_exposure = 0.4
+    
+    def __init__(self, config: dict) -> None:
+        super().__init__(config)
+        self.informative = informative.InformativeStore(self.informative_timeframes, self.timeframe)
+        self.candles = candle_ring.CandleStore(self.candle_window, self.ring_indicators + self.informative.columns)
+        self.order_books = order_book_cache.OrderBookCache(self.order_book_ttl, self.order_book_depth)
+        self.events = None  # trade event bus, started in bot_start for live/dry runs
+        self.heartbeat = None  # liveness file for healthcheck.sh and /health, live/dry runs only
+        self.checkpoint = None  # ring/resampler checkpoint, restored in bot_start for live/dry runs
+        self.param_watcher = None  # params file watcher (strategy_params.py), live/dry runs only
+        self.param_defaults = {}
+        self.correlation = None  # rolling return correlation, live/dry runs only
+        self.open_stakes = {}  # pair -> stake of its open trade, refreshed every cycle
+        self.pending_adds = {}  # trade id -> DCA stake just returned, priced by custom_entry_price
+        self.dca_decisions = {}  # trade id -> (low, high, entries, tier, multiplier), decided per cycle
+        self.set_dca_tiers(self.dca_tiers)
+    
+    def set_dca_tiers(self, tiers) -> None:
+        """Swap in a new DCA ladder, used from the next adjust_trade_position call"""
+        self.dca_ladder = dca_engine.DcaLadder(tiers, self.max_entry_position_adjustment + 1)
+        self.dca_tiers = tiers
+        self.dca_decisions = {}
+    
+    def bot_loop_start(self, current_time, **kwargs) -> None:
+        """Per-cycle housekeeping: params reload, ring retention, correlation, DCA decisions and order books"""
+        if self.param_watcher:
+            self.reload_params()
+        
+        open_trades = Trade.get_open_trades()
+        whitelist = self.dp.current_whitelist()
+        active_pairs = set(whitelist) | {trade.pair for trade in open_trades}
+        # Pairs that left the whitelist (and have no open trade) free their ring and cached row;
+        # pairs still listed after a whitelist reload keep theirs
+        for pair in self.candles.retain(active_pairs):
+            self.informative.drop(pair)
+            if self.heartbeat:
+                self.heartbeat.drop(pair)
+        
+        # Candles analyzed last cycle enter the correlation window: O(pairs²) per new candle
+        if self.correlation:
+            self.correlation.sync(self.candles, active_pairs)
+        self.open_stakes = {trade.pair: trade.stake_amount for trade in open_trades}
+        self.decide_dca(open_trades)
+        
+        # Depth snapshots are fetched by the pricing callbacks themselves, when an order is priced
+        self.order_books.retain(active_pairs)
+        # An add freqtrade did not place (rejected, below the minimum) was never priced
+        self.pending_adds.clear()
+        
+        if self.heartbeat:
+            self.heartbeat.beat()
+        if self.checkpoint:
+            self.checkpoint.maybe_save()
+    
+    def bot_start(self, **kwargs) -> None:
+        """Start the trade event writer, restore the last checkpoint and share Kraken's call counter"""
+        if self.dp and self.dp.runmode in (RunMode.LIVE, RunMode.DRY_RUN):
+            mem_watchdog.start_from_env('bot')  # MEM_WATCHDOG=1 only
+            self.events = trade_events.EventBus().start()
+            self.heartbeat = health.Heartbeat(timeframe_ms=informative.TIMEFRAME_MS[self.timeframe])
+            self.checkpoint = strategy_state.Checkpointer(self.candles, self.informative,
+                                                          interval=self.checkpoint_interval)
+            self.checkpoint.restore()
+            atexit.register(self.checkpoint.save)
+            self.correlation = correlation.RollingCorrelation(timeframe=self.timeframe)
+            self.param_watcher = strategy_params.ParamsWatcher(
+                quote=self.config['stake_currency'], max_entries=self.max_entry_position_adjustment + 1)
+            self.param_defaults = {'minimal_roi': dict(self.minimal_roi), 'stoploss': self.stoploss,
+                                   'dca_tiers': self.dca_tiers}
+            self.reload_params()
+        
+        # Trader calls take priority over the dashboard's
+        exchange = self.dp._exchange if self.dp else None
+        if exchange is None:
+            return
+        budget = exchange_budget.shared_budget()
+        for api in (exchange._api, exchange._api_async):
+            exchange_budget.install(api, budget, exchange_budget.PRIORITY_ORDER)
+            if self.heartbeat:
+                health.track_exchange(api, self.heartbeat)
+        logger.info(f"Kraken call budget shared via {budget.path}: {budget.snapshot()}")
+    
+    def reload_params(self) -> None:
+        """Apply the params file if it changed and validated; runs between cycles only"""
+        params = self.param_watcher.poll()
+        if params is None:
+            return
+        params = {**self.param_defaults, **params}
+        changed = [key for key in self.param_defaults if params[key] != getattr(self, key)]
+        self.minimal_roi = params['minimal_roi']
+        if params['stoploss'] != self.stoploss:
+            self.stoploss = params['stoploss']
+            # Open trades keep the stop they were opened with unless re-initialized, as on startup
+            Trade.stoploss_reinitialization(self.stoploss)
+        if params['dca_tiers'] != self.dca_tiers:
+            self.set_dca_tiers(params['dca_tiers'])
+        if changed:
+            logger.info(f"Strategy params reloaded from {self.param_watcher.path}: {', '.join(changed)}")
+    
     def populate_indicators(self, dataframe: DataFrame, metadata: dict) -> DataFrame:
         """Basic indicators"""
         dataframe['rsi'] = ta.RSI(dataframe, timeperiod=14)
@@ -36,8 +178,32 @@ class SimplePortfolio(IStrategy):
         dataframe['price_change'] = dataframe['close'].pct_change(periods=5) * 100
         dataframe['low_5'] = dataframe['low'].rolling(window=5).min()
         dataframe['low_20'] = dataframe['low'].rolling(window=20).min()
+        
+        # Mirror new candles into the pair's ring; callbacks read zero-copy views from it.
+        # A pair restored from the checkpoint only appends what it missed, if the candles agree
+        pair = metadata['pair']
+        if self.checkpoint:
+            self.checkpoint.verify(pair, dataframe)
+        if self.candles.sync(pair, dataframe) and self.checkpoint:
+            self.checkpoint.touch()
+        
+        # Higher timeframes only consume the new 5m candles; merging is a tail copy
+        ring = self.candles.ring(pair)
+        self.informative.update(pair, ring)
+        self.informative.merge(dataframe, ring)
+        if self.heartbeat:
+            self.heartbeat.candle(pair, ring.last_ts)
         return dataframe
     
+    def latest_row(self, pair: str):
+        """Latest analyzed candle of pair (CandleRow namedtuple), memoized per candle"""
+        return self.candles.latest(pair)
+    
+    def emit_event(self, kind: str, pair: str, trade_id=None, **data) -> None:
+        """Queue a trade event for the background writer (no I/O on this thread)"""
+        if self.events is not None:
+            self.events.emit(kind, pair, trade_id, **data)
+    
     def populate_entry_trend(self, dataframe: DataFrame, metadata: dict) -> DataFrame:
         """
         Set entry signal on LATEST candle only - FreqTrade only checks the last row
@@ -47,10 +213,16 @@ class SimplePortfolio(IStrategy):
         # Initialize entire column to 0
         dataframe['enter_long'] = 0
         
+        current_price = dataframe['close'].iloc[-1]
+        if self.use_trend_filter:
+            bearish = [tf for tf in self.informative_timeframes if dataframe[f'trend_{tf}'].iloc[-1] == 0]
+            if bearish:
+                logger.info(f"TREND FILTER: {pair} below {'/'.join(bearish)} EMA - no entry signal")
+                return dataframe
+        
         # Set signal ONLY on the last row (most recent candle)
         dataframe.loc[dataframe.index[-1], 'enter_long'] = 1
         
-        current_price = dataframe['close'].iloc[-1]
         logger.info(f"ENTRY SIGNAL: {pair} @ ${current_price:.4f} - Signal set on latest candle")
         
         return dataframe
@@ -70,6 +242,32 @@ class SimplePortfolio(IStrategy):
         
         return dataframe
     
+    def decide_dca(self, open_trades) -> None:
+        """One vectorized ladder lookup for every open trade, at the exit rate freqtrade last priced it at"""
+        trades, profits = [], []
+        for trade in open_trades:
+            rate = self.exit_rate(trade)
+            if rate:
+                trades.append(trade)
+                profits.append(trade.calc_profit_ratio(rate))
+        self.dca_decisions = {}
+        if not trades:
+            return
+        entries = [trade.nr_of_successful_entries for trade in trades]
+        tiers, multipliers = self.dca_ladder.decide(profits, entries)
+        for trade, count, tier, multiplier in zip(trades, entries, tiers.tolist(), multipliers.tolist()):
+            self.dca_decisions[trade.id] = (*self.dca_ladder.bounds(tier), count, tier, multiplier)
+    
+    def exit_rate(self, trade):
+        """freqtrade's cached exit rate in live/dry runs (the rate adjust_trade_position gets), else the last close"""
+        if self.dp and self.dp.runmode in (RunMode.LIVE, RunMode.DRY_RUN):
+            try:
+                return self.dp._exchange.get_rates(trade.pair, refresh=False, is_short=trade.is_short)[1]
+            except Exception as e:
+                logger.debug(f"No cached rate for {trade.pair}: {e}")
+        row = self.candles.latest(trade.pair)
+        return row.close if row else None
+    
     def adjust_trade_position(self, trade, current_time, current_rate, current_profit, 
                             min_stake, max_stake, **kwargs):
         """
@@ -77,30 +275,54 @@ class SimplePortfolio(IStrategy):
         """
         logger.info(f"DCA CHECK: {trade.pair} | Profit: {current_profit:.2%} | Entries: {trade.nr_of_successful_entries}")
         
-        if current_profit >= -0.01:  # DCA when down 1%+
-            return None
-        
-        # DCA amounts based on loss severity
-        if current_profit < -0.15:
-            additional_stake = min_stake * 3.0
-            logger.info(f"MASSIVE DCA: Adding ${additional_stake:.2f} to {trade.pair} (down {current_profit:.1%})")
-        elif current_profit < -0.10:
-            additional_stake = min_stake * 2.5
-            logger.info(f"BIG DCA: Adding ${additional_stake:.2f} to {trade.pair} (down {current_profit:.1%})")
-        elif current_profit < -0.06:
-            additional_stake = min_stake * 2.0
-            logger.info(f"MEDIUM DCA: Adding ${additional_stake:.2f} to {trade.pair} (down {current_profit:.1%})")
-        elif current_profit < -0.01:
-            additional_stake = min_stake * 1.0
-            logger.info(f"SMALL DCA: Adding ${additional_stake:.2f} to {trade.pair} (down {current_profit:.1%})")
+        # The cycle's batch decision holds while the live profit stays inside its tier's range;
+        # a trade that moved to another tier (or is new this cycle) is decided on its own
+        entries = trade.nr_of_successful_entries
+        decision = self.dca_decisions.get(trade.id)
+        if decision is not None and decision[0] <= current_profit < decision[1] and decision[2] == entries:
+            tier, multiplier = decision[3], decision[4]
         else:
+            tiers, multipliers = self.dca_ladder.decide([current_profit], [entries])
+            tier, multiplier = int(tiers[0]), float(multipliers[0])
+        label = self.dca_ladder.labels[tier]
+        
+        if label is None:  # DCA only when down past the shallowest tier
             return None
         
-        if trade.nr_of_successful_entries >= (self.max_entry_position_adjustment + 1):
+        if np.isnan(multiplier):
             logger.info(f"Max DCA entries reached for {trade.pair}")
             return None
         
-        return min(additional_stake, max_stake)
+        additional_stake = self.dca_ladder.stake(multiplier, min_stake, max_stake)
+        additional_stake = self.cap_correlated(trade.pair, additional_stake, min_stake)
+        if additional_stake is None:
+            return None
+        logger.info(f"{label} DCA: Adding ${additional_stake:.2f} to {trade.pair} (down {current_profit:.1%})")
+        self.emit_event('dca', trade.pair, trade.id, tier=label, stake=additional_stake, profit=current_profit,
+                        rate=current_rate, entries=trade.nr_of_successful_entries)
+        self.pending_adds[trade.id] = additional_stake
+        return additional_stake
+    
+    def cap_correlated(self, pair: str, stake, min_stake):
+        """Shrink or skip a DCA add that would push pair's correlated cluster past its wallet share"""
+        if stake is None or self.correlation is None or self.wallets is None:
+            return stake
+        cluster = self.correlation.cluster(pair, self.open_stakes, self.correlation_threshold)
+        if len(cluster) > 1:
+            exposure = sum(self.open_stakes.get(p, 0.0) for p in cluster)
+            room = self.max_correlated_exposure * self.wallets.get_total_stake_amount() - exposure
+            if stake > room:
+                peers = ', '.join(p for p in cluster if p != pair)
+                if room <= 0 or room < (min_stake or 0):
+                    logger.info(f"CORRELATION CAP: no DCA for {pair}, correlated with {peers} "
+                                f"(${exposure:.2f} open)")
+                    return None
+                logger.info(f"CORRELATION CAP: {pair} DCA cut to ${room:.2f} from ${stake:.2f}, "
+                            f"correlated with {peers}")
+                stake = room
+        # Later adds this cycle see this one
+        self.open_stakes[pair] = self.open_stakes.get(pair, 0.0) + stake
+        return stake
     
     def custom_stake_amount(self, pair: str, current_time, current_rate: float,
                           proposed_stake: float, min_stake: float, max_stake: float,
@@ -109,20 +331,39 @@ class SimplePortfolio(IStrategy):
         logger.info(f"STAKE: {pair} using full ${proposed_stake:.2f}")
         return proposed_stake
     
+    def book_exchange(self):
+        """Exchange for order book fetches; None outside live/dry runs, where pricing keeps freqtrade's rate"""
+        if self.dp and self.dp.runmode in (RunMode.LIVE, RunMode.DRY_RUN):
+            return self.dp._exchange
+        return None
+    
+    def custom_entry_price(self, pair: str, trade, current_time, proposed_rate: float,
+                          entry_tag, side: str, **kwargs) -> float:
+        """Price entries and DCA adds at the ask level that fills their actual stake"""
+        # freqtrade prices a DCA add right after adjust_trade_position returned its stake
+        stake = self.pending_adds.pop(trade.id, None) if trade is not None else None
+        if stake is None:
+            stake = self.config.get('stake_amount')
+        amount = stake / proposed_rate if isinstance(stake, (int, float)) and proposed_rate else 0.0
+        rate = self.order_books.price_for(self.book_exchange(), pair, 'buy', amount)
+        return rate if rate is not None else proposed_rate
+    
     def custom_exit_price(self, pair: str, trade, current_time, proposed_rate: float,
                          current_profit: float, **kwargs) -> float:
-        """Sell when profitable"""
+        """Sell when profitable, priced at the bid level that fills the whole position"""
+        rate = self.order_books.price_for(self.book_exchange(), pair, 'sell', trade.amount)
+        rate = rate if rate is not None else proposed_rate
         if current_profit > 0.02:
-            logger.info(f"TAKING PROFIT: {pair} up {current_profit:.1%} - selling at market")
-            return proposed_rate
+            logger.info(f"TAKING PROFIT: {pair} up {current_profit:.1%} - selling at {rate:.4f}")
         
-        return proposed_rate
+        return rate
     
     def confirm_trade_entry(self, pair: str, order_type: str, amount: float, rate: float,
                           time_in_force: str, current_time, entry_tag, **kwargs) -> bool:
         """Log entries"""
         trade_value = amount * rate
         logger.info(f"BUY CONFIRMED: {pair} | {amount:.4f} @ ${rate:.4f} = ${trade_value:.2f}")
+        self.emit_event('entry', pair, amount=amount, rate=rate, value=trade_value, order_type=order_type)
         return True
     
     def confirm_trade_exit(self, pair: str, trade, order_type: str, amount: float, 
@@ -131,14 +372,23 @@ class SimplePortfolio(IStrategy):
         """Log exits"""
         profit_pct = trade.calc_profit_ratio(rate) * 100
         profit_usd = trade.calc_profit(rate)
+        row = self.latest_row(pair)
+        context = f" | {exit_reason} RSI {row.rsi:.1f}" if row is not None else f" | {exit_reason}"
         
         if profit_pct > 0:
-            logger.info(f"PROFIT: {pair} | SOLD {amount:.4f} @ ${rate:.4f} | +{profit_pct:.2f}% (+${profit_usd:.2f})")
+            logger.info(f"PROFIT: {pair} | SOLD {amount:.4f} @ ${rate:.4f} | +{profit_pct:.2f}% (+${profit_usd:.2f}){context}")
         else:
-            logger.info(f"LOSS: {pair} | SOLD {amount:.4f} @ ${rate:.4f} | {profit_pct:.2f}% (${profit_usd:.2f})")
+            logger.info(f"LOSS: {pair} | SOLD {amount:.4f} @ ${rate:.4f} | {profit_pct:.2f}% (${profit_usd:.2f}){context}")
         
+        self.emit_event('exit', pair, trade.id, amount=amount, rate=rate, profit_pct=profit_pct,
+                        profit_usd=profit_usd, reason=exit_reason, entries=trade.nr_of_successful_entries)
         return True
     
+    def order_filled(self, pair: str, trade, order, current_time, **kwargs) -> None:
+        """Record fills (entries, DCA adds and exits) as events"""
+        self.emit_event('fill', pair, trade.id, side=order.ft_order_side, amount=order.safe_filled,
+                        price=order.safe_price, cost=order.safe_cost, fee=order.safe_fee_base)
+    
     def leverage(self, pair: str, current_time, current_rate: float,
                 proposed_leverage: float, max_leverage: float, entry_tag: str, 
                 side: str, **kwargs) -> float:
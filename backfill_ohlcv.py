@@ -0,0 +1,355 @@
+#!/usr/bin/env python3
+"""
+Rebuild deep OHLCV history for the whitelist from Kraken's trade history.
+
+Kraken's OHLC endpoint only returns the newest 720 candles, but its public
+Trades endpoint pages through the full history with a nanosecond `since`
+cursor. Each pair is backfilled in its own worker thread; all workers share
+one public-call rate limiter (BACKFILL_RATE calls/s, Kraken allows about one
+per second per IP), so more pairs overlap request latency without going over
+the limit.
+
+Trades are folded into candles as each page arrives and never kept beyond
+it. Every flush appends the newly closed candles to a `<datafile>.part`
+spool (one JSON row per line) and checkpoints the pair's cursor and
+still-open candle, so an interrupted run resumes where it stopped and I/O
+stays linear in the candles written. When a pair's run ends the spool is
+merged into the data file in freqtrade's layout and format
+(`dataformat_ohlcv`) in one write; a spool left by a killed run is merged
+on the next start. A checkpoint is only trusted while the data file still
+holds the candles it recorded, so a wiped data directory starts over
+instead of resuming past the missing history. Candles already in a data
+file are never written twice. Buckets without trades are skipped;
+freqtrade fills those gaps on load.
+
+    python backfill_ohlcv.py --days 90                  # whole whitelist
+    python backfill_ohlcv.py --pairs BTC/USD,ETH/USD --days 365
+    python backfill_ohlcv.py --reset                     # ignore saved checkpoints
+
+start.py clears user_data/data on every launch; set CLEAR_DATA_CACHE=0 to
+keep backfilled history.
+"""
+import argparse
+import gzip
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import kraken_stub
+import pair_scanner
+from informative import TIMEFRAME_MS
+from roi_simulator import pair_filename
+
+DATADIR = 'user_data/data/kraken'
+CHECKPOINT_FILE = 'user_data/backfill_checkpoint.json'
+RATE = float(os.getenv('BACKFILL_RATE', '1.0'))
+MAX_RETRIES = 8
+
+
+def write_json(path, data, fmt='json'):
+    """Write atomically: an interrupted run never leaves a truncated file behind"""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp = f"{path}.tmp"
+    opener = gzip.open if fmt == 'jsongz' else open
+    with opener(tmp, 'wt') as f:
+        json.dump(data, f)
+    os.replace(tmp, path)
+
+
+def read_json(path, fmt='json', default=None):
+    opener = gzip.open if fmt == 'jsongz' else open
+    try:
+        with opener(path, 'rt') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return default
+
+
+def client():
+    """Public-only ccxt client; pacing is left to the shared RateLimiter"""
+    import ccxt
+    return ccxt.kraken({'enableRateLimit': False, 'timeout': 30000, **kraken_stub.stub_ccxt_overrides()})
+
+
+class RateLimiter:
+    """Evenly spaced call slots shared by all worker threads"""
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate
+        self.next_slot = 0.0
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        with self.lock:
+            now = time.monotonic()
+            slot = max(self.next_slot, now)
+            self.next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+class CandleAggregator:
+    """Trades -> [ms, open, high, low, close, volume] candles, one bucket open at a time"""
+
+    def __init__(self, period_ms, candle=None):
+        self.period = period_ms
+        self.candle = candle   # the forming candle, restored from a checkpoint
+
+    def add(self, ts_ms, price, volume):
+        """Fold one trade in; returns the candle it closed, if any"""
+        bucket = ts_ms - ts_ms % self.period
+        candle = self.candle
+        if candle is not None and bucket == candle[0]:
+            if price > candle[2]:
+                candle[2] = price
+            if price < candle[3]:
+                candle[3] = price
+            candle[4] = price
+            candle[5] += volume
+            return None
+        self.candle = [bucket, price, price, price, price, volume]
+        return candle
+
+    def close_until(self, end_ms):
+        """The forming candle if its bucket ends by `end_ms`"""
+        candle = self.candle
+        if candle is not None and candle[0] + self.period <= end_ms:
+            self.candle = None
+            return candle
+        return None
+
+
+class Checkpoints:
+    """Cursor and forming candle per data file, shared by the workers"""
+
+    def __init__(self, path=CHECKPOINT_FILE):
+        self.path = path
+        self.data = read_json(path, default={})
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            return self.data.get(key)
+
+    def save(self, key, entry):
+        with self.lock:
+            self.data[key] = entry
+            write_json(self.path, self.data)
+
+    def drop(self, key):
+        with self.lock:
+            if self.data.pop(key, None) is not None:
+                write_json(self.path, self.data)
+
+
+class PairBackfill:
+    def __init__(self, pair, market_id, since_ms, end_ms, timeframe='5m', datadir=DATADIR, fmt='json',
+                 checkpoints=None, limiter=None, flush_pages=20):
+        self.pair = pair
+        self.market_id = market_id
+        self.end_ms = end_ms
+        self.timeframe = timeframe
+        self.period = TIMEFRAME_MS[timeframe]
+        self.fmt = fmt
+        self.path = os.path.join(datadir, pair_filename(pair, timeframe, fmt))
+        self.key = self.path
+        self.checkpoints = checkpoints or Checkpoints()
+        self.limiter = limiter or RateLimiter(RATE)
+        self.flush_pages = flush_pages
+        self.spool = f"{self.path}.part"
+        self.rows = read_json(self.path, fmt, default=[])
+        self.merged = len(self.rows)     # rows in the data file
+        self.read_spool()
+        self.written = len(self.rows)    # rows in the data file or the spool
+        self.pages = 0
+        self.trades = 0
+
+        state = self.checkpoints.get(self.key)
+        if state is not None and state.get('candles', 0) > len(self.rows):
+            print(f"⚠️ {pair}: {self.path} holds fewer candles than its checkpoint, starting over")
+            state = None
+        if state is not None:
+            self.cursor = state['cursor']
+            self.aggregator = CandleAggregator(self.period, state['candle'])
+        else:
+            # Continue after the last stored candle, never earlier than asked for
+            start = max(since_ms, self.rows[-1][0] + self.period) if self.rows else since_ms
+            self.cursor = str(int(start) * 1_000_000)
+            self.aggregator = CandleAggregator(self.period)
+
+    def read_spool(self):
+        try:
+            with open(self.spool) as f:
+                for line in f:
+                    try:
+                        self.append(json.loads(line))
+                    except ValueError:
+                        break   # torn last line of a killed run
+        except FileNotFoundError:
+            pass
+
+    def merge(self):
+        """Write data file plus spool as the data file, once per run"""
+        if len(self.rows) > self.merged:
+            write_json(self.path, self.rows, self.fmt)
+            self.merged = len(self.rows)
+        if os.path.exists(self.spool):
+            os.remove(self.spool)
+
+    def last_ms(self):
+        return self.rows[-1][0] if self.rows else None
+
+    def append(self, candle):
+        if candle is not None and (not self.rows or candle[0] > self.rows[-1][0]):
+            self.rows.append(candle)
+
+    def fetch_page(self, exchange):
+        """(trades, next cursor) for one Trades call, retrying transient errors"""
+        import ccxt
+        for attempt in range(MAX_RETRIES):
+            self.limiter.acquire()
+            try:
+                result = exchange.publicGetTrades({'pair': self.market_id, 'since': self.cursor})['result']
+                break
+            except ccxt.NetworkError as e:   # includes rate limits, timeouts, exchange unavailable
+                if attempt == MAX_RETRIES - 1:
+                    raise
+                delay = min(60, 2 ** attempt)
+                print(f"⚠️ {self.pair}: {type(e).__name__}, retrying in {delay}s")
+                time.sleep(delay)
+        last = result.pop('last')
+        trades = next(iter(result.values()), [])
+        return trades, str(last)
+
+    def flush(self, done=False):
+        if len(self.rows) > self.written:
+            os.makedirs(os.path.dirname(self.spool) or '.', exist_ok=True)
+            with open(self.spool, 'a') as f:
+                f.writelines(json.dumps(row) + '\n' for row in self.rows[self.written:])
+            self.written = len(self.rows)
+        self.checkpoints.save(self.key, {'cursor': self.cursor, 'candle': self.aggregator.candle,
+                                         'done': done, 'candles': len(self.rows)})
+
+    def run(self, exchange, stop=None):
+        """Page through trades up to end_ms; returns a summary dict"""
+        started = time.monotonic()
+        done = False
+        try:
+            while not done:
+                if stop is not None and stop.is_set():
+                    raise KeyboardInterrupt
+                trades, cursor = self.fetch_page(exchange)
+                self.pages += 1
+                for trade in trades:
+                    ts_ms = int(float(trade[2]) * 1000)
+                    if ts_ms >= self.end_ms:
+                        # Resume at end_ms next run: the rest of this page is not consumed yet
+                        cursor = str(self.end_ms * 1_000_000)
+                        done = True
+                        break
+                    self.append(self.aggregator.add(ts_ms, float(trade[0]), float(trade[1])))
+                    self.trades += 1
+                # An empty page or a cursor that stops moving means we reached the present
+                if not trades or cursor == self.cursor:
+                    done = True
+                self.cursor = cursor
+                if done:
+                    self.append(self.aggregator.close_until(self.end_ms))
+                elif self.pages % self.flush_pages == 0:
+                    self.flush()
+                    print(f"   {self.pair}: {self.pages} pages, candles up to {self.progress()}")
+        finally:
+            self.flush(done=done)
+            self.merge()
+        return {'pair': self.pair, 'pages': self.pages, 'trades': self.trades, 'candles': len(self.rows),
+                'seconds': round(time.monotonic() - started, 1)}
+
+    def progress(self):
+        last = self.last_ms()
+        return time.strftime('%Y-%m-%d %H:%M', time.gmtime(last / 1000)) if last else '-'
+
+
+def load_markets(exchange):
+    import ccxt
+    for attempt in range(MAX_RETRIES):
+        try:
+            return exchange.load_markets()
+        except ccxt.NetworkError:
+            if attempt == MAX_RETRIES - 1:
+                raise
+            time.sleep(min(60, 2 ** attempt))
+
+
+def main():
+    from start import get_config_template
+
+    config = get_config_template()
+    parser = argparse.ArgumentParser(description="Backfill OHLCV history from Kraken trades")
+    parser.add_argument('--pairs', help="comma separated pairs (default: the bot's whitelist)")
+    parser.add_argument('--days', type=float, default=30, help="history to build for pairs without data")
+    parser.add_argument('--timeframe', default='5m', choices=sorted(TIMEFRAME_MS))
+    parser.add_argument('--datadir', default=DATADIR)
+    parser.add_argument('--format', default=config['dataformat_ohlcv'], choices=('json', 'jsongz'))
+    parser.add_argument('--checkpoint', default=CHECKPOINT_FILE)
+    parser.add_argument('--workers', type=int, help="concurrent pairs (default: all)")
+    parser.add_argument('--rate', type=float, default=RATE, help="public calls per second, shared by all pairs")
+    parser.add_argument('--reset', action='store_true', help="ignore saved checkpoints for these pairs")
+    args = parser.parse_args()
+
+    whitelist = config['exchange']['pair_whitelist']
+    if pair_scanner.dynamic_enabled():
+        whitelist = pair_scanner.read_pairs(default=whitelist)
+    pairs = args.pairs.split(',') if args.pairs else whitelist
+
+    exchange = client()
+    load_markets(exchange)
+    unknown = [pair for pair in pairs if pair not in exchange.markets]
+    if unknown:
+        print(f"⚠️ Skipping pairs Kraken does not list: {', '.join(unknown)}")
+        pairs = [pair for pair in pairs if pair not in unknown]
+
+    period = TIMEFRAME_MS[args.timeframe]
+    now_ms = int(time.time() * 1000)
+    end_ms = now_ms - now_ms % period   # only candles that have closed
+    since_ms = end_ms - int(args.days * 86_400_000) // period * period
+    checkpoints = Checkpoints(args.checkpoint)
+    limiter = RateLimiter(args.rate)
+    jobs = []
+    for pair in pairs:
+        if args.reset:
+            checkpoints.drop(os.path.join(args.datadir, pair_filename(pair, args.timeframe, args.format)))
+        jobs.append(PairBackfill(pair, exchange.markets[pair]['id'], since_ms, end_ms, args.timeframe,
+                                 args.datadir, args.format, checkpoints, limiter))
+
+    print(f"📥 Backfilling {len(jobs)} pairs to {args.datadir} ({args.timeframe}, {args.format}) "
+          f"at {args.rate:g} calls/s...")
+    started = time.monotonic()
+    failed = []
+    stop = threading.Event()
+    with ThreadPoolExecutor(max_workers=args.workers or len(jobs) or 1) as pool:
+        futures = {pool.submit(job.run, client(), stop): job for job in jobs}
+        try:
+            for future in as_completed(futures):
+                job = futures[future]
+                try:
+                    summary = future.result()
+                except Exception as e:
+                    failed.append(job.pair)
+                    print(f"❌ {job.pair}: {e} (progress checkpointed, rerun to resume)")
+                    continue
+                print(f"✅ {summary['pair']}: {summary['trades']} trades in {summary['pages']} pages -> "
+                      f"{summary['candles']} candles ({summary['seconds']}s)")
+        except KeyboardInterrupt:
+            # Workers checkpoint after their current page; rerunning resumes from there
+            print("\n🛑 Interrupted, checkpointing...")
+            stop.set()
+            for future in futures:
+                future.cancel()
+            return
+    print(f"⏱️ Done in {time.monotonic() - started:.1f}s" + (f", failed: {', '.join(failed)}" if failed else ""))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Memory and append cost of candle ring buffers vs. per-pair DataFrames.
+
+For each pair count, builds a 720-candle window with the benchmark's
+indicator columns both ways and then appends new candles:
+
+  * DataFrame: concat the new row, trim to the window, re-add indicator
+    columns. This is a model for comparing append styles. freqtrade does
+    not work this way: it rebuilds its frame from its own OHLCV cache each
+    candle, whether or not the strategy keeps rings.
+  * CandleRing: one O(1) append plus indicator slot writes
+
+The memory columns are not alternatives. freqtrade's frame exists either
+way, and the rings are added on top of it (the strategy's rings also carry
+the informative columns, so they are larger than the ones here).
+
+    python bench_candles.py --pairs 11,100,500 --appends 50
+"""
+import argparse
+import json
+import time
+
+import numpy as np
+import pandas as pd
+
+from candle_ring import CandleStore
+
+WINDOW = 720
+INDICATORS = ('rsi', 'ema_9', 'ema_21', 'volume_avg', 'price_change', 'low_5', 'low_20')
+
+
+def random_frame(rng, n):
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.002, n)))
+    frame = pd.DataFrame({
+        'date': pd.date_range('2024-01-01', periods=n, freq='5min', tz='UTC'),
+        'open': close * (1 + rng.normal(0, 0.001, n)),
+        'high': close * 1.002,
+        'low': close * 0.998,
+        'close': close,
+        'volume': rng.uniform(10, 100, n),
+    })
+    for name in INDICATORS:
+        frame[name] = rng.normal(0, 1, n)
+    return frame
+
+
+def frame_append(frame, row):
+    """Append one candle the DataFrame way and rebuild the indicator columns"""
+    frame = pd.concat([frame[list(row)], pd.DataFrame([row])], ignore_index=True).tail(WINDOW)
+    frame = frame.reset_index(drop=True)
+    for name in INDICATORS:
+        frame[name] = frame['close'].to_numpy()
+    return frame
+
+
+def bench(pair_count, appends, seed):
+    rng = np.random.default_rng(seed)
+    frames = {f'P{i}/USD': random_frame(rng, WINDOW) for i in range(pair_count)}
+    store = CandleStore(WINDOW, INDICATORS)
+    for pair, frame in frames.items():
+        store.sync(pair, frame)
+
+    frame_bytes = sum(int(f.memory_usage(deep=True).sum()) for f in frames.values())
+    ring_bytes = store.nbytes
+
+    rows = []
+    for step in range(appends):
+        ts = frames['P0/USD']['date'].iloc[-1] + pd.Timedelta(minutes=5 * (step + 1))
+        price = float(rng.uniform(90, 110))
+        rows.append({'date': ts, 'open': price, 'high': price * 1.001,
+                     'low': price * 0.999, 'close': price, 'volume': 50.0})
+
+    started = time.perf_counter()
+    for row in rows:
+        for pair in frames:
+            frames[pair] = frame_append(frames[pair], row)
+    frame_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    indicator_values = np.zeros(1)
+    for row in rows:
+        ts_ms = int(row['date'].value // 1_000_000)
+        for pair in frames:
+            ring = store.ring(pair)
+            ring.append(ts_ms, row['open'], row['high'], row['low'], row['close'], row['volume'])
+            indicator_values[0] = row['close']
+            for name in INDICATORS:
+                ring.set_latest(name, indicator_values)
+    ring_seconds = time.perf_counter() - started
+
+    operations = appends * pair_count
+    return {
+        'pairs': pair_count,
+        'frame_bytes_per_pair': frame_bytes // pair_count,
+        'ring_bytes_per_pair': ring_bytes // pair_count,
+        'frame_append_us': round(frame_seconds / operations * 1e6, 2),
+        'ring_append_us': round(ring_seconds / operations * 1e6, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Candle ring buffer vs DataFrame benchmark")
+    parser.add_argument('--pairs', default='11,100,500')
+    parser.add_argument('--appends', type=int, default=50, help="candles appended per pair")
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--output', help="write results as JSON")
+    args = parser.parse_args()
+
+    results = [bench(int(n), args.appends, args.seed) for n in args.pairs.split(',')]
+    print(f"{'pairs':>6}{'DataFrame KiB/pair':>20}{'ring KiB/pair':>15}"
+          f"{'DataFrame append us':>21}{'ring append us':>16}")
+    for r in results:
+        print(f"{r['pairs']:>6}{r['frame_bytes_per_pair'] / 1024:>20.1f}{r['ring_bytes_per_pair'] / 1024:>15.1f}"
+              f"{r['frame_append_us']:>21}{r['ring_append_us']:>16}")
+    print("Ring memory is in addition to freqtrade's own per-pair frames, not instead of them.")
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
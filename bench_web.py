@@ -0,0 +1,334 @@
+#!/usr/bin/env python3
+"""
+Load-testing benchmark for the dashboard web server.
+
+Starts web_server.py against a local Kraken stub (kraken_stub.py), drives the
+public routes at a fixed concurrency and reports throughput, p50/p95/p99
+latency per route, and the thread count and RSS of the server's process tree
+(pre-forked workers included) over time. Results are saved as JSON so runs
+can be compared across server modes and commits:
+
+    python bench_web.py --concurrency 32 --duration 30 --mode threaded
+    python bench_web.py --server-env WEB_WORKERS=4 --client-procs 4 --mode prefork4
+    python bench_web.py --compare bench_results/a.json bench_results/b.json
+"""
+import argparse
+import http.client
+import json
+import math
+import multiprocessing
+import os
+import subprocess
+import sys
+import threading
+import time
+from urllib.parse import urlparse
+
+import kraken_stub
+
+DEFAULT_PATHS = ['/', '/styles.css', '/script.js', '/api/stats', '/health']
+RESULTS_DIR = 'bench_results'
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    # ceil(pct/100 * N) - 1, multiplied first: 7 / 100 * 100 is 7.000000000000001
+    rank = max(0, min(len(sorted_values) - 1, math.ceil(pct * len(sorted_values) / 100) - 1))
+    return sorted_values[rank]
+
+
+def read_proc_status(pid):
+    """Thread count and RSS (KiB) of a Linux process, or (None, None)"""
+    try:
+        with open(f'/proc/{pid}/status') as f:
+            fields = dict(line.split(':', 1) for line in f if ':' in line)
+        return int(fields['Threads']), int(fields['VmRSS'].split()[0])
+    except (OSError, KeyError, ValueError):
+        return None, None
+
+
+def process_tree(pid):
+    """pid and all of its descendants"""
+    pids, pending = [], [pid]
+    while pending:
+        current = pending.pop()
+        pids.append(current)
+        try:
+            for task in os.listdir(f'/proc/{current}/task'):
+                with open(f'/proc/{current}/task/{task}/children') as f:
+                    pending.extend(int(child) for child in f.read().split())
+        except OSError:
+            pass
+    return pids
+
+
+def read_tree_status(pid):
+    """(processes, threads, RSS KiB) summed over a process tree, or (None, None, None)"""
+    processes = threads = rss_kb = 0
+    for member in process_tree(pid):
+        member_threads, member_rss = read_proc_status(member)
+        if member_threads is not None:
+            processes += 1
+            threads += member_threads
+            rss_kb += member_rss
+    if not processes:
+        return None, None, None
+    return processes, threads, rss_kb
+
+
+class ProcessSampler(threading.Thread):
+    """Samples process, thread count and RSS of the server process tree at a fixed interval"""
+
+    def __init__(self, pid, interval):
+        super().__init__(daemon=True)
+        self.pid = pid
+        self.interval = interval
+        self.samples = []
+        self.stopped = threading.Event()
+
+    def run(self):
+        start = time.monotonic()
+        while not self.stopped.is_set():
+            processes, threads, rss_kb = read_tree_status(self.pid)
+            if threads is not None:
+                self.samples.append({'t': round(time.monotonic() - start, 2), 'processes': processes,
+                                     'threads': threads, 'rss_kb': rss_kb})
+            self.stopped.wait(self.interval)
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+
+
+def run_load(base_url, paths, concurrency, duration, timeout):
+    """Closed-loop load: each worker requests the next path as soon as the last returns"""
+    target = urlparse(base_url)
+    latencies = {path: [] for path in paths}
+    statuses = {path: {} for path in paths}
+    errors = {path: 0 for path in paths}
+    lock = threading.Lock()
+    deadline = time.monotonic() + duration
+
+    def worker(offset):
+        i = offset
+        while time.monotonic() < deadline:
+            path = paths[i % len(paths)]
+            i += 1
+            started = time.perf_counter()
+            try:
+                conn = http.client.HTTPConnection(target.hostname, target.port, timeout=timeout)
+                conn.request('GET', path)
+                response = conn.getresponse()
+                response.read()
+                conn.close()
+                elapsed = time.perf_counter() - started
+                with lock:
+                    latencies[path].append(elapsed)
+                    statuses[path][response.status] = statuses[path].get(response.status, 0) + 1
+            except Exception:
+                with lock:
+                    errors[path] += 1
+
+    workers = [threading.Thread(target=worker, args=(n,), daemon=True) for n in range(concurrency)]
+    started = time.monotonic()
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    return latencies, statuses, errors, time.monotonic() - started
+
+
+def run_load_processes(base_url, paths, concurrency, duration, timeout, client_procs):
+    """run_load split over `client_procs` processes so the client is not GIL-bound; results merged"""
+    if client_procs <= 1:
+        return run_load(base_url, paths, concurrency, duration, timeout)
+    shares = [concurrency // client_procs + (n < concurrency % client_procs) for n in range(client_procs)]
+    with multiprocessing.Pool(client_procs) as pool:
+        parts = pool.starmap(run_load, [(base_url, paths, share, duration, timeout) for share in shares if share])
+    latencies = {path: [] for path in paths}
+    statuses = {path: {} for path in paths}
+    errors = {path: 0 for path in paths}
+    for part_latencies, part_statuses, part_errors, _ in parts:
+        for path in paths:
+            latencies[path].extend(part_latencies[path])
+            errors[path] += part_errors[path]
+            for status, count in part_statuses[path].items():
+                statuses[path][status] = statuses[path].get(status, 0) + count
+    return latencies, statuses, errors, max(part[3] for part in parts)
+
+
+def summarize(latencies, statuses, errors, elapsed):
+    routes = {}
+    total = 0
+    for path, values in latencies.items():
+        values.sort()
+        total += len(values)
+        routes[path] = {
+            'requests': len(values),
+            'errors': errors[path],
+            'status': {str(k): v for k, v in statuses[path].items()},
+            'rps': round(len(values) / elapsed, 1),
+            'p50_ms': round(percentile(values, 50) * 1000, 2) if values else None,
+            'p95_ms': round(percentile(values, 95) * 1000, 2) if values else None,
+            'p99_ms': round(percentile(values, 99) * 1000, 2) if values else None,
+            'max_ms': round(values[-1] * 1000, 2) if values else None,
+        }
+    return {'requests': total, 'errors': sum(errors.values()),
+            'rps': round(total / elapsed, 1), 'elapsed_s': round(elapsed, 2), 'routes': routes}
+
+
+def wait_for_server(base_url, timeout=20):
+    target = urlparse(base_url)
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            conn = http.client.HTTPConnection(target.hostname, target.port, timeout=1)
+            conn.request('GET', '/health')
+            conn.getresponse().read()
+            conn.close()
+            return True
+        except OSError:
+            time.sleep(0.2)
+    return False
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'],
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def start_server(port, stub_url, extra_env):
+    env = dict(os.environ)
+    env.update({'PORT': str(port), 'KRAKEN_STUB_URL': stub_url, 'START_FREQTRADE': '0'})
+    env.update(extra_env)
+    return subprocess.Popen([sys.executable, 'web_server.py'], env=env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def print_summary(result):
+    summary = result['summary']
+    print(f"📊 {result['mode']} @ {result['commit']} | concurrency {result['concurrency']} | "
+          f"{summary['requests']} requests in {summary['elapsed_s']}s = {summary['rps']} req/s, "
+          f"{summary['errors']} errors")
+    print(f"   {'route':<14}{'req/s':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'errors':>8}")
+    for path, route in summary['routes'].items():
+        print(f"   {path:<14}{route['rps']:>9}{str(route['p50_ms']):>10}"
+              f"{str(route['p95_ms']):>10}{str(route['p99_ms']):>10}{route['errors']:>8}")
+    process = result.get('process')
+    if process:
+        print(f"   processes max {process.get('processes_max')} | threads: start {process['threads_start']} / max {process['threads_max']} / "
+              f"end {process['threads_end']} | RSS KiB: start {process['rss_kb_start']} / "
+              f"max {process['rss_kb_max']} / end {process['rss_kb_end']}")
+
+
+def compare(paths):
+    results = [json.load(open(p)) for p in paths]
+    base = results[0]
+    print(f"{'run':<40}{'req/s':>9}{'p99 /api/stats':>16}{'threads max':>13}{'RSS max KiB':>13}")
+    for path, result in zip(paths, results):
+        stats_route = result['summary']['routes'].get('/api/stats', {})
+        process = result.get('process') or {}
+        delta = ''
+        if result is not base and base['summary']['rps']:
+            delta = f" ({(result['summary']['rps'] / base['summary']['rps'] - 1) * 100:+.1f}%)"
+        print(f"{os.path.basename(path):<40}{result['summary']['rps']:>9}{delta}"
+              f"{str(stats_route.get('p99_ms')):>16}{str(process.get('threads_max')):>13}"
+              f"{str(process.get('rss_kb_max')):>13}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the dashboard web server")
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--duration', type=float, default=15.0, help="seconds of load")
+    parser.add_argument('--paths', default=','.join(DEFAULT_PATHS), help="comma separated routes")
+    parser.add_argument('--client-procs', type=int, default=1,
+                        help="load generator processes sharing the concurrency")
+    parser.add_argument('--port', type=int, default=8089, help="port for the spawned server")
+    parser.add_argument('--url', help="benchmark an already running server instead of spawning one")
+    parser.add_argument('--pid', type=int, help="pid to sample when using --url")
+    parser.add_argument('--mode', default='threaded', help="label for the server mode under test")
+    parser.add_argument('--server-env', action='append', default=[], metavar='KEY=VALUE',
+                        help="extra environment for the spawned server (selects server mode)")
+    parser.add_argument('--stub-latency-ms', type=float, default=50.0, help="Kraken stub latency")
+    parser.add_argument('--stub-error-rate', type=float, default=0.0)
+    parser.add_argument('--sample-interval', type=float, default=0.5)
+    parser.add_argument('--timeout', type=float, default=30.0, help="per request timeout")
+    parser.add_argument('--output', help="result file (default bench_results/<mode>-<commit>-<time>.json)")
+    parser.add_argument('--compare', nargs='+', metavar='RESULT', help="compare saved result files")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(args.compare)
+        return
+
+    paths = [p.strip() for p in args.paths.split(',') if p.strip()]
+    stub = kraken_stub.start_stub(config=kraken_stub.StubConfig(
+        latency_ms=args.stub_latency_ms, error_rate=args.stub_error_rate, counter_max=1e9))
+    server = None
+    base_url = args.url
+    pid = args.pid
+    if not base_url:
+        extra_env = dict(item.split('=', 1) for item in args.server_env)
+        server = start_server(args.port, stub.url, extra_env)
+        base_url = f'http://127.0.0.1:{args.port}'
+        pid = server.pid
+
+    try:
+        if not wait_for_server(base_url):
+            print(f"❌ Server at {base_url} did not come up")
+            sys.exit(1)
+        sampler = ProcessSampler(pid, args.sample_interval) if pid else None
+        if sampler:
+            sampler.start()
+        print(f"🚀 Driving {base_url} at concurrency {args.concurrency} for {args.duration}s...")
+        latencies, statuses, errors, elapsed = run_load_processes(base_url, paths, args.concurrency,
+                                                                  args.duration, args.timeout,
+                                                                  args.client_procs)
+        if sampler:
+            sampler.stop()
+    finally:
+        if server:
+            server.terminate()
+            server.wait()
+        stub.shutdown()
+
+    result = {
+        'mode': args.mode,
+        'commit': git_commit(),
+        'timestamp': int(time.time()),
+        'concurrency': args.concurrency,
+        'client_procs': args.client_procs,
+        'duration_s': args.duration,
+        'paths': paths,
+        'stub': {'latency_ms': args.stub_latency_ms, 'error_rate': args.stub_error_rate},
+        'server_env': args.server_env,
+        'summary': summarize(latencies, statuses, errors, elapsed),
+        'process': None,
+        'samples': sampler.samples if sampler else [],
+    }
+    if sampler and sampler.samples:
+        threads = [s['threads'] for s in sampler.samples]
+        rss = [s['rss_kb'] for s in sampler.samples]
+        result['process'] = {
+            'processes_max': max(s['processes'] for s in sampler.samples),
+            'threads_start': threads[0], 'threads_max': max(threads), 'threads_end': threads[-1],
+            'rss_kb_start': rss[0], 'rss_kb_max': max(rss), 'rss_kb_end': rss[-1],
+        }
+
+    output = args.output or os.path.join(
+        RESULTS_DIR, f"{args.mode}-{result['commit']}-{result['timestamp']}.json")
+    os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(result, f, indent=2)
+
+    print_summary(result)
+    print(f"💾 Results saved to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Preallocated per-pair candle ring buffers.
+
+Each pair keeps its window of candles (OHLCV plus indicator slots) in one
+float64 array that is allocated once, `capacity + slack` columns wide. New
+candles are written after the head; when the slack runs out the window is
+moved back to the start of the same array. The current window is therefore
+always one contiguous slice: appends are amortized O(1) with no
+reallocation, and every column can be handed out as a zero-copy NumPy view
+or wrapped in a DataFrame without copying.
+
+The rings are a copy, not a replacement: freqtrade keeps its own analyzed
+DataFrame per pair, so a ring is extra memory of 8 bytes x columns x
+(capacity + slack) per pair. For SimplePortfolio (720 candles, 19 columns)
+that is about 134 KiB per pair on top of freqtrade's frames. What it buys is
+O(1) reads of the latest candles and indicators for the callbacks, the
+checkpoints and the correlation engine, not a smaller bot.
+"""
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+OHLCV = ('date', 'open', 'high', 'low', 'close', 'volume')
+
+
+def epoch_ms(dates):
+    """freqtrade's (tz-aware) date column as int64 epoch milliseconds"""
+    if pd.api.types.is_datetime64_any_dtype(dates):
+        return ((dates - pd.Timestamp(0, tz=dates.dt.tz)) // pd.Timedelta(1, 'ms')).to_numpy(np.int64)
+    return dates.to_numpy(np.int64)
+
+
+class CandleRing:
+    """Fixed-capacity window of candles for one pair; `date` is epoch milliseconds"""
+
+    __slots__ = ('capacity', 'columns', 'slots', 'data', 'head', 'size')
+
+    def __init__(self, capacity, indicators=(), slack=None):
+        self.capacity = capacity
+        self.columns = OHLCV + tuple(indicators)
+        self.slots = {name: i for i, name in enumerate(self.columns)}
+        # A quarter window of slack moves the window once every capacity/4 appends
+        slack = slack if slack is not None else max(1, capacity // 4)
+        self.data = np.full((len(self.columns), capacity + slack), np.nan)
+        self.head = 0
+        self.size = 0
+
+    @property
+    def nbytes(self):
+        return self.data.nbytes
+
+    @property
+    def last_ts(self):
+        if not self.size:
+            return None
+        return int(self.data[0, self.head - 1])
+
+    def append(self, ts, open_, high, low, close, volume):
+        """Add a candle; a repeated timestamp updates the forming candle in place"""
+        last = self.last_ts
+        if last is not None and ts < last:
+            return False
+        if last == ts:
+            self.data[:6, self.head - 1] = (ts, open_, high, low, close, volume)
+            return True
+        if self.head == self.data.shape[1]:
+            keep = self.capacity - 1
+            self.data[:, :keep] = self.data[:, self.head - keep:self.head]
+            self.head = keep
+            self.size = min(self.size, keep)
+        self.data[:6, self.head] = (ts, open_, high, low, close, volume)
+        self.data[6:, self.head] = np.nan
+        self.head += 1
+        self.size = min(self.size + 1, self.capacity)
+        return True
+
+    def set_latest(self, name, values):
+        """Overwrite the newest len(values) entries of a column"""
+        values = np.asarray(values, dtype=np.float64)
+        n = min(len(values), self.size)
+        if n:
+            self.data[self.slots[name], self.head - n:self.head] = values[-n:]
+
+    def view(self, name):
+        """Zero-copy view of a column over the current window, oldest first"""
+        return self.data[self.slots[name], self.head - self.size:self.head]
+
+    def last(self, name):
+        return self.data[self.slots[name], self.head - 1] if self.size else None
+
+    def window(self):
+        """Copy of the current window (columns x size), e.g. for a checkpoint"""
+        return self.data[:, self.head - self.size:self.head].copy()
+
+    def load(self, window):
+        """Replace the contents with a saved window; rows must follow self.columns"""
+        size = min(window.shape[1], self.capacity)
+        self.data[:, :size] = window[:, window.shape[1] - size:]
+        self.data[:, size:] = np.nan
+        self.head = self.size = size
+
+    def frame(self):
+        """DataFrame over the window; column data is shared with the ring, not copied"""
+        window = self.data[:, self.head - self.size:self.head]
+        return pd.DataFrame(window.T, columns=list(self.columns), copy=False)
+
+    def sync(self, dataframe, indicators=()):
+        """Append candles from a freqtrade dataframe newer than the ring's head.
+
+        Indicator columns are refreshed for the appended rows plus the
+        previous head, whose values may have changed since it was forming.
+        Returns the number of rows written.
+        """
+        ts = epoch_ms(dataframe['date'])
+        last = self.last_ts
+        start = 0 if last is None else int(np.searchsorted(ts, last, side='left'))
+        start = max(start, len(ts) - self.capacity)
+        ohlcv = [dataframe[c].to_numpy(dtype=np.float64) for c in OHLCV[1:]]
+        for i in range(start, len(ts)):
+            self.append(int(ts[i]), *(col[i] for col in ohlcv))
+        written = len(ts) - start
+        for name in indicators:
+            # Slots the dataframe does not carry (e.g. resampled columns) are filled by their owner
+            if name in self.slots and name in dataframe and written:
+                self.set_latest(name, dataframe[name].to_numpy(dtype=np.float64)[start:])
+        return written
+
+
+class CandleStore:
+    """Ring buffers keyed by pair, created on first use.
+
+    `latest(pair)` memoizes the newest row as a namedtuple keyed by
+    (pair, candle timestamp), so callbacks reading the same candle several
+    times per cycle pay for one column gather and then plain attribute reads.
+    """
+
+    __slots__ = ('capacity', 'indicators', 'rings', 'row_type', 'latest_rows')
+
+    def __init__(self, capacity, indicators=()):
+        self.capacity = capacity
+        self.indicators = tuple(indicators)
+        self.rings = {}
+        self.row_type = namedtuple('CandleRow', OHLCV + self.indicators)
+        self.latest_rows = {}
+
+    def ring(self, pair):
+        ring = self.rings.get(pair)
+        if ring is None:
+            ring = self.rings[pair] = CandleRing(self.capacity, self.indicators)
+        return ring
+
+    def sync(self, pair, dataframe):
+        written = self.ring(pair).sync(dataframe, self.indicators)
+        if written:
+            # The head candle (and its indicators) may have been rewritten in place
+            self.latest_rows.pop(pair, None)
+        return written
+
+    def latest(self, pair):
+        """Newest candle of pair as a CandleRow, None before the first sync"""
+        ring = self.rings.get(pair)
+        if ring is None or not ring.size:
+            return None
+        ts = ring.last_ts
+        cached = self.latest_rows.get(pair)
+        if cached is not None and cached[0] == ts:
+            return cached[1]
+        row = self.row_type(*ring.data[:, ring.head - 1].tolist())
+        self.latest_rows[pair] = (ts, row)
+        return row
+
+    def retain(self, pairs):
+        """Drop rings and cached rows of pairs not in `pairs`; returns the dropped pairs"""
+        keep = set(pairs)
+        dropped = [pair for pair in self.rings if pair not in keep]
+        for pair in dropped:
+            self.drop(pair)
+        return dropped
+
+    def drop(self, pair):
+        self.rings.pop(pair, None)
+        self.latest_rows.pop(pair, None)
+
+    def pairs(self):
+        return list(self.rings)
+
+    @property
+    def nbytes(self):
+        return sum(ring.nbytes for ring in self.rings.values())
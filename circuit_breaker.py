@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Circuit breaker for calls to the exchange.
+
+After `failure_threshold` consecutive failures the circuit opens and calls
+are rejected immediately with CircuitOpenError. Once `reset_timeout` seconds
+have passed a single probe is let through (half-open); success closes the
+circuit, failure opens it for another `reset_timeout`.
+"""
+import threading
+import time
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling the exchange while the circuit is open"""
+
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold=3, reset_timeout=30.0, name='kraken'):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.name = name
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = None
+        self.last_error = None
+        self.lock = threading.Lock()
+
+    def allow_request(self):
+        """True if a call may go out now; moves open -> half-open when the timeout expired"""
+        with self.lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = HALF_OPEN
+                return True
+            # Half-open lets exactly one probe through; everyone else is rejected
+            return False
+
+    def record_success(self):
+        with self.lock:
+            self.state = CLOSED
+            self.failures = 0
+            self.opened_at = None
+            self.last_error = None
+
+    def record_failure(self, error):
+        with self.lock:
+            self.failures += 1
+            self.last_error = str(error)
+            if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = OPEN
+                self.opened_at = time.monotonic()
+
+    def call(self, func, *args, **kwargs):
+        """Run func through the breaker, raising CircuitOpenError when short-circuited"""
+        if not self.allow_request():
+            raise CircuitOpenError(f"{self.name} circuit open: {self.last_error}")
+        try:
+            result = func(*args, **kwargs)
+        except Exception as e:
+            self.record_failure(e)
+            raise
+        self.record_success()
+        return result
+
+    def retry_in(self):
+        """Seconds until the next half-open probe, 0 when closed"""
+        with self.lock:
+            if self.state != OPEN:
+                return 0.0
+            return max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at))
+
+    def status(self):
+        with self.lock:
+            return {'state': self.state, 'failures': self.failures, 'last_error': self.last_error}
@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+Rolling cross-pair correlation of 5m returns, updated one candle at a time.
+
+The last `window` log-return vectors (one entry per pair, all on the same
+candle timestamp) are kept in a ring buffer next to their running mean and
+co-moment matrix. A new candle is folded in with Welford's update and the
+candle leaving the window is folded out with its inverse:
+
+    add x:     d = x - mean;  mean += d / n;       M += outer(d, x - mean)
+    remove y:  d = y - mean;  mean -= d / (n - 1); M -= outer(d, y - mean)
+
+so each candle costs O(pairs²) no matter how long the window is, and
+`correlation(a, b)` is O(1): M[a, b] / sqrt(M[a, a] * M[b, b]). Rounding
+drift is removed by recomputing M exactly from the buffer once per window.
+
+Returns are read from the strategy's candle rings. A pair whose ring has no
+candle at a timestamp carries its last close forward (return 0), and a
+change in the pair set rebuilds the window from the rings over the span all
+pairs have data.
+
+    python correlation.py --datadir user_data/data/kraken   # matrix from recorded candles
+    python correlation.py --stub-days 7
+"""
+import argparse
+import math
+import time
+
+import numpy as np
+
+from informative import TIMEFRAME_MS
+
+WINDOW = 288        # 24h of 5m returns
+MIN_PERIODS = 48    # no correlation is reported from fewer returns
+
+
+def closes_at(ring, grid):
+    """Close of the latest candle at or before each grid timestamp (first close before the ring starts)"""
+    dates = ring.view('date')
+    idx = np.searchsorted(dates, grid, side='right') - 1
+    return ring.view('close')[np.maximum(idx, 0)]
+
+
+def log_returns(closes):
+    """Row-wise log returns of a (timestamps x pairs) close matrix; bad prices give 0"""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        returns = np.diff(np.log(closes), axis=0)
+    returns[~np.isfinite(returns)] = 0.0
+    return returns
+
+
+class RollingCorrelation:
+    def __init__(self, window=WINDOW, min_periods=MIN_PERIODS, timeframe='5m'):
+        self.window = window
+        self.min_periods = min_periods
+        self.period = TIMEFRAME_MS[timeframe]
+        self.reset([])
+
+    def reset(self, pairs):
+        self.pairs = list(pairs)
+        self.index = {pair: i for i, pair in enumerate(self.pairs)}
+        k = len(self.pairs)
+        self.rows = np.zeros((self.window, k))
+        self.head = 0       # next slot to write; the oldest row once the buffer is full
+        self.n = 0
+        self.mean = np.zeros(k)
+        self.comoment = np.zeros((k, k))
+        self.pushed = 0     # rows pushed since the last exact recompute
+        self.last_ts = None
+
+    def push(self, x):
+        """Slide the window forward by one return vector (ordered like self.pairs)"""
+        if self.n == self.window:
+            self.remove(self.rows[self.head])
+        self.rows[self.head] = x
+        self.head = (self.head + 1) % self.window
+        self.add(self.rows[self.head - 1])
+        self.pushed += 1
+        if self.pushed >= self.window:
+            self.load(self.ordered_rows())
+
+    def add(self, x):
+        self.n += 1
+        delta = x - self.mean
+        self.mean += delta / self.n
+        self.comoment += np.outer(delta, x - self.mean)
+
+    def remove(self, y):
+        if self.n == 1:
+            self.n = 0
+            self.mean[:] = 0.0
+            self.comoment[:] = 0.0
+            return
+        self.n -= 1
+        delta = y - self.mean
+        self.mean -= delta / self.n
+        self.comoment -= np.outer(delta, y - self.mean)
+
+    def ordered_rows(self):
+        """The window's return vectors, oldest first (a copy)"""
+        if self.n < self.window:
+            return self.rows[:self.n].copy()
+        return np.concatenate([self.rows[self.head:], self.rows[:self.head]])
+
+    def load(self, rows):
+        """Replace the window with `rows` (oldest first) and recompute mean and co-moments exactly"""
+        rows = rows[-self.window:]
+        n = len(rows)
+        self.rows[:n] = rows
+        self.head = n % self.window
+        self.n = n
+        self.mean = rows.mean(axis=0) if n else np.zeros(len(self.pairs))
+        centered = rows - self.mean
+        self.comoment = centered.T @ centered
+        self.pushed = 0
+
+    def sync(self, candles, pairs):
+        """Fold in every candle all `pairs` have closed since the last sync; returns rows pushed.
+
+        `candles` is the strategy's CandleStore. Pairs without at least two
+        candles, or lagging the freshest ring by more than a candle, are left
+        out; any change in the pair set rebuilds from the rings.
+        """
+        rings = {pair: candles.rings.get(pair) for pair in pairs}
+        rings = {pair: ring for pair, ring in rings.items() if ring is not None and ring.size >= 2}
+        freshest = max((ring.last_ts for ring in rings.values()), default=None)
+        current = sorted(pair for pair, ring in rings.items() if ring.last_ts >= freshest - self.period)
+        if len(current) < 2:
+            if self.pairs:
+                self.reset([])
+            return 0
+        newest = min(rings[pair].last_ts for pair in current)
+        if current != self.pairs or self.last_ts is None or newest - self.last_ts > self.window * self.period:
+            return self.rebuild(rings, current, newest)
+        if newest <= self.last_ts:
+            return 0
+        grid = np.arange(self.last_ts, newest + 1, self.period)
+        returns = log_returns(np.column_stack([closes_at(rings[pair], grid) for pair in current]))
+        for row in returns:
+            self.push(row)
+        self.last_ts = int(grid[-1])
+        return len(returns)
+
+    def rebuild(self, rings, pairs, newest):
+        """Recompute the window from the rings over the span every pair has candles for"""
+        self.reset(pairs)
+        start = max(newest - self.window * self.period, max(int(rings[pair].view('date')[0]) for pair in pairs))
+        grid = np.arange(newest - (newest - start) // self.period * self.period, newest + 1, self.period)
+        returns = log_returns(np.column_stack([closes_at(rings[pair], grid) for pair in pairs]))
+        self.load(returns)
+        self.last_ts = int(grid[-1])
+        return len(returns)
+
+    def correlation(self, a, b):
+        """Correlation of two pairs' returns over the window, None while unknown"""
+        i, j = self.index.get(a), self.index.get(b)
+        if i is None or j is None or self.n < self.min_periods:
+            return None
+        if i == j:
+            return 1.0
+        denom = self.comoment[i, i] * self.comoment[j, j]
+        return float(self.comoment[i, j] / math.sqrt(denom)) if denom > 0 else None
+
+    def cluster(self, pair, candidates, threshold):
+        """`pair` plus the candidates whose correlation with it is at least `threshold`"""
+        cluster = [pair]
+        for other in candidates:
+            if other != pair:
+                rho = self.correlation(pair, other)
+                if rho is not None and rho >= threshold:
+                    cluster.append(other)
+        return cluster
+
+    def matrix(self):
+        """Full (pairs x pairs) correlation matrix, NaN where a pair has no variance"""
+        std = np.sqrt(np.diag(self.comoment))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return self.comoment / np.outer(std, std)
+
+
+def main():
+    import roi_simulator
+
+    parser = argparse.ArgumentParser(description="Rolling correlation of 5m returns across pairs")
+    parser.add_argument('--datadir', default='user_data/data/kraken')
+    parser.add_argument('--pairs', help="comma separated pairs (default: the bot's whitelist)")
+    parser.add_argument('--stub-days', type=int, help="use N days of synthetic stub candles instead of --datadir")
+    parser.add_argument('--window', type=int, default=WINDOW, help="returns in the rolling window")
+    args = parser.parse_args()
+
+    if args.pairs:
+        pairs = args.pairs.split(',')
+    else:
+        from start import get_config_template
+        pairs = get_config_template()['exchange']['pair_whitelist']
+    if args.stub_days:
+        data = roi_simulator.stub_candles(pairs, args.stub_days)
+    else:
+        data = {pair: rows for pair in pairs if (rows := roi_simulator.load_pair(args.datadir, pair)) is not None}
+    if len(data) < 2:
+        print(f"❌ Need candles for at least two pairs in {args.datadir} (try --stub-days 7)")
+        return
+
+    _, ohlc = roi_simulator.align(data)
+    closes = ohlc[3].T
+    # Carry the last close over missing candles, as closes_at does on the rings
+    last = np.maximum.accumulate(np.where(np.isnan(closes), 0, np.arange(len(closes))[:, None]), axis=0)
+    returns = log_returns(closes[last, np.arange(closes.shape[1])])
+
+    engine = RollingCorrelation(args.window)
+    engine.reset(list(data))
+    started = time.perf_counter()
+    for row in returns:
+        engine.push(row)
+    elapsed = time.perf_counter() - started
+    exact = np.corrcoef(returns[-args.window:].T)
+    error = np.nanmax(np.abs(engine.matrix() - exact))
+    print(f"🔗 {len(returns)} returns x {len(data)} pairs in {elapsed * 1000:.1f} ms "
+          f"({elapsed / len(returns) * 1e6:.1f} µs per candle), max error vs np.corrcoef {error:.1e}")
+
+    names = [pair.split('/')[0][:6] for pair in engine.pairs]
+    print(' ' * 7 + ''.join(f"{name:>7}" for name in names))
+    for name, row in zip(names, engine.matrix()):
+        print(f"{name:<7}" + ''.join(f"{value:>7.2f}" for value in row))
+
+
+if __name__ == "__main__":
+    main()
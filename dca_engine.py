@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Declarative DCA ladder, decided with one vectorized lookup.
+
+The ladder is a table of loss thresholds and stake multipliers: a trade
+whose profit is below a tier's threshold (and above every deeper tier's)
+adds `min_stake * multiplier`, until it has `max_entries` successful
+entries. Tiers are located with np.searchsorted, so the strategy's open
+trades (one call per bot cycle) and roi_simulator's whole (pairs x params)
+grid use the same table instead of an if-chain. `bounds(tier)` gives the
+profit range a decision holds for, so a caller can reuse it while a live
+profit stays inside that range.
+"""
+import numpy as np
+
+# Deepest loss first: (profit below, stake multiplier, log label)
+DEFAULT_TIERS = (
+    (-0.15, 3.0, 'MASSIVE'),
+    (-0.10, 2.5, 'BIG'),
+    (-0.06, 2.0, 'MEDIUM'),
+    (-0.01, 1.0, 'SMALL'),
+)
+
+
+class DcaLadder:
+    __slots__ = ('thresholds', 'multipliers', 'labels', 'max_entries')
+
+    def __init__(self, tiers=DEFAULT_TIERS, max_entries=13):
+        tiers = sorted((float(t), float(m), str(label)) for t, m, label in tiers)
+        thresholds = [t for t, _, _ in tiers]
+        if not tiers:
+            raise ValueError("DCA ladder needs at least one tier")
+        if len(set(thresholds)) != len(thresholds):
+            raise ValueError("DCA tier thresholds must be distinct")
+        if any(t >= 0 for t in thresholds):
+            raise ValueError("DCA tier thresholds must be losses (< 0)")
+        if any(m <= 0 for _, m, _ in tiers):
+            raise ValueError("DCA stake multipliers must be positive")
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+        self.thresholds = np.array(thresholds)
+        self.multipliers = np.array([m for _, m, _ in tiers] + [np.nan])
+        self.labels = tuple(label for _, _, label in tiers) + (None,)
+        self.max_entries = int(max_entries)
+
+    @classmethod
+    def from_config(cls, tiers, max_entries):
+        """Build from [{'below': -0.15, 'multiplier': 3.0, 'label': 'MASSIVE'}, ...]"""
+        return cls([(t['below'], t['multiplier'], t.get('label', f"{t['below']:.0%}")) for t in tiers],
+                   max_entries)
+
+    def decide(self, profits, entries):
+        """Tier index and stake multiplier per trade; multiplier is NaN for no DCA.
+
+        A profit equal to a threshold falls into the next shallower tier,
+        matching `profit < threshold`. Index len(thresholds) means no tier.
+        """
+        profits = np.asarray(profits, dtype=np.float64)
+        entries = np.asarray(entries)
+        tiers = np.searchsorted(self.thresholds, profits, side='right')
+        tiers[np.isnan(profits)] = len(self.thresholds)
+        multipliers = self.multipliers[tiers]
+        multipliers[entries >= self.max_entries] = np.nan
+        return tiers, multipliers
+
+    def bounds(self, tier):
+        """Profit range [low, high) that decide() maps to `tier`"""
+        low = float(self.thresholds[tier - 1]) if tier > 0 else -np.inf
+        high = float(self.thresholds[tier]) if tier < len(self.thresholds) else np.inf
+        return low, high
+
+    def stake(self, multiplier, min_stake, max_stake):
+        """Stake to add for one decision, None when there is nothing to add"""
+        if multiplier is None or np.isnan(multiplier) or min_stake is None:
+            return None
+        return min(min_stake * multiplier, max_stake)
+
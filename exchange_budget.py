@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Kraken private-API call budget shared by every process using the same key.
+
+Kraken keeps one decaying call counter per API key: each private call adds
+1 (2 for ledger/trade history), the counter drains at a tier-dependent rate,
+and going over the ceiling earns a rate-limit penalty. freqtrade and the
+dashboard both talk to Kraken with the same key, so the counter state lives
+in a small memory-mapped file guarded by flock() that both processes update.
+
+Order-path callers (the trader) may use the whole counter; dashboard reads
+stop `reserve` short of the ceiling so they can never starve the trader.
+
+    budget = shared_budget()
+    install(exchange, budget, PRIORITY_ORDER)   # wraps exchange.fetch2
+"""
+import asyncio
+import fcntl
+import inspect
+import mmap
+import os
+import struct
+import time
+
+PRIORITY_ORDER = 'order'
+PRIORITY_DASHBOARD = 'dashboard'
+
+# (counter ceiling, decay per second) per Kraken verification tier
+KRAKEN_TIERS = {
+    'starter': (15.0, 0.33),
+    'intermediate': (20.0, 0.5),
+    'pro': (20.0, 1.0),
+}
+
+HEAVY_CALLS = {'Ledgers', 'QueryLedgers', 'TradesHistory', 'QueryTrades'}
+# Order placement is limited by Kraken's separate per-pair matching engine counter
+FREE_CALLS = {'AddOrder', 'AddOrderBatch', 'CancelOrder', 'CancelOrderBatch', 'CancelAll', 'EditOrder'}
+
+# counter, last update (monotonic), granted order, granted dashboard, throttled dashboard
+_LAYOUT = struct.Struct('<ddQQQ')
+
+
+class BudgetExhausted(Exception):
+    """Raised when a call could not be admitted within its timeout"""
+
+
+def call_cost(path):
+    """Counter cost of a Kraken private endpoint"""
+    if path in FREE_CALLS:
+        return 0
+    return 2 if path in HEAVY_CALLS else 1
+
+
+class KrakenBudget:
+    def __init__(self, path, max_counter=15.0, decay_per_sec=0.33, reserve=5.0):
+        self.path = path
+        self.max_counter = max_counter
+        self.decay_per_sec = decay_per_sec
+        self.reserve = reserve
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        fcntl.flock(self.fd, fcntl.LOCK_EX)
+        try:
+            if os.fstat(self.fd).st_size < _LAYOUT.size:
+                os.ftruncate(self.fd, _LAYOUT.size)
+        finally:
+            fcntl.flock(self.fd, fcntl.LOCK_UN)
+        self.mem = mmap.mmap(self.fd, _LAYOUT.size)
+
+    def _read(self, now):
+        counter, updated, granted_order, granted_dashboard, throttled = _LAYOUT.unpack_from(self.mem)
+        # A file left over from before a reboot has a timestamp from another clock epoch
+        if updated > now:
+            updated = now
+        counter = max(0.0, counter - (now - updated) * self.decay_per_sec)
+        return counter, granted_order, granted_dashboard, throttled
+
+    def ceiling(self, priority):
+        if priority == PRIORITY_ORDER:
+            return self.max_counter
+        return self.max_counter - self.reserve
+
+    def try_acquire(self, cost=1, priority=PRIORITY_ORDER):
+        """Admit a call of `cost` now and return 0, or return the seconds to wait"""
+        now = time.monotonic()
+        fcntl.flock(self.fd, fcntl.LOCK_EX)
+        try:
+            counter, granted_order, granted_dashboard, throttled = self._read(now)
+            ceiling = self.ceiling(priority)
+            if counter + cost <= ceiling:
+                counter += cost
+                if priority == PRIORITY_ORDER:
+                    granted_order += 1
+                else:
+                    granted_dashboard += 1
+                wait = 0.0
+            else:
+                if priority != PRIORITY_ORDER:
+                    throttled += 1
+                wait = (counter + cost - ceiling) / self.decay_per_sec
+            _LAYOUT.pack_into(self.mem, 0, counter, now, granted_order, granted_dashboard, throttled)
+            return wait
+        finally:
+            fcntl.flock(self.fd, fcntl.LOCK_UN)
+
+    def acquire(self, cost=1, priority=PRIORITY_ORDER, timeout=None):
+        """Block until the call fits in the budget"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            wait = self.try_acquire(cost, priority)
+            if wait <= 0:
+                return
+            if deadline is not None and time.monotonic() + wait > deadline:
+                raise BudgetExhausted(f"Kraken call budget exhausted for {priority} calls")
+            time.sleep(wait)
+
+    async def acquire_async(self, cost=1, priority=PRIORITY_ORDER, timeout=None):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            wait = self.try_acquire(cost, priority)
+            if wait <= 0:
+                return
+            if deadline is not None and time.monotonic() + wait > deadline:
+                raise BudgetExhausted(f"Kraken call budget exhausted for {priority} calls")
+            await asyncio.sleep(wait)
+
+    def snapshot(self):
+        """Current counter and remaining headroom per priority, for metrics"""
+        now = time.monotonic()
+        fcntl.flock(self.fd, fcntl.LOCK_SH)
+        try:
+            counter, granted_order, granted_dashboard, throttled = self._read(now)
+        finally:
+            fcntl.flock(self.fd, fcntl.LOCK_UN)
+        return {
+            'counter': round(counter, 2),
+            'max_counter': self.max_counter,
+            'decay_per_sec': self.decay_per_sec,
+            'remaining_order': round(max(0.0, self.max_counter - counter), 2),
+            'remaining_dashboard': round(max(0.0, self.ceiling(PRIORITY_DASHBOARD) - counter), 2),
+            'granted_order': granted_order,
+            'granted_dashboard': granted_dashboard,
+            'throttled_dashboard': throttled,
+        }
+
+
+_shared_budget = None
+
+
+def shared_budget():
+    """Process-wide budget configured from KRAKEN_BUDGET_FILE, KRAKEN_TIER and KRAKEN_BUDGET_RESERVE"""
+    global _shared_budget
+    if _shared_budget is None:
+        max_counter, decay = KRAKEN_TIERS.get(os.getenv('KRAKEN_TIER', 'starter'), KRAKEN_TIERS['starter'])
+        _shared_budget = KrakenBudget(
+            os.getenv('KRAKEN_BUDGET_FILE', 'user_data/kraken_budget.bin'),
+            max_counter=max_counter,
+            decay_per_sec=decay,
+            reserve=float(os.getenv('KRAKEN_BUDGET_RESERVE', 5)),
+        )
+    return _shared_budget
+
+
+def install(exchange, budget, priority, timeout=None):
+    """Route a ccxt kraken instance's private calls (sync or async) through the budget"""
+    original = exchange.fetch2
+    if getattr(original, '_budgeted', False):
+        return exchange
+
+    if inspect.iscoroutinefunction(original):
+        async def fetch2(path, api='public', method='GET', params={}, headers=None, body=None, config={}):
+            if api == 'private':
+                cost = call_cost(path)
+                if cost:
+                    await budget.acquire_async(cost, priority, timeout)
+            return await original(path, api, method, params, headers, body, config)
+    else:
+        def fetch2(path, api='public', method='GET', params={}, headers=None, body=None, config={}):
+            if api == 'private':
+                cost = call_cost(path)
+                if cost:
+                    budget.acquire(cost, priority, timeout)
+            return original(path, api, method, params, headers, body, config)
+
+    fetch2._budgeted = True
+    exchange.fetch2 = fetch2
+    return exchange
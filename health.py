@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Liveness heartbeat written by the trading loop.
+
+The strategy records each bot loop, the newest candle it processed per
+pair and the outcome of its exchange calls, and rewrites a small JSON file
+(HEARTBEAT_FILE, default user_data/heartbeat.json) once per loop with the
+evaluated status. Readers never talk to freqtrade: `healthcheck.sh` checks
+the file's age and status with coreutils only, and web_server.py's /health
+serves the parsed file.
+"""
+import inspect
+import json
+import os
+import time
+
+HEARTBEAT_FILE = os.getenv('HEARTBEAT_FILE', 'user_data/heartbeat.json')
+# Seconds without a loop / a successful exchange call before the bot counts as unhealthy
+MAX_LOOP_AGE = float(os.getenv('HEALTH_MAX_LOOP_AGE', '120'))
+MAX_EXCHANGE_AGE = float(os.getenv('HEALTH_MAX_EXCHANGE_AGE', '600'))
+# Timeframes a pair's newest processed candle may have been closed for before its data counts as stalled
+MAX_CANDLE_TIMEFRAMES = float(os.getenv('HEALTH_MAX_CANDLE_TIMEFRAMES', '2'))
+
+
+class Heartbeat:
+    def __init__(self, path=HEARTBEAT_FILE, timeframe_ms=300_000, clock=time.time):
+        self.path = path
+        self.timeframe_ms = timeframe_ms
+        self.clock = clock
+        self.started = clock()
+        self.loops = 0
+        self.last_loop = None
+        self.candles = {}          # pair -> newest processed candle (epoch ms)
+        self.exchange_ok = None
+        self.exchange_error = None
+        self.last_error = None
+
+    def candle(self, pair, ts_ms):
+        self.candles[pair] = ts_ms
+
+    def exchange_success(self):
+        self.exchange_ok = self.clock()
+
+    def exchange_failure(self, error):
+        self.exchange_error = self.clock()
+        self.last_error = f"{type(error).__name__}: {error}"[:200]
+
+    def drop(self, pair):
+        self.candles.pop(pair, None)
+
+    def snapshot(self):
+        now = self.clock()
+        data = {
+            'pid': os.getpid(),
+            'ts': now,
+            'started': self.started,
+            'loops': self.loops,
+            'last_loop': self.last_loop,
+            'exchange_ok': self.exchange_ok,
+            'exchange_error': self.exchange_error,
+            'last_error': self.last_error,
+            'timeframe_ms': self.timeframe_ms,
+            'candles': self.candles,
+        }
+        data['status'], data['problems'] = evaluate(data, now)
+        return data
+
+    def beat(self):
+        """Record one bot loop and rewrite the heartbeat file"""
+        self.loops += 1
+        self.last_loop = self.clock()
+        write(self.path, self.snapshot())
+
+
+def write(path, data):
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, 'w') as f:
+        json.dump(data, f)
+    os.replace(tmp, path)
+
+
+def read(path=HEARTBEAT_FILE):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def evaluate(data, now=None):
+    """('ok' | 'unhealthy', [problems]) for a heartbeat snapshot"""
+    now = now if now is not None else time.time()
+    problems = []
+    if data.get('last_loop') is None or now - data['last_loop'] > MAX_LOOP_AGE:
+        problems.append('trading loop stalled')
+    # Grace period after start: no exchange call may have completed yet
+    reference = data.get('exchange_ok') or data.get('started') or now
+    if now - reference > MAX_EXCHANGE_AGE:
+        problems.append('no successful exchange call')
+    # Candles are keyed by open time; a candle is only processed once it has closed
+    timeframe = (data.get('timeframe_ms') or 0) / 1000
+    if timeframe:
+        stale = sorted(pair for pair, ts_ms in (data.get('candles') or {}).items()
+                       if now - ts_ms / 1000 - timeframe > MAX_CANDLE_TIMEFRAMES * timeframe)
+        if stale:
+            problems.append(f"stale candles: {', '.join(stale[:5])}" + (f" (+{len(stale) - 5})" if len(stale) > 5 else ''))
+    return ('unhealthy' if problems else 'ok'), problems
+
+
+def track_exchange(exchange, heartbeat):
+    """Record the outcome of every ccxt call (sync or async) made through `exchange`"""
+    original = exchange.fetch2
+    if getattr(original, '_heartbeat', False):
+        return exchange
+
+    if inspect.iscoroutinefunction(original):
+        async def fetch2(*args, **kwargs):
+            try:
+                result = await original(*args, **kwargs)
+            except Exception as e:
+                heartbeat.exchange_failure(e)
+                raise
+            heartbeat.exchange_success()
+            return result
+    else:
+        def fetch2(*args, **kwargs):
+            try:
+                result = original(*args, **kwargs)
+            except Exception as e:
+                heartbeat.exchange_failure(e)
+                raise
+            heartbeat.exchange_success()
+            return result
+
+    fetch2._heartbeat = True
+    exchange.fetch2 = fetch2
+    return exchange
@@ -0,0 +1,23 @@
+#!/bin/sh
+# Liveness probe for the Docker HEALTHCHECK: no Python, just the heartbeat
+# file SimplePortfolio rewrites every bot loop (see health.py).
+HEARTBEAT_FILE="${HEARTBEAT_FILE:-user_data/heartbeat.json}"
+MAX_AGE="${HEALTH_MAX_LOOP_AGE:-120}"
+
+if [ ! -f "$HEARTBEAT_FILE" ]; then
+    echo "unhealthy: no heartbeat yet ($HEARTBEAT_FILE)"
+    exit 1
+fi
+
+age=$(( $(date +%s) - $(stat -c %Y "$HEARTBEAT_FILE") ))
+if [ "$age" -gt "${MAX_AGE%.*}" ]; then
+    echo "unhealthy: last bot loop ${age}s ago"
+    exit 1
+fi
+
+if ! grep -q '"status": "ok"' "$HEARTBEAT_FILE"; then
+    echo "unhealthy: $(grep -o '"problems": \[[^]]*\]' "$HEARTBEAT_FILE")"
+    exit 1
+fi
+
+echo "ok: last bot loop ${age}s ago"
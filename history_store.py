@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Append-only portfolio history with precomputed 1m/1h/1d rollups.
+
+Every stats snapshot is appended to SQLite (WAL mode, so the dashboard can
+read while a snapshot is being written) and folded into min/max/last
+buckets for each rollup tier as it arrives. History queries read one tier
+directly, so their cost depends on the number of points returned, not on
+the time range. Old raw samples and fine-grained buckets are compacted away
+according to each tier's retention.
+"""
+import os
+import sqlite3
+import threading
+import time
+
+# step seconds -> (label, retention seconds or None to keep forever)
+TIERS = {
+    60: ('1m', 2 * 86400),
+    3600: ('1h', 90 * 86400),
+    86400: ('1d', None),
+}
+STEP_LABELS = {label: step for step, (label, _) in TIERS.items()}
+RAW_RETENTION = 2 * 86400
+COMPACT_EVERY = 600
+MAX_POINTS = 1500
+
+# Snapshot fields that get a history
+SERIES = ('portfolio_value', 'usd_balance', 'cpool_value', 'ondo_value', 'cpool_price', 'ondo_price')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS samples (
+    ts INTEGER NOT NULL,
+    series TEXT NOT NULL,
+    value REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS samples_ts ON samples (ts);
+CREATE TABLE IF NOT EXISTS rollups (
+    step INTEGER NOT NULL,
+    series TEXT NOT NULL,
+    bucket INTEGER NOT NULL,
+    min REAL NOT NULL,
+    max REAL NOT NULL,
+    last REAL NOT NULL,
+    PRIMARY KEY (step, series, bucket)
+) WITHOUT ROWID;
+"""
+
+
+def parse_duration(value):
+    """'90s', '15m', '24h', '7d' or plain seconds -> seconds"""
+    units = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400, 'w': 604800}
+    value = str(value).strip().lower()
+    if value[-1:] in units:
+        return int(float(value[:-1]) * units[value[-1]])
+    return int(float(value))
+
+
+class HistoryStore:
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.executescript(SCHEMA)
+        self.lock = threading.Lock()
+        self.last_compaction = 0
+
+    def record(self, stats, ts=None):
+        """Append one snapshot and fold it into every rollup tier"""
+        ts = int(ts if ts is not None else stats.get('last_update') or time.time())
+        points = [(name, float(stats[name])) for name in SERIES if stats.get(name) is not None]
+        with self.lock:
+            self.conn.execute('BEGIN')
+            try:
+                self.conn.executemany('INSERT INTO samples (ts, series, value) VALUES (?, ?, ?)',
+                                      [(ts, name, value) for name, value in points])
+                self.conn.executemany(
+                    'INSERT INTO rollups (step, series, bucket, min, max, last) VALUES (?, ?, ?, ?, ?, ?) '
+                    'ON CONFLICT (step, series, bucket) DO UPDATE SET '
+                    'min = MIN(min, excluded.min), max = MAX(max, excluded.max), last = excluded.last',
+                    [(step, name, ts - ts % step, value, value, value)
+                     for step in TIERS for name, value in points])
+                self.conn.execute('COMMIT')
+            except Exception:
+                self.conn.execute('ROLLBACK')
+                raise
+            if ts - self.last_compaction >= COMPACT_EVERY:
+                self._compact(ts)
+                self.last_compaction = ts
+
+    def _compact(self, now):
+        self.conn.execute('DELETE FROM samples WHERE ts < ?', (now - RAW_RETENTION,))
+        for step, (_, retention) in TIERS.items():
+            if retention:
+                self.conn.execute('DELETE FROM rollups WHERE step = ? AND bucket < ?', (step, now - retention))
+
+    def pick_step(self, range_seconds):
+        """Finest tier that answers range_seconds in at most MAX_POINTS points"""
+        for step in sorted(TIERS):
+            if range_seconds / step <= MAX_POINTS:
+                return step
+        return max(TIERS)
+
+    def query(self, series, range_seconds, step=None, now=None):
+        """[{t, min, max, last}] buckets for the last range_seconds, oldest first"""
+        now = int(now if now is not None else time.time())
+        step = step or self.pick_step(range_seconds)
+        if step not in TIERS:
+            raise ValueError(f"step must be one of {', '.join(label for label, _ in TIERS.values())}")
+        # Cap the point count so a huge range at a fine step stays a bounded read
+        start = max(now - range_seconds, now - step * MAX_POINTS)
+        with self.lock:
+            rows = self.conn.execute(
+                'SELECT bucket, min, max, last FROM rollups '
+                'WHERE step = ? AND series = ? AND bucket >= ? ORDER BY bucket',
+                (step, series, start - start % step)).fetchall()
+        return [{'t': bucket, 'min': lo, 'max': hi, 'last': last} for bucket, lo, hi, last in rows]
+
+    def value_at(self, series, ts):
+        """Last recorded value at or before ts from the finest tier that still has it.
+
+        Only buckets that ended by ts count: the bucket containing ts may
+        already hold samples taken after it.
+        """
+        with self.lock:
+            for step in sorted(TIERS):
+                row = self.conn.execute(
+                    'SELECT last FROM rollups WHERE step = ? AND series = ? AND bucket <= ? '
+                    'ORDER BY bucket DESC LIMIT 1', (step, series, ts - step)).fetchone()
+                if row:
+                    return row[0]
+        return None
+
+    def oldest(self, series):
+        with self.lock:
+            row = self.conn.execute(
+                'SELECT bucket, last FROM rollups WHERE step = ? AND series = ? ORDER BY bucket LIMIT 1',
+                (min(TIERS), series)).fetchone()
+        return row
+
+    def change_since(self, series, current, seconds, now=None):
+        """(change, hours covered) of series over the last `seconds`, (None, 0) without history"""
+        now = int(now if now is not None else time.time())
+        past = self.value_at(series, now - seconds)
+        if past is not None:
+            return current - past, seconds / 3600
+        # Not enough history yet: measure from the first sample we have
+        first = self.oldest(series)
+        if first is None:
+            return None, 0
+        return current - first[1], round((now - first[0]) / 3600, 2)
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Higher-timeframe trend columns derived from the 5m candle rings.
+
+1h/4h bars are resampled locally from the pair's 5m ring instead of being
+downloaded as freqtrade informative pairs, so they cost no exchange calls.
+Each resampler consumes only the 5m candles it has not seen yet, closes a
+higher-timeframe bar when its last 5m candle arrives (or the next bucket
+starts) and updates that timeframe's EMA incrementally.
+
+For every new 5m row the values of the latest *closed* bar (no lookahead)
+are written into the row's informative slots in the ring, so merging onto
+the 5m frame is a tail copy of already aligned columns rather than a
+date join over the full history each cycle.
+"""
+import numpy as np
+
+from candle_ring import CandleRing
+
+# timeframe -> EMA period of that timeframe's closes
+DEFAULT_TIMEFRAMES = {'1h': 21, '4h': 9}
+
+TIMEFRAME_MS = {'5m': 300_000, '15m': 900_000, '30m': 1_800_000, '1h': 3_600_000,
+                '2h': 7_200_000, '4h': 14_400_000, '1d': 86_400_000}
+
+
+def informative_columns(timeframes=DEFAULT_TIMEFRAMES):
+    """5m-frame column names added for each timeframe"""
+    return tuple(f'{name}_{tf}' for tf in timeframes for name in ('close', 'ema', 'trend'))
+
+
+class TimeframeResampler:
+    """Closed bars of one higher timeframe for one pair, built from base candles"""
+
+    __slots__ = ('period', 'base', 'alpha', 'bars', 'partial', 'cursor', 'ema')
+
+    def __init__(self, timeframe, ema_period, base_timeframe='5m', capacity=200):
+        self.period = TIMEFRAME_MS[timeframe]
+        self.base = TIMEFRAME_MS[base_timeframe]
+        self.alpha = 2 / (ema_period + 1)
+        self.bars = CandleRing(capacity, ('ema',))
+        self.partial = None   # [bucket, open, high, low, close, volume] of the forming bar
+        self.cursor = None    # newest base timestamp consumed
+        self.ema = None
+
+    def _close_partial(self):
+        bucket, open_, high, low, close, volume = self.partial
+        self.ema = close if self.ema is None else self.ema + self.alpha * (close - self.ema)
+        self.bars.append(bucket, open_, high, low, close, volume)
+        self.bars.set_latest('ema', (self.ema,))
+        self.partial = None
+
+    def consume(self, ts, open_, high, low, close, volume):
+        """Fold one closed base candle in; False if it was already consumed"""
+        if self.cursor is not None and ts <= self.cursor:
+            return False
+        self.cursor = ts
+        bucket = ts - ts % self.period
+        if self.partial is not None and self.partial[0] != bucket:
+            self._close_partial()  # a gap skipped the bucket's last candle
+        if self.partial is None:
+            self.partial = [bucket, open_, high, low, close, volume]
+        else:
+            p = self.partial
+            p[2], p[3], p[4], p[5] = max(p[2], high), min(p[3], low), close, p[5] + volume
+        if ts + self.base >= bucket + self.period:
+            self._close_partial()
+        return True
+
+    def state(self):
+        """(closed bars window, [cursor, ema, *partial]) for a checkpoint; missing values are NaN"""
+        scalars = [np.nan if self.cursor is None else self.cursor, np.nan if self.ema is None else self.ema]
+        scalars += self.partial if self.partial is not None else [np.nan] * 6
+        return self.bars.window(), np.array(scalars, dtype=np.float64)
+
+    def load(self, bars, scalars):
+        """Restore what state() returned"""
+        self.bars.load(bars)
+        cursor, ema, partial = scalars[0], scalars[1], scalars[2:].tolist()
+        self.cursor = None if np.isnan(cursor) else int(cursor)
+        self.ema = None if np.isnan(ema) else float(ema)
+        self.partial = None if np.isnan(partial[0]) else [int(partial[0])] + partial[1:]
+
+    def latest(self):
+        """(close, ema, trend) of the latest closed bar; trend is 1.0 above the EMA, else 0.0"""
+        if not self.bars.size:
+            return (np.nan, np.nan, np.nan)
+        close = self.bars.last('close')
+        return (close, self.ema, 1.0 if close > self.ema else 0.0)
+
+
+class InformativeStore:
+    """Resamplers keyed by pair; fills the informative slots of each pair's 5m ring"""
+
+    __slots__ = ('timeframes', 'base_timeframe', 'columns', 'resamplers')
+
+    def __init__(self, timeframes=DEFAULT_TIMEFRAMES, base_timeframe='5m'):
+        self.timeframes = dict(timeframes)
+        self.base_timeframe = base_timeframe
+        self.columns = informative_columns(self.timeframes)
+        self.resamplers = {}
+
+    def _pair(self, pair):
+        resamplers = self.resamplers.get(pair)
+        if resamplers is None:
+            resamplers = self.resamplers[pair] = [
+                TimeframeResampler(tf, period, self.base_timeframe) for tf, period in self.timeframes.items()]
+        return resamplers
+
+    def update(self, pair, ring):
+        """Consume the ring's unseen 5m candles and write their informative values; returns rows filled"""
+        resamplers = self._pair(pair)
+        dates = ring.view('date')
+        cursor = resamplers[0].cursor
+        start = 0 if cursor is None else int(np.searchsorted(dates, cursor, side='right'))
+        count = len(dates) - start
+        if not count:
+            return 0
+        ohlcv = [ring.view(name)[start:] for name in ('date', 'open', 'high', 'low', 'close', 'volume')]
+        values = np.empty((len(self.columns), count))
+        for i, row in enumerate(zip(*(col.tolist() for col in ohlcv))):
+            ts = int(row[0])
+            for j, resampler in enumerate(resamplers):
+                resampler.consume(ts, *row[1:])
+                values[3 * j:3 * j + 3, i] = resampler.latest()
+        for name, column in zip(self.columns, values):
+            ring.set_latest(name, column)
+        return count
+
+    def merge(self, dataframe, ring):
+        """Copy the ring's informative columns onto the tail of the pair's dataframe"""
+        n = min(len(dataframe), ring.size)
+        for name in self.columns:
+            column = np.full(len(dataframe), np.nan)
+            if n:
+                column[-n:] = ring.view(name)[-n:]
+            dataframe[name] = column
+        return dataframe
+
+    def state(self, pair):
+        """Checkpoint state of pair's resamplers, in timeframe order; None if unseen"""
+        resamplers = self.resamplers.get(pair)
+        return None if resamplers is None else [resampler.state() for resampler in resamplers]
+
+    def load(self, pair, states):
+        for resampler, (bars, scalars) in zip(self._pair(pair), states):
+            resampler.load(bars, scalars)
+
+    def drop(self, pair):
+        self.resamplers.pop(pair, None)
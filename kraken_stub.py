@@ -0,0 +1,638 @@
+#!/usr/bin/env python3
+"""
+Local Kraken stand-in for hermetic load, latency and strategy testing.
+
+Implements the subset of the Kraken REST API that ccxt (and therefore
+freqtrade and web_server.py) calls: AssetPairs, Assets, Time, Ticker, OHLC,
+Depth, Trades, Balance/BalanceEx, AddOrder and the order query endpoints.
+Prices are a deterministic function of time, so two runs with the same seed
+see the same market.
+
+Point the bot at it with the KRAKEN_STUB_URL environment variable:
+
+    python kraken_stub.py --port 8765 --latency-ms 50 --error-rate 0.05 &
+    KRAKEN_STUB_URL=http://127.0.0.1:8765 python web_server.py
+
+Latency, error injection and rate limiting can be changed at runtime by
+POSTing JSON to /_stub/config; call counters are served at /_stub/stats.
+
+A Kraken WebSocket v2 stand-in (ticker and ohlc channels) is served on the
+same port at /ws/v2, see market_data.py.
+"""
+import argparse
+import hashlib
+import json
+import math
+import os
+import random
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from datetime import datetime, timezone
+from urllib.parse import urlparse, parse_qs
+
+from websocket_lite import WebSocket, WebSocketClosed
+
+STUB_API_KEY = 'stub-api-key'
+STUB_SECRET = 'c3R1Yi1zZWNyZXQ='  # base64("stub-secret"), ccxt decodes the secret
+WS_PATH = '/ws/v2'
+
+# symbol -> (pair id, altname, base id, quote id, reference price, price decimals)
+MARKETS = {
+    'BTC/USD': ('XXBTZUSD', 'XBTUSD', 'XXBT', 'ZUSD', 65000.0, 1),
+    'ETH/USD': ('XETHZUSD', 'ETHUSD', 'XETH', 'ZUSD', 3200.0, 2),
+    'SOL/USD': ('SOLUSD', 'SOLUSD', 'SOL', 'ZUSD', 150.0, 2),
+    'ADA/USD': ('ADAUSD', 'ADAUSD', 'ADA', 'ZUSD', 0.45, 6),
+    'AVAX/USD': ('AVAXUSD', 'AVAXUSD', 'AVAX', 'ZUSD', 35.0, 2),
+    'TAO/USD': ('TAOUSD', 'TAOUSD', 'TAO', 'ZUSD', 420.0, 2),
+    'NEAR/USD': ('NEARUSD', 'NEARUSD', 'NEAR', 'ZUSD', 5.5, 3),
+    'RLUSD/USD': ('RLUSDUSD', 'RLUSDUSD', 'RLUSD', 'ZUSD', 1.0, 4),
+    'XLM/USD': ('XXLMZUSD', 'XLMUSD', 'XXLM', 'ZUSD', 0.11, 6),
+    'ONDO/USD': ('ONDOUSD', 'ONDOUSD', 'ONDO', 'ZUSD', 0.8449, 4),
+    'CPOOL/USD': ('CPOOLUSD', 'CPOOLUSD', 'CPOOL', 'ZUSD', 0.1312, 5),
+}
+
+DEFAULT_BALANCES = {
+    'ZUSD': 14.93,
+    'CPOOL': 228.699,
+    'ONDO': 28.407,
+}
+
+# Private endpoints that cost 2 on Kraken's call counter instead of 1
+HEAVY_PRIVATE_CALLS = {'Ledgers', 'QueryLedgers', 'TradesHistory', 'QueryTrades'}
+# Trading endpoints use Kraken's separate matching-engine limiter
+ORDER_CALLS = {'AddOrder', 'CancelOrder', 'CancelAll', 'EditOrder'}
+
+
+def stub_url():
+    """Return the stub base URL from KRAKEN_STUB_URL, or None for live Kraken"""
+    url = os.getenv('KRAKEN_STUB_URL', '').strip()
+    return url.rstrip('/') or None
+
+
+def stub_ccxt_overrides(url=None):
+    """ccxt constructor settings that redirect a kraken instance to the stub"""
+    url = url or stub_url()
+    if not url:
+        return {}
+    return {'urls': {'api': {'public': url, 'private': url}}}
+
+
+def stub_ws_url(url=None):
+    """WebSocket v2 endpoint of the stub, or None for live Kraken"""
+    url = url or stub_url()
+    if not url:
+        return None
+    return url.replace('https://', 'wss://').replace('http://', 'ws://') + WS_PATH
+
+
+def stub_credentials():
+    """API credentials for the stub; used instead of any real keys whenever a stub URL is set"""
+    return STUB_API_KEY, STUB_SECRET
+
+
+def apply_stub_to_config(config, url=None):
+    """Redirect a freqtrade config dict to the stub; returns True when applied"""
+    overrides = stub_ccxt_overrides(url)
+    if not overrides:
+        return False
+    exchange = config['exchange']
+    exchange.setdefault('ccxt_config', {}).update(overrides)
+    # Real keys must not sign requests to (or be sent as API-Key to) whatever host the URL names
+    exchange['key'], exchange['secret'] = stub_credentials()
+    return True
+
+
+class StubConfig:
+    """Mutable knobs shared by all request threads"""
+
+    FIELDS = ('latency_ms', 'jitter_ms', 'error_rate', 'timeout_rate',
+              'counter_max', 'counter_decay', 'public_rps', 'seed',
+              'ws_interval', 'ws_disconnect_secs')
+
+    def __init__(self, latency_ms=0.0, jitter_ms=0.0, error_rate=0.0, timeout_rate=0.0,
+                 counter_max=15.0, counter_decay=0.33, public_rps=0.0, seed=42,
+                 ws_interval=1.0, ws_disconnect_secs=0.0):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.timeout_rate = timeout_rate
+        self.counter_max = counter_max
+        self.counter_decay = counter_decay
+        self.public_rps = public_rps
+        self.seed = seed
+        self.ws_interval = ws_interval
+        self.ws_disconnect_secs = ws_disconnect_secs
+
+    def update(self, values):
+        for key, value in values.items():
+            if key in self.FIELDS:
+                setattr(self, key, type(getattr(self, key))(value))
+
+    def as_dict(self):
+        return {key: getattr(self, key) for key in self.FIELDS}
+
+
+class KrakenStubState:
+    """Balances, orders, rate-limit counters and call statistics"""
+
+    def __init__(self, config, balances=None, clock=None, market=None):
+        self.config = config
+        self.clock = clock or time.time
+        self.market = market   # recorded candles replacing the price model, see replay.py
+        self.lock = threading.Lock()
+        self.balances = dict(balances or DEFAULT_BALANCES)
+        self.orders = {}
+        self.order_seq = 0
+        self.counter = 0.0
+        self.counter_ts = time.monotonic()
+        self.public_window = []
+        self.calls = {}
+        self.errors = {}
+        self.rng = random.Random(config.seed)
+
+    def now(self):
+        """Exchange clock in seconds (virtual when replaying)"""
+        return self.clock()
+
+    # --- market model -------------------------------------------------
+
+    def price_at(self, symbol, ts):
+        """Deterministic price for symbol at unix time ts"""
+        if self.market is not None and symbol in self.market:
+            return round(self.market.price_at(symbol, ts), MARKETS[symbol][5])
+        ref = MARKETS[symbol][4]
+        digest = hashlib.sha256(f"{self.config.seed}:{symbol}".encode()).digest()
+        phase_day = digest[0] / 255 * 2 * math.pi
+        phase_hour = digest[1] / 255 * 2 * math.pi
+        noise = hashlib.sha256(f"{symbol}:{int(ts // 10)}".encode()).digest()[0] / 255 - 0.5
+        drift = (0.04 * math.sin(2 * math.pi * ts / 86400 + phase_day)
+                 + 0.012 * math.sin(2 * math.pi * ts / 3600 + phase_hour)
+                 + 0.002 * noise)
+        return round(ref * (1 + drift), MARKETS[symbol][5])
+
+    def candle(self, symbol, start, interval):
+        """[time, open, high, low, close, vwap, volume, count] for one candle"""
+        decimals = MARKETS[symbol][5]
+        if self.market is not None and symbol in self.market:
+            samples, volume = self.market.candle(symbol, start, interval, self.now())
+        else:
+            samples = [self.price_at(symbol, start + interval * i / 6) for i in range(7)]
+            volume = 50 + (hashlib.sha256(f"{symbol}:{start}".encode()).digest()[0])
+        close = samples[-1] if start + interval <= self.now() else self.price_at(symbol, self.now())
+        samples[-1] = close
+        vwap = sum(samples) / len(samples)
+        return [int(start), f"{samples[0]:.{decimals}f}", f"{max(samples):.{decimals}f}",
+                f"{min(samples):.{decimals}f}", f"{close:.{decimals}f}",
+                f"{vwap:.{decimals}f}", f"{volume:.8f}", int(volume)]
+
+    def ticker(self, symbol):
+        now = self.now()
+        decimals = MARKETS[symbol][5]
+        last = self.price_at(symbol, now)
+        spread = max(last * 0.0005, 10 ** -decimals)
+        day = [self.price_at(symbol, now - 86400 + i * 3600) for i in range(25)]
+        fmt = lambda v: f"{v:.{decimals}f}"
+        return {
+            'a': [fmt(last + spread / 2), '1', '1.000'],
+            'b': [fmt(last - spread / 2), '1', '1.000'],
+            'c': [fmt(last), '0.10000000'],
+            'v': ['1200.00000000', '2400.00000000'],
+            'p': [fmt(sum(day) / len(day)), fmt(sum(day) / len(day))],
+            't': [800, 1600],
+            'l': [fmt(min(day)), fmt(min(day))],
+            'h': [fmt(max(day)), fmt(max(day))],
+            'o': fmt(day[0]),
+        }
+
+    def depth(self, symbol, count):
+        now = self.now()
+        decimals = MARKETS[symbol][5]
+        last = self.price_at(symbol, now)
+        step = max(last * 0.0005, 10 ** -decimals)
+        asks = [[f"{last + step * (i + 0.5):.{decimals}f}", f"{1 + i:.3f}", int(now)] for i in range(count)]
+        bids = [[f"{last - step * (i + 0.5):.{decimals}f}", f"{1 + i:.3f}", int(now)] for i in range(count)]
+        return {'asks': asks, 'bids': bids}
+
+    # --- fault model --------------------------------------------------
+
+    def record_call(self, name):
+        with self.lock:
+            self.calls[name] = self.calls.get(name, 0) + 1
+
+    def record_error(self, name):
+        with self.lock:
+            self.errors[name] = self.errors.get(name, 0) + 1
+
+    def charge_private(self, method):
+        """Apply Kraken's decaying call counter; False when the call is rejected"""
+        if method in ORDER_CALLS:
+            return True
+        cost = 2 if method in HEAVY_PRIVATE_CALLS else 1
+        with self.lock:
+            now = time.monotonic()
+            self.counter = max(0.0, self.counter - (now - self.counter_ts) * self.config.counter_decay)
+            self.counter_ts = now
+            if self.counter + cost > self.config.counter_max:
+                return False
+            self.counter += cost
+            return True
+
+    def charge_public(self):
+        if self.config.public_rps <= 0:
+            return True
+        with self.lock:
+            now = time.monotonic()
+            self.public_window = [t for t in self.public_window if now - t < 1.0]
+            if len(self.public_window) >= self.config.public_rps:
+                return False
+            self.public_window.append(now)
+            return True
+
+    def inject_delay(self):
+        config = self.config
+        delay = config.latency_ms
+        if config.jitter_ms:
+            delay += self.rng.uniform(0, config.jitter_ms)
+        if delay > 0:
+            time.sleep(delay / 1000)
+
+    def roll(self, rate):
+        return rate > 0 and self.rng.random() < rate
+
+    # --- account model ------------------------------------------------
+
+    def add_order(self, params):
+        pair = params.get('pair', '')
+        symbol = symbol_for_pair(pair)
+        if symbol is None:
+            raise StubError('EQuery:Unknown asset pair')
+        side = params.get('type')
+        volume = float(params.get('volume', 0))
+        price = self.price_at(symbol, self.now())
+        if params.get('ordertype', 'market') == 'limit' and params.get('price'):
+            price = float(params['price'])
+        base = MARKETS[symbol][2]
+        cost = volume * price
+        with self.lock:
+            if side == 'buy':
+                if self.balances.get('ZUSD', 0) < cost:
+                    raise StubError('EOrder:Insufficient funds')
+                self.balances['ZUSD'] = self.balances.get('ZUSD', 0) - cost
+                self.balances[base] = self.balances.get(base, 0) + volume
+            else:
+                if self.balances.get(base, 0) < volume:
+                    raise StubError('EOrder:Insufficient funds')
+                self.balances[base] = self.balances.get(base, 0) - volume
+                self.balances['ZUSD'] = self.balances.get('ZUSD', 0) + cost
+            self.order_seq += 1
+            txid = f"OSTUB{self.order_seq:05d}-{self.order_seq:05d}-STUB{self.order_seq:02d}"
+            now = self.now()
+            self.orders[txid] = {
+                'refid': None, 'userref': 0, 'status': 'closed',
+                'opentm': now, 'closetm': now, 'starttm': 0, 'expiretm': 0,
+                'descr': {'pair': MARKETS[symbol][1], 'type': side,
+                          'ordertype': params.get('ordertype', 'market'),
+                          'price': f"{price}", 'price2': '0', 'leverage': 'none',
+                          'order': f"{side} {volume} {MARKETS[symbol][1]} @ {params.get('ordertype', 'market')}"},
+                'vol': f"{volume}", 'vol_exec': f"{volume}", 'cost': f"{cost}",
+                'fee': f"{cost * 0.0026}", 'price': f"{price}", 'misc': '', 'oflags': 'fciq',
+            }
+            descr = self.orders[txid]['descr']['order']
+        return {'descr': {'order': descr}, 'txid': [txid]}
+
+
+class StubError(Exception):
+    """A Kraken-style error string returned in the response envelope"""
+
+
+def iso_timestamp(ts):
+    return datetime.fromtimestamp(ts, timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.%f') + '000Z'
+
+
+def symbol_for_pair(pair_id):
+    """Symbol for a pair id, altname, symbol or slashed altname (XBT/USD)"""
+    for symbol, spec in MARKETS.items():
+        # Split the altname on its quote suffix only: RLUSDUSD is RLUSD/USD
+        quote = symbol.split('/')[1]
+        slashed = f"{spec[1][:-len(quote)]}/{quote}"
+        if pair_id in (spec[0], spec[1], symbol, slashed):
+            return symbol
+    return None
+
+
+def asset_pairs():
+    result = {}
+    for symbol, (pair_id, altname, base, quote, ref, decimals) in MARKETS.items():
+        result[pair_id] = {
+            'altname': altname, 'wsname': symbol.replace('BTC', 'XBT'),
+            'aclass_base': 'currency', 'base': base,
+            'aclass_quote': 'currency', 'quote': quote,
+            'lot': 'unit', 'cost_decimals': 5, 'pair_decimals': decimals, 'lot_decimals': 8,
+            'lot_multiplier': 1, 'leverage_buy': [], 'leverage_sell': [],
+            'fees': [[0, 0.26], [50000, 0.24]], 'fees_maker': [[0, 0.16], [50000, 0.14]],
+            'fee_volume_currency': 'ZUSD', 'margin_call': 80, 'margin_stop': 40,
+            'ordermin': f"{max(0.5 / ref, 10 ** -8):.8f}", 'costmin': '0.5',
+            'tick_size': f"{10 ** -decimals:.{decimals}f}", 'status': 'online',
+        }
+    return result
+
+
+def assets():
+    result = {'ZUSD': {'aclass': 'currency', 'altname': 'USD', 'decimals': 4,
+                       'display_decimals': 2, 'status': 'enabled'}}
+    for symbol, spec in MARKETS.items():
+        result[spec[2]] = {'aclass': 'currency', 'altname': symbol.split('/')[0].replace('BTC', 'XBT'),
+                           'decimals': 10, 'display_decimals': 5, 'status': 'enabled'}
+    return result
+
+
+class KrakenStubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        if urlparse(self.path).path == WS_PATH:
+            self.serve_websocket()
+            return
+        self.dispatch(parse_qs(urlparse(self.path).query))
+
+    def serve_websocket(self):
+        """Kraken WebSocket v2 ticker/ohlc feed driven by the same price model"""
+        state = self.server.state
+        ws = WebSocket.accept(self)
+        self.close_connection = True
+        if ws is None:
+            self.send_json(400, {'error': ['EGeneral:Invalid arguments'], 'result': {}})
+            return
+        state.record_call('ws')
+        subscriptions = {'ticker': set(), 'ohlc': set()}
+        lock = threading.Lock()
+        stopped = threading.Event()
+
+        def reader():
+            try:
+                while not stopped.is_set():
+                    message = json.loads(ws.recv())
+                    if message.get('method') != 'subscribe':
+                        continue
+                    params = message.get('params', {})
+                    channel = params.get('channel')
+                    symbols = [s for s in params.get('symbol', []) if s in MARKETS]
+                    if channel not in subscriptions:
+                        continue
+                    with lock:
+                        subscriptions[channel].update(symbols)
+                        for symbol in symbols:
+                            ws.send_text(json.dumps({'method': 'subscribe', 'success': True,
+                                                     'result': {'channel': channel, 'symbol': symbol}}))
+                        ws.send_text(json.dumps(self.ws_message(channel, 'snapshot', symbols)))
+            except (WebSocketClosed, OSError, ValueError):
+                pass
+            finally:
+                stopped.set()
+
+        ws.send_text(json.dumps({'channel': 'status', 'type': 'update', 'data': [
+            {'system': 'online', 'api_version': 'v2', 'connection_id': id(ws), 'version': 'stub'}]}))
+        threading.Thread(target=reader, daemon=True).start()
+        opened = time.monotonic()
+        try:
+            while not stopped.wait(state.config.ws_interval):
+                if state.config.ws_disconnect_secs and time.monotonic() - opened > state.config.ws_disconnect_secs:
+                    break
+                with lock:
+                    for channel, symbols in subscriptions.items():
+                        if symbols:
+                            ws.send_text(json.dumps(self.ws_message(channel, 'update', sorted(symbols))))
+                    ws.send_text(json.dumps({'channel': 'heartbeat'}))
+        except (WebSocketClosed, OSError):
+            pass
+        finally:
+            stopped.set()
+            ws.close()
+
+    def ws_message(self, channel, kind, symbols):
+        state = self.server.state
+        now = state.now()
+        data = []
+        for symbol in symbols:
+            if channel == 'ticker':
+                t = state.ticker(symbol)
+                data.append({'symbol': symbol, 'bid': float(t['b'][0]), 'bid_qty': 1.0,
+                             'ask': float(t['a'][0]), 'ask_qty': 1.0, 'last': float(t['c'][0]),
+                             'volume': float(t['v'][1]), 'vwap': float(t['p'][1]),
+                             'low': float(t['l'][1]), 'high': float(t['h'][1]),
+                             'change': float(t['c'][0]) - float(t['o']),
+                             'change_pct': round((float(t['c'][0]) / float(t['o']) - 1) * 100, 2)})
+                continue
+            newest = int(now // 300) * 300
+            starts = range(newest - 300 * 9, newest + 1, 300) if kind == 'snapshot' else [newest]
+            for start in starts:
+                c = state.candle(symbol, start, 300)
+                data.append({'symbol': symbol, 'open': float(c[1]), 'high': float(c[2]),
+                             'low': float(c[3]), 'close': float(c[4]), 'vwap': float(c[5]),
+                             'volume': float(c[6]), 'trades': c[7], 'interval': 5,
+                             'interval_begin': iso_timestamp(start), 'timestamp': iso_timestamp(now)})
+        return {'channel': channel, 'type': kind, 'data': data}
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        raw = self.rfile.read(length).decode() if length else ''
+        path = urlparse(self.path).path
+        if path == '/_stub/config':
+            self.server.state.config.update(json.loads(raw or '{}'))
+            self.send_json(200, self.server.state.config.as_dict())
+            return
+        if raw.startswith('{'):
+            params = json.loads(raw)
+        else:
+            params = parse_qs(raw)
+        self.dispatch(params)
+
+    def dispatch(self, params):
+        state = self.server.state
+        path = urlparse(self.path).path
+        params = {k: (v[0] if isinstance(v, list) else v) for k, v in params.items()}
+
+        if path == '/_stub/stats':
+            with state.lock:
+                body = {'calls': dict(state.calls), 'errors': dict(state.errors),
+                        'counter': round(state.counter, 3), 'config': state.config.as_dict()}
+            self.send_json(200, body)
+            return
+
+        parts = path.strip('/').split('/')
+        if len(parts) != 3 or parts[0] != '0' or parts[1] not in ('public', 'private'):
+            self.send_json(404, {'error': ['EGeneral:Unknown method'], 'result': {}})
+            return
+        api, method = parts[1], parts[2]
+        state.record_call(method)
+        state.inject_delay()
+
+        if state.roll(state.config.timeout_rate):
+            # Hold the connection long enough for the client timeout to fire
+            state.record_error(method)
+            time.sleep(60)
+            return
+        if state.roll(state.config.error_rate):
+            state.record_error(method)
+            self.send_json(503, {'error': ['EService:Unavailable'], 'result': {}})
+            return
+        allowed = state.charge_public() if api == 'public' else state.charge_private(method)
+        if not allowed:
+            state.record_error(method)
+            self.send_json(200, {'error': ['EAPI:Rate limit exceeded'], 'result': {}})
+            return
+
+        try:
+            result = self.handle_method(api, method, params)
+        except StubError as e:
+            state.record_error(method)
+            self.send_json(200, {'error': [str(e)], 'result': {}})
+            return
+        self.send_json(200, {'error': [], 'result': result})
+
+    def handle_method(self, api, method, params):
+        state = self.server.state
+        now = state.now()
+
+        if api == 'public':
+            if method == 'Time':
+                return {'unixtime': int(now), 'rfc1123': time.strftime('%a, %d %b %y %H:%M:%S +0000', time.gmtime(now))}
+            if method == 'SystemStatus':
+                return {'status': 'online', 'timestamp': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(now))}
+            if method == 'Assets':
+                return assets()
+            if method == 'AssetPairs':
+                return asset_pairs()
+            if method == 'Ticker':
+                pairs = params.get('pair')
+                symbols = [symbol_for_pair(p) for p in pairs.split(',')] if pairs else list(MARKETS)
+                if None in symbols:
+                    raise StubError('EQuery:Unknown asset pair')
+                return {MARKETS[s][0]: state.ticker(s) for s in symbols}
+            if method == 'OHLC':
+                symbol = self.require_symbol(params)
+                interval = int(params.get('interval', 1)) * 60
+                newest = int(now // interval) * interval
+                oldest = newest - interval * 719
+                if params.get('since'):
+                    oldest = max(oldest, (int(float(params['since'])) // interval + 1) * interval)
+                candles = [state.candle(symbol, t, interval) for t in range(oldest, newest + 1, interval)]
+                return {MARKETS[symbol][0]: candles, 'last': newest - interval}
+            if method == 'Depth':
+                symbol = self.require_symbol(params)
+                return {MARKETS[symbol][0]: state.depth(symbol, min(int(params.get('count', 100)), 500))}
+            if method == 'Trades':
+                symbol = self.require_symbol(params)
+                since = float(params.get('since', now - 600))
+                if since > 1e12:
+                    since /= 1e9
+                trades = []
+                ts = max(since, now - 3600)
+                while ts < now and len(trades) < 1000:
+                    side = 'b' if int(ts) % 2 else 's'
+                    trades.append([f"{state.price_at(symbol, ts)}", '0.50000000', round(ts, 4), side, 'l', '', len(trades) + 1])
+                    ts += 7.5
+                return {MARKETS[symbol][0]: trades, 'last': str(int(ts * 1e9))}
+            raise StubError('EGeneral:Unknown method')
+
+        if method == 'Balance':
+            with state.lock:
+                return {asset: f"{amount:.8f}" for asset, amount in state.balances.items()}
+        if method == 'BalanceEx':
+            with state.lock:
+                return {asset: {'balance': f"{amount:.8f}", 'hold_trade': '0.00000000'}
+                        for asset, amount in state.balances.items()}
+        if method == 'AddOrder':
+            return state.add_order(params)
+        if method == 'OpenOrders':
+            return {'open': {}}
+        if method == 'ClosedOrders':
+            with state.lock:
+                return {'closed': dict(state.orders), 'count': len(state.orders)}
+        if method == 'QueryOrders':
+            txids = params.get('txid', '').split(',')
+            with state.lock:
+                return {txid: state.orders[txid] for txid in txids if txid in state.orders}
+        if method == 'CancelOrder':
+            return {'count': 0}
+        if method == 'TradesHistory':
+            return {'trades': {}, 'count': 0}
+        if method == 'TradeVolume':
+            return {'currency': 'ZUSD', 'volume': '0.0000', 'fees': {}, 'fees_maker': {}}
+        raise StubError('EGeneral:Unknown method')
+
+    def require_symbol(self, params):
+        symbol = symbol_for_pair(params.get('pair', ''))
+        if symbol is None:
+            raise StubError('EQuery:Unknown asset pair')
+        return symbol
+
+    def send_json(self, code, body):
+        data = json.dumps(body).encode()
+        try:
+            self.send_response(code)
+            self.send_header('Content-type', 'application/json')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def log_message(self, format, *args):
+        pass
+
+
+class KrakenStubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, config=None, balances=None, clock=None, market=None):
+        super().__init__(address, KrakenStubHandler)
+        self.state = KrakenStubState(config or StubConfig(), balances, clock, market)
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+
+def start_stub(host='127.0.0.1', port=0, config=None, balances=None, clock=None, market=None):
+    """Start a stub in a background thread and return the server (use .url)"""
+    server = KrakenStubServer((host, port), config, balances, clock, market)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local Kraken REST stand-in")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency-ms', type=float, default=0.0, help="fixed delay added to every call")
+    parser.add_argument('--jitter-ms', type=float, default=0.0, help="uniform random extra delay")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="fraction of calls answered 503")
+    parser.add_argument('--timeout-rate', type=float, default=0.0, help="fraction of calls that hang for 60s")
+    parser.add_argument('--counter-max', type=float, default=15.0, help="Kraken private call counter ceiling")
+    parser.add_argument('--counter-decay', type=float, default=0.33, help="counter decay per second")
+    parser.add_argument('--public-rps', type=float, default=0.0, help="public calls per second (0 = unlimited)")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--ws-interval', type=float, default=1.0, help="seconds between WebSocket updates")
+    parser.add_argument('--ws-disconnect-secs', type=float, default=0.0,
+                        help="drop WebSocket clients after this many seconds (0 = never)")
+    args = parser.parse_args()
+
+    config = StubConfig(args.latency_ms, args.jitter_ms, args.error_rate, args.timeout_rate,
+                        args.counter_max, args.counter_decay, args.public_rps, args.seed,
+                        args.ws_interval, args.ws_disconnect_secs)
+    server = KrakenStubServer((args.host, args.port), config)
+    print(f"🧪 Kraken stub listening on {server.url}")
+    print(f"   export KRAKEN_STUB_URL={server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n🛑 Shutting down stub...")
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+Per-pair DCA, P&L and entry-latency aggregates from the bot's log files.
+
+Log files are memory-mapped and searched for the markers of the strategy's
+own line formats (ENTRY SIGNAL, DCA CHECK, "<tier> DCA: Adding", BUY
+CONFIRMED, PROFIT, LOSS); only lines containing a marker are sliced out and
+parsed, everything else (most of a -vvv log) is skipped inside the regex
+engine. Lines flow through a generator pipeline (scan -> parse ->
+aggregate) and memory stays bounded by the number of pairs, not the size
+of the log.
+
+The byte offset reached in each file is saved, together with the
+aggregates, in an index file; the next run only scans bytes appended since.
+A file that shrank or was replaced (new inode) is rescanned from the start.
+
+    python log_analytics.py                      # bot.log + freqtrade.log
+    python log_analytics.py --pair BTC/USD --json
+    python log_analytics.py --reset              # ignore the saved index
+"""
+import argparse
+import json
+import mmap
+import os
+import re
+from datetime import datetime
+
+DEFAULT_LOGS = ('user_data/logs/bot.log', 'user_data/logs/freqtrade.log')
+INDEX_FILE = 'user_data/logs/log_analytics_index.json'
+
+MARKER = re.compile(rb'ENTRY SIGNAL: |DCA CHECK: | DCA: Adding |BUY CONFIRMED: |PROFIT: |LOSS: ')
+LINE = re.compile(
+    rb'(?P<ts>\d{4}-\d\d-\d\d \d\d:\d\d:\d\d)[,.](?P<ms>\d{3}) - .*?'
+    rb'(?:ENTRY SIGNAL: (?P<signal>\S+) @'
+    rb'|DCA CHECK: (?P<check>\S+) \|'
+    rb'|(?P<tier>[A-Z]+) DCA: Adding \$(?P<stake>[\d.]+) to (?P<dca>\S+)'
+    rb'|BUY CONFIRMED: (?P<buy>\S+) \| [\d.]+ @ \$[\d.]+ = \$(?P<value>[\d.]+)'
+    rb'|(?:PROFIT|LOSS): (?P<exit>\S+) \| SOLD [^|]*\| [+-]?[\d.]+% \(\+?\$(?P<pnl>-?[\d.]+)\))')
+
+
+def epoch(ts, ms):
+    return datetime.strptime(ts.decode(), '%Y-%m-%d %H:%M:%S').timestamp() + int(ms) / 1000
+
+
+def scan(path, start):
+    """Complete lines after byte `start` that contain a marker; yields (line, end offset)"""
+    with open(path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if size <= start:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            # Stop at the last newline: a line still being written is picked up next run
+            end = mm.rfind(b'\n', start, size) + 1
+            if end <= start:
+                return
+            pos = start
+            while True:
+                marker = MARKER.search(mm, pos, end)
+                if marker is None:
+                    break
+                line_start = mm.rfind(b'\n', start, marker.start()) + 1
+                line_end = mm.find(b'\n', marker.end(), end)
+                yield mm[line_start:line_end], end
+                pos = line_end + 1
+            yield None, end
+
+
+def parse(lines):
+    """Marker lines -> (kind, pair, timestamp, value) records"""
+    for line, end in lines:
+        if line is None:
+            yield 'eof', None, None, end
+            continue
+        match = LINE.match(line)
+        if match is None:
+            continue
+        g = match.groupdict()
+        if g['signal']:
+            yield 'signal', g['signal'].decode(), epoch(g['ts'], g['ms']), None
+        elif g['check']:
+            yield 'check', g['check'].decode(), None, None
+        elif g['dca']:
+            yield 'dca', g['dca'].decode(), None, (g['tier'].decode(), float(g['stake']))
+        elif g['buy']:
+            yield 'buy', g['buy'].decode(), epoch(g['ts'], g['ms']), float(g['value'])
+        elif g['exit']:
+            yield 'exit', g['exit'].decode(), None, float(g['pnl'])
+
+
+def new_pair_stats():
+    return {'signals': 0, 'dca_checks': 0, 'dca_adds': 0, 'dca_stake': 0.0, 'dca_tiers': {},
+            'buys': 0, 'buy_value': 0.0, 'exits': 0, 'wins': 0, 'losses': 0, 'realized_pnl': 0.0,
+            'latency_sum': 0.0, 'latency_count': 0, 'latency_max': 0.0, 'last_signal': None}
+
+
+def aggregate(records, pairs):
+    """Fold records into per-pair stats in place; returns the offset reached"""
+    offset = None
+    for kind, pair, ts, value in records:
+        if kind == 'eof':
+            offset = value
+            continue
+        stats = pairs.get(pair)
+        if stats is None:
+            stats = pairs[pair] = new_pair_stats()
+        if kind == 'signal':
+            stats['signals'] += 1
+            stats['last_signal'] = ts
+        elif kind == 'check':
+            stats['dca_checks'] += 1
+        elif kind == 'dca':
+            tier, stake = value
+            stats['dca_adds'] += 1
+            stats['dca_stake'] += stake
+            stats['dca_tiers'][tier] = stats['dca_tiers'].get(tier, 0) + 1
+        elif kind == 'buy':
+            stats['buys'] += 1
+            stats['buy_value'] += value
+            # Entry latency: latest ENTRY SIGNAL for the pair -> its BUY CONFIRMED
+            if stats['last_signal'] is not None and ts >= stats['last_signal']:
+                latency = ts - stats['last_signal']
+                stats['latency_sum'] += latency
+                stats['latency_count'] += 1
+                stats['latency_max'] = max(stats['latency_max'], latency)
+                stats['last_signal'] = None
+        elif kind == 'exit':
+            stats['exits'] += 1
+            stats['realized_pnl'] += value
+            stats['wins' if value > 0 else 'losses'] += 1
+    return offset
+
+
+def load_index(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_index(path, index):
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, 'w') as f:
+        json.dump(index, f)
+    os.replace(tmp, path)
+
+
+def update(paths, index):
+    """Scan the new bytes of each log into the index; returns bytes scanned per file"""
+    scanned = {}
+    for path in paths:
+        if not os.path.exists(path):
+            continue
+        st = os.stat(path)
+        entry = index.get(path)
+        if entry is None or entry['inode'] != st.st_ino or st.st_size < entry['offset']:
+            entry = index[path] = {'inode': st.st_ino, 'offset': 0, 'pairs': {}}
+        start = entry['offset']
+        offset = aggregate(parse(scan(path, start)), entry['pairs'])
+        if offset is not None:
+            entry['offset'] = offset
+        scanned[path] = entry['offset'] - start
+    return scanned
+
+
+def combine(index, paths, pair=None):
+    """Merge per-file stats of `paths` into one per-pair summary"""
+    totals = {}
+    for path in paths:
+        for name, stats in index.get(path, {}).get('pairs', {}).items():
+            if pair and name != pair:
+                continue
+            total = totals.setdefault(name, new_pair_stats())
+            for key, value in stats.items():
+                if key == 'dca_tiers':
+                    for tier, count in value.items():
+                        total['dca_tiers'][tier] = total['dca_tiers'].get(tier, 0) + count
+                elif key == 'latency_max':
+                    total[key] = max(total[key], value)
+                elif key != 'last_signal':
+                    total[key] += value
+    summary = {}
+    for name, t in sorted(totals.items()):
+        summary[name] = {
+            'signals': t['signals'], 'dca_checks': t['dca_checks'], 'dca_adds': t['dca_adds'],
+            'dca_stake': round(t['dca_stake'], 2), 'dca_tiers': t['dca_tiers'],
+            'buys': t['buys'], 'buy_value': round(t['buy_value'], 2),
+            'exits': t['exits'], 'wins': t['wins'], 'losses': t['losses'],
+            'realized_pnl': round(t['realized_pnl'], 4),
+            'entry_latency_avg': round(t['latency_sum'] / t['latency_count'], 3) if t['latency_count'] else None,
+            'entry_latency_max': round(t['latency_max'], 3) if t['latency_count'] else None,
+        }
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-pair DCA / P&L / entry latency from the bot logs")
+    parser.add_argument('logs', nargs='*', default=list(DEFAULT_LOGS))
+    parser.add_argument('--index', default=INDEX_FILE, help="offset index file")
+    parser.add_argument('--reset', action='store_true', help="rescan the logs from the start")
+    parser.add_argument('--pair')
+    parser.add_argument('--json', action='store_true', help="print the summary as JSON")
+    args = parser.parse_args()
+
+    index = {} if args.reset else load_index(args.index)
+    scanned = update(args.logs, index)
+    save_index(args.index, index)
+    summary = combine(index, args.logs, args.pair)
+
+    if args.json:
+        print(json.dumps(summary, indent=2))
+        return
+    for path, size in scanned.items():
+        print(f"📄 {path}: scanned {size / 1e6:.1f} MB new, {index[path]['offset'] / 1e6:.1f} MB indexed")
+    print(f"{'pair':<12}{'signals':>8}{'checks':>8}{'DCA':>5}{'DCA $':>9}{'buys':>6}"
+          f"{'exits':>6}{'W/L':>12}{'P&L $':>10}{'lat avg s':>10}{'lat max s':>10}")
+    for name, s in summary.items():
+        latency_avg = f"{s['entry_latency_avg']:.2f}" if s['entry_latency_avg'] is not None else '-'
+        latency_max = f"{s['entry_latency_max']:.2f}" if s['entry_latency_max'] is not None else '-'
+        win_loss = f"{s['wins']}/{s['losses']}"
+        print(f"{name:<12}{s['signals']:>8}{s['dca_checks']:>8}{s['dca_adds']:>5}{s['dca_stake']:>9.2f}"
+              f"{s['buys']:>6}{s['exits']:>6}{win_loss:>12}{s['realized_pnl']:>10.2f}"
+              f"{latency_avg:>10}{latency_max:>10}")
+    tiers = {}
+    for s in summary.values():
+        for tier, count in s['dca_tiers'].items():
+            tiers[tier] = tiers.get(tier, 0) + count
+    if tiers:
+        print("DCA tiers: " + ', '.join(f"{tier} {count}" for tier, count in sorted(tiers.items())))
+
+
+if __name__ == "__main__":
+    main()
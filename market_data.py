@@ -0,0 +1,347 @@
+#!/usr/bin/env python3
+"""
+Kraken WebSocket market-data feed.
+
+Subscribes to the v2 ticker and 5m ohlc channels for the whitelisted pairs,
+keeps a latest-price table and rolling candles in memory, and serves them to
+get_live_trading_stats and over a small local pull API. REST is only used to
+backfill candles after a (re)connect or when the feed skips an interval.
+
+    python market_data.py --port 8766        # standalone pull API
+    curl localhost:8766/prices
+    curl 'localhost:8766/candles?pair=BTC/USD&limit=50'
+
+With KRAKEN_STUB_URL set the feed connects to the stub's /ws/v2 endpoint.
+"""
+import argparse
+import json
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+import kraken_stub
+from websocket_lite import WebSocket, WebSocketClosed
+
+KRAKEN_WS_URL = 'wss://ws.kraken.com/v2'
+CANDLE_SECONDS = 300
+MAX_CANDLES = 720
+
+
+def parse_iso(value):
+    """Kraken's nanosecond ISO timestamps -> unix seconds"""
+    return datetime.strptime(value[:19], '%Y-%m-%dT%H:%M:%S').replace(tzinfo=timezone.utc).timestamp()
+
+
+def feed_url():
+    return kraken_stub.stub_ws_url() or os.getenv('KRAKEN_WS_URL', KRAKEN_WS_URL)
+
+
+class CandleBuilder:
+    """Rolling candles for one pair as [ms, open, high, low, close, volume] rows"""
+
+    def __init__(self, interval=CANDLE_SECONDS, maxlen=MAX_CANDLES):
+        self.interval_ms = interval * 1000
+        self.candles = deque(maxlen=maxlen)
+        self.lock = threading.Lock()
+
+    def update(self, row):
+        """Apply a live candle; returns the number of intervals skipped before it"""
+        with self.lock:
+            if not self.candles or row[0] > self.candles[-1][0]:
+                gap = 0
+                if self.candles:
+                    gap = (row[0] - self.candles[-1][0]) // self.interval_ms - 1
+                self.candles.append(row)
+                return gap
+            if row[0] == self.candles[-1][0]:
+                self.candles[-1] = row
+            return 0
+
+    def merge(self, rows):
+        """Merge backfilled rows; live rows win over REST rows for the same interval"""
+        with self.lock:
+            merged = {r[0]: r for r in rows}
+            merged.update((r[0], r) for r in self.candles)
+            self.candles.clear()
+            self.candles.extend(merged[ts] for ts in sorted(merged)[-self.candles.maxlen:])
+
+    def last_ms(self):
+        with self.lock:
+            return self.candles[-1][0] if self.candles else None
+
+    def latest(self, limit=None):
+        with self.lock:
+            rows = list(self.candles)
+        return rows[-limit:] if limit else rows
+
+
+class PullApi:
+    """The local pull API over price(), candles(), status() and pairs"""
+
+    def pull(self, path, query):
+        """Local pull API shared by the standalone server and web_server.py: (code, body)"""
+        if path.endswith('/prices'):
+            return 200, {pair: self.price(pair) for pair in self.pairs}
+        if path.endswith('/candles'):
+            pair = query.get('pair', [''])[0]
+            try:
+                limit = max(int(query['limit'][0]), 1) if 'limit' in query else None
+            except ValueError:
+                return 400, {'error': f"limit must be an integer, got {query['limit'][0]!r}"}
+            rows = self.candles(pair, limit)
+            if rows is None:
+                return 404, {'error': f'unknown pair {pair}'}
+            return 200, {'pair': pair, 'candles': rows}
+        if path.endswith('/status'):
+            return 200, self.status()
+        return 404, {'error': 'unknown endpoint'}
+
+
+class MarketDataService(PullApi, threading.Thread):
+    def __init__(self, pairs, ws_url=None, rest_client=None, interval=CANDLE_SECONDS, stale_after=30.0):
+        super().__init__(daemon=True, name='market-data')
+        self.pairs = sorted(set(pairs))
+        self.ws_url = ws_url or feed_url()
+        self.rest_client = rest_client
+        self.interval = interval
+        self.stale_after = stale_after
+        self.prices = {}
+        self.builders = {pair: CandleBuilder(interval) for pair in self.pairs}
+        self.connected = False
+        self.connects = 0
+        self.messages = 0
+        self.backfills = 0
+        self.last_message_at = None
+        self.last_error = None
+        self.backfilling = set()
+        self.backfill_lock = threading.Lock()
+        self.stopped = threading.Event()
+        self.ws = None
+
+    # --- feed ---------------------------------------------------------
+
+    def run(self):
+        backoff = 1.0
+        while not self.stopped.is_set():
+            try:
+                self.session()
+                backoff = 1.0
+            except (WebSocketClosed, OSError, ValueError, ConnectionError) as e:
+                self.last_error = str(e)
+                print(f"⚠️ Market data feed disconnected: {e}")
+            self.connected = False
+            self.stopped.wait(backoff)
+            backoff = min(backoff * 2, 30.0)
+
+    def session(self):
+        ws = WebSocket.connect(self.ws_url)
+        self.ws = ws
+        try:
+            # Heartbeats arrive every second; a silent socket is a dead socket
+            ws.settimeout(max(self.stale_after, 5.0))
+            ws.send_text(json.dumps({'method': 'subscribe', 'params': {'channel': 'ticker', 'symbol': self.pairs}}))
+            ws.send_text(json.dumps({'method': 'subscribe', 'params': {
+                'channel': 'ohlc', 'symbol': self.pairs, 'interval': self.interval // 60}}))
+            self.connected = True
+            self.connects += 1
+            print(f"📡 Market data feed connected to {self.ws_url} for {len(self.pairs)} pairs")
+            # Whatever happened while we were disconnected is a gap
+            for pair in self.pairs:
+                self.backfill_async(pair)
+            while not self.stopped.is_set():
+                self.handle(json.loads(ws.recv()))
+        finally:
+            ws.close()
+
+    def handle(self, message):
+        self.messages += 1
+        self.last_message_at = time.time()
+        channel = message.get('channel')
+        if channel == 'ticker':
+            for tick in message.get('data', []):
+                self.prices[tick['symbol']] = {
+                    'bid': tick.get('bid'), 'ask': tick.get('ask'), 'last': tick.get('last'),
+                    'change_pct': tick.get('change_pct'), 'received_at': self.last_message_at,
+                }
+        elif channel == 'ohlc':
+            for candle in message.get('data', []):
+                builder = self.builders.get(candle['symbol'])
+                if builder is None:
+                    continue
+                row = [int(parse_iso(candle['interval_begin']) * 1000), candle['open'], candle['high'],
+                       candle['low'], candle['close'], candle['volume']]
+                if builder.update(row) > 0:
+                    self.backfill_async(candle['symbol'])
+
+    def backfill_async(self, pair):
+        if self.rest_client is None:
+            return
+        with self.backfill_lock:
+            if pair in self.backfilling:
+                return
+            self.backfilling.add(pair)
+        threading.Thread(target=self.backfill, args=(pair,), daemon=True).start()
+
+    def backfill(self, pair):
+        """Fill missing candles over REST, starting after the last candle we hold"""
+        try:
+            last = self.builders[pair].last_ms()
+            since = last - self.interval * 1000 * 2 if last else None
+            rows = self.rest_client.fetch_ohlcv(pair, f'{self.interval // 60}m', since=since)
+            self.builders[pair].merge([list(r) for r in rows])
+            self.backfills += 1
+        except Exception as e:
+            self.last_error = f"backfill {pair}: {e}"
+            print(f"⚠️ Candle backfill failed for {pair}: {e}")
+        finally:
+            with self.backfill_lock:
+                self.backfilling.discard(pair)
+
+    def stop(self):
+        self.stopped.set()
+        if self.ws is not None:
+            self.ws.close()
+
+    # --- queries ------------------------------------------------------
+
+    def price(self, pair):
+        """Latest ticker for pair, or None when the feed is down or the price is stale"""
+        tick = self.prices.get(pair)
+        if tick is None or time.time() - tick['received_at'] > self.stale_after:
+            return None
+        return tick
+
+    def last_price(self, pair):
+        tick = self.price(pair)
+        return tick['last'] if tick else None
+
+    def candles(self, pair, limit=None):
+        builder = self.builders.get(pair)
+        return builder.latest(limit) if builder else None
+
+    def status(self):
+        return {
+            'url': self.ws_url,
+            'connected': self.connected,
+            'connects': self.connects,
+            'messages': self.messages,
+            'backfills': self.backfills,
+            'last_message_age': round(time.time() - self.last_message_at, 3) if self.last_message_at else None,
+            'pairs': self.pairs,
+            'last_error': self.last_error,
+        }
+
+    def snapshot(self):
+        """The tables behind the pull API as JSON bytes, for MarketDataView in other processes"""
+        return json.dumps({
+            'pairs': self.pairs,
+            'stale_after': self.stale_after,
+            'prices': dict(self.prices),
+            'candles': {pair: builder.latest() for pair, builder in self.builders.items()},
+            'status': self.status(),
+            'last_message_at': self.last_message_at,
+        }).encode()
+
+
+class MarketDataView(PullApi):
+    """Pre-fork worker side: the refresher's feed tables, read from a shared seqlock segment.
+    
+    Like web_server.SharedStatsView, checking for a new version reads only the
+    segment header; the tables are copied and parsed once per version.
+    """
+
+    def __init__(self, segment):
+        self.segment = segment
+        self.version = None
+        self.tables = None
+
+    def load(self):
+        version = self.segment.version()
+        if self.tables is None or version != self.version:
+            version, payload = self.segment.read()
+            self.tables = json.loads(payload) if version else None
+            self.version = version
+        return self.tables
+
+    @property
+    def pairs(self):
+        return self.load()['pairs']
+
+    def price(self, pair):
+        tables = self.load()
+        tick = tables['prices'].get(pair)
+        if tick is None or time.time() - tick['received_at'] > tables['stale_after']:
+            return None
+        return tick
+
+    def candles(self, pair, limit=None):
+        rows = self.load()['candles'].get(pair)
+        if rows is None:
+            return None
+        return rows[-limit:] if limit else rows
+
+    def status(self):
+        tables = self.load()
+        status = dict(tables['status'])
+        last_message_at = tables['last_message_at']
+        status['last_message_age'] = round(time.time() - last_message_at, 3) if last_message_at else None
+        return status
+
+    def pull(self, path, query):
+        if self.load() is None:
+            return 503, {'error': 'market data not published yet'}
+        return super().pull(path, query)
+
+class PullApiHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        parsed = urlparse(self.path)
+        code, body = self.server.service.pull(parsed.path, parse_qs(parsed.query))
+        data = json.dumps(body).encode()
+        try:
+            self.send_response(code)
+            self.send_header('Content-type', 'application/json')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def log_message(self, format, *args):
+        pass
+
+
+def rest_client():
+    """Public-only ccxt client for backfills (honours KRAKEN_STUB_URL)"""
+    import ccxt
+    return ccxt.kraken({'enableRateLimit': True, 'timeout': 15000, **kraken_stub.stub_ccxt_overrides()})
+
+
+def main():
+    from start import get_config_template
+
+    parser = argparse.ArgumentParser(description="Kraken WebSocket market-data service")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8766)
+    parser.add_argument('--pairs', help="comma separated pairs (default: the bot's whitelist)")
+    args = parser.parse_args()
+
+    pairs = args.pairs.split(',') if args.pairs else get_config_template()['exchange']['pair_whitelist']
+    service = MarketDataService(pairs, rest_client=rest_client())
+    service.start()
+    server = ThreadingHTTPServer((args.host, args.port), PullApiHandler)
+    server.daemon_threads = True
+    server.service = service
+    print(f"📊 Market data pull API on http://{args.host}:{args.port} (/prices, /candles, /status)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        service.stop()
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+Opt-in memory watchdog for the long-running bot and dashboard processes.
+
+With MEM_WATCHDOG=1 each watched process starts tracemalloc and a daemon
+thread that, every MEM_WATCHDOG_SECS, takes a tracemalloc snapshot and
+samples RSS and the thread count. The first sample (one interval after
+start, so imports and warm-up are not counted) is the baseline. Every later
+snapshot is diffed against it and against the previous one, and the
+allocation sites that grew the most are kept in a report:
+
+    <MEM_WATCHDOG_DIR>/<name>.json   latest report, served by /api/memory
+    <MEM_WATCHDOG_DIR>/<name>.log    one line per sample
+
+A warning is logged each time RSS or traced memory has grown by another
+MEM_WATCHDOG_GROWTH_MB since the baseline, naming the top growing site.
+
+Costs: tracemalloc makes every allocation slower (more with more
+MEM_WATCHDOG_FRAMES), the baseline and previous per-site totals stay in
+memory, and grouping a snapshot holds the GIL for about a second per few
+hundred thousand live blocks, so keep it off unless you are hunting a leak.
+
+    python mem_watchdog.py                     # summarize the saved reports
+"""
+import argparse
+import glob
+import json
+import logging
+import os
+import threading
+import time
+import tracemalloc
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+ENABLED = os.getenv('MEM_WATCHDOG', '0') == '1'
+INTERVAL = float(os.getenv('MEM_WATCHDOG_SECS', '600'))
+THRESHOLD_MB = float(os.getenv('MEM_WATCHDOG_GROWTH_MB', '100'))
+FRAMES = int(os.getenv('MEM_WATCHDOG_FRAMES', '1'))
+REPORT_DIR = os.getenv('MEM_WATCHDOG_DIR', 'user_data/logs/memory')
+TOP = 15
+MB = 1024 * 1024
+
+# Allocations made by tracemalloc, the import machinery and the watchdog itself are noise
+IGNORED = {tracemalloc.__file__, __file__, '<frozen importlib._bootstrap>',
+           '<frozen importlib._bootstrap_external>', '<unknown>'}
+
+
+def rss_bytes():
+    """Resident set size of this process, None where /proc is not available"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def short_path(filename):
+    """Last path components only: enough to find the file, no site-packages prefix"""
+    return '/'.join(filename.split(os.sep)[-3:])
+
+
+def group_sites(snapshot):
+    """{traceback: (size, count)} of a snapshot, without tracemalloc's own allocations.
+
+    Grouping first and dropping ignored sites afterwards is one pass over
+    the traces; Snapshot.filter_traces() would match every trace against
+    every filter and is several times slower on a large heap.
+    """
+    return {stat.traceback: (stat.size, stat.count) for stat in snapshot.statistics('traceback')
+            if stat.traceback[-1].filename not in IGNORED}
+
+
+def slope_per_hour(points):
+    """Least-squares growth rate (bytes/hour) of [(ts, value)]"""
+    points = [(t, v) for t, v in points if v is not None]
+    if len(points) < 2:
+        return None
+    n = len(points)
+    mean_t = sum(t for t, _ in points) / n
+    mean_v = sum(v for _, v in points) / n
+    var = sum((t - mean_t) ** 2 for t, _ in points)
+    if not var:
+        return None
+    return sum((t - mean_t) * (v - mean_v) for t, v in points) / var * 3600
+
+
+class MemoryWatchdog:
+    def __init__(self, name, interval=INTERVAL, threshold_mb=THRESHOLD_MB, frames=FRAMES, top=TOP,
+                 report_dir=REPORT_DIR, clock=time.time):
+        self.name = name
+        self.interval = interval
+        self.threshold = threshold_mb * MB
+        self.frames = frames
+        self.top = top
+        self.report_path = os.path.join(report_dir, f'{name}.json')
+        self.log_path = os.path.join(report_dir, f'{name}.log')
+        self.clock = clock
+        self.samples = deque(maxlen=288)   # (ts, rss, traced, threads)
+        self.baseline = None               # (ts, sites, rss, traced)
+        self.previous = None               # sites of the last sample
+        self.warned = 0                    # threshold multiples already warned about
+        self.warnings = deque(maxlen=20)
+        self.stop_event = threading.Event()
+
+    def sample(self):
+        """Take one snapshot, update and write the report; returns it"""
+        sites = group_sites(tracemalloc.take_snapshot())
+        now = self.clock()
+        rss = rss_bytes()
+        traced = tracemalloc.get_traced_memory()[0]
+        self.samples.append((now, rss, traced, threading.active_count()))
+        if self.baseline is None:
+            self.baseline = (now, sites, rss, traced)
+        _, base, base_rss, base_traced = self.baseline
+        previous = self.previous or sites
+        self.previous = sites
+
+        growth = ((size - base.get(traceback, (0, 0))[0], traceback) for traceback, (size, _) in sites.items())
+        growing = sorted((item for item in growth if item[0] > 0), key=lambda item: item[0],
+                         reverse=True)[:self.top]
+
+        rss_growth = rss - base_rss if rss is not None and base_rss is not None else None
+        traced_growth = traced - base_traced
+        report = {
+            'name': self.name,
+            'pid': os.getpid(),
+            'updated': now,
+            'baseline_at': self.baseline[0],
+            'interval': self.interval,
+            'samples': len(self.samples),
+            'threads': self.samples[-1][3],
+            'rss_mb': rss / MB if rss is not None else None,
+            'rss_growth_mb': rss_growth / MB if rss_growth is not None else None,
+            'traced_mb': traced / MB,
+            'traced_growth_mb': traced_growth / MB,
+            'rss_mb_per_hour': self.rate(1),
+            'traced_mb_per_hour': self.rate(2),
+            # site is the allocating line, trace lists its callers most recent first
+            'top': [{
+                'site': f"{short_path(traceback[-1].filename)}:{traceback[-1].lineno}",
+                'trace': [f"{short_path(frame.filename)}:{frame.lineno}" for frame in reversed(traceback)],
+                'size_kb': round(sites[traceback][0] / 1024, 1),
+                'growth_kb': round(size_diff / 1024, 1),
+                'count_growth': sites[traceback][1] - base.get(traceback, (0, 0))[1],
+                'recent_kb': round((sites[traceback][0] - previous.get(traceback, (0, 0))[0]) / 1024, 1),
+            } for size_diff, traceback in growing],
+        }
+        self.check_growth(report, max(rss_growth or 0, traced_growth))
+        report['warnings'] = list(self.warnings)
+        self.write(report)
+        return report
+
+    def rate(self, column):
+        slope = slope_per_hour([(sample[0], sample[column]) for sample in self.samples])
+        return round(slope / MB, 2) if slope is not None else None
+
+    def check_growth(self, report, growth):
+        level = int(growth // self.threshold) if self.threshold > 0 else 0
+        if level <= self.warned:
+            return
+        self.warned = level
+        top = report['top'][0] if report['top'] else None
+        message = (f"Memory watchdog {self.name}: RSS +{report['rss_growth_mb'] or 0:.0f} MB, "
+                   f"traced +{report['traced_growth_mb']:.0f} MB since baseline, {report['threads']} threads"
+                   + (f"; top growth {top['site']} +{top['growth_kb']:.0f} KB" if top else ""))
+        logger.warning(message)
+        self.warnings.append({'at': report['updated'], 'message': message})
+
+    def write(self, report):
+        os.makedirs(os.path.dirname(self.report_path) or '.', exist_ok=True)
+        tmp = f"{self.report_path}.tmp"
+        with open(tmp, 'w') as f:
+            json.dump(report, f, indent=2)
+        os.replace(tmp, self.report_path)
+        top = ', '.join(f"{site['site']} +{site['growth_kb']:.0f}KB" for site in report['top'][:3]) or '-'
+        with open(self.log_path, 'a') as f:
+            f.write(f"{time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(report['updated']))} "
+                    f"rss {report['rss_mb'] or 0:.1f}MB ({report['rss_growth_mb'] or 0:+.1f}) "
+                    f"traced {report['traced_mb']:.1f}MB ({report['traced_growth_mb']:+.1f}) "
+                    f"threads {report['threads']} top: {top}\n")
+
+    def run(self):
+        while not self.stop_event.wait(self.interval):
+            try:
+                self.sample()
+            except Exception as e:
+                logger.warning(f"Memory watchdog {self.name} sample failed: {e}")
+
+    def start(self):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+        thread = threading.Thread(target=self.run, name=f'mem-watchdog-{self.name}', daemon=True)
+        thread.start()
+        logger.info(f"Memory watchdog {self.name}: sampling every {self.interval:g}s into {self.report_path}")
+        return self
+
+    def stop(self):
+        self.stop_event.set()
+
+
+def start_from_env(name):
+    """The running watchdog for this process if MEM_WATCHDOG=1, else None"""
+    return MemoryWatchdog(name).start() if ENABLED else None
+
+
+def read_reports(report_dir=REPORT_DIR):
+    """{name: latest report} for every watched process"""
+    reports = {}
+    for path in sorted(glob.glob(os.path.join(report_dir, '*.json'))):
+        try:
+            with open(path) as f:
+                report = json.load(f)
+        except (OSError, ValueError):
+            continue
+        reports[report.get('name', os.path.basename(path)[:-5])] = report
+    return reports
+
+
+def remove_report(name, report_dir=REPORT_DIR):
+    """Forget a process that exited (its log file is kept)"""
+    try:
+        os.remove(os.path.join(report_dir, f'{name}.json'))
+    except FileNotFoundError:
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarize memory watchdog reports")
+    parser.add_argument('--dir', default=REPORT_DIR)
+    parser.add_argument('--top', type=int, default=5, help="growing sites to print per process")
+    args = parser.parse_args()
+    reports = read_reports(args.dir)
+    if not reports:
+        print(f"No reports in {args.dir} (run the bot or dashboard with MEM_WATCHDOG=1)")
+        return
+    for name, report in reports.items():
+        hours = (report['updated'] - report['baseline_at']) / 3600
+        print(f"🧠 {name} (pid {report['pid']}): RSS {report['rss_mb'] or 0:.1f} MB "
+              f"({report['rss_growth_mb'] or 0:+.1f} in {hours:.1f}h, {report['rss_mb_per_hour'] or 0:+.2f} MB/h), "
+              f"traced {report['traced_mb']:.1f} MB ({report['traced_growth_mb']:+.1f}), {report['threads']} threads")
+        for site in report['top'][:args.top]:
+            print(f"   {site['growth_kb']:>+10.1f} KB {site['count_growth']:>+8} blocks  "
+                  f"(last interval {site['recent_kb']:+.1f} KB)  {site['site']}")
+        for warning in report['warnings'][-3:]:
+            print(f"   ⚠️ {warning['message']}")
+
+
+if __name__ == "__main__":
+    main()
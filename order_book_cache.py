@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Short-lived order-book snapshots shared by entry, exit and DCA pricing.
+
+freqtrade's own order-book pricing (`use_order_book`) fetches the book for
+every order it prices, and only looks at one level of it. It is turned off;
+freqtrade proposes its ticker rate and the strategy's pricing callbacks
+size the order against a depth snapshot from this cache instead. A pair's
+snapshot is fetched at most once per `ttl`, only when a callback is about
+to price an order, so the bot loop makes no extra calls and an entry, DCA
+add and exit on the same pair within the TTL share one fetch.
+"""
+import logging
+import time
+from collections import namedtuple
+
+logger = logging.getLogger(__name__)
+
+INF = float('inf')
+
+# bids/asks are [[price, amount], ...] best first; ts is the local fetch time
+Book = namedtuple('Book', ('bids', 'asks', 'ts'))
+
+
+def fill_price(levels, amount):
+    """(average price, worst level price) to fill `amount` from levels; None if the book is too thin"""
+    remaining, cost = amount, 0.0
+    for price, size in levels:
+        take = min(size, remaining)
+        cost += take * price
+        remaining -= take
+        if remaining <= 1e-12:
+            return cost / amount, price
+    return None
+
+
+class OrderBookCache:
+    def __init__(self, ttl=15.0, depth=10, clock=time.time):
+        self.ttl = ttl
+        self.depth = depth
+        self.clock = clock
+        self.books = {}
+        self.stats = {'depth_calls': 0, 'errors': 0, 'hits': 0, 'misses': 0}
+
+    def get(self, exchange, pair):
+        """Book for pair, fetched now unless one younger than `ttl` is cached; None on failure.
+
+        `exchange` is freqtrade's Exchange (fetch_l2_order_book). A failed
+        fetch returns None so the caller keeps freqtrade's proposed rate.
+        """
+        book = self.books.get(pair)
+        if book is not None and self.clock() - book.ts <= self.ttl:
+            self.stats['hits'] += 1
+            return book
+        self.stats['misses'] += 1
+        if exchange is None:
+            return None
+        try:
+            raw = exchange.fetch_l2_order_book(pair, self.depth)
+        except Exception as e:
+            self.stats['errors'] += 1
+            logger.warning(f"Order book cache: depth fetch failed for {pair}: {e}")
+            return None
+        self.stats['depth_calls'] += 1
+        book = self.books[pair] = Book(raw['bids'], raw['asks'], self.clock())
+        return book
+
+    def price_for(self, exchange, pair, side, amount):
+        """Limit price that fills `amount` against the snapshot, None without a usable one.
+
+        Only levels actually in the snapshot count, so an amount deeper than
+        the fetched depth returns None and the caller keeps its own rate.
+        """
+        book = self.get(exchange, pair)
+        levels = book and (book.asks if side == 'buy' else book.bids)
+        if not levels:
+            return None
+        if amount <= 0:
+            return levels[0][0]
+        filled = fill_price(levels, amount)
+        return filled[1] if filled else None
+
+    def retain(self, pairs):
+        keep = set(pairs)
+        for pair in [p for p in self.books if p not in keep]:
+            del self.books[pair]
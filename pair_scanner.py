@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+Dynamic pair universe for freqtrade, built from one bulk ticker fetch.
+
+Every scan pulls all Kraken tickers in a single call, ranks the active
+`<quote>` spot pairs by 24h quote volume, spread and 24h range, and writes
+the ranked index to PAIR_INDEX_FILE. The top N (plus pinned pairs) are
+written to PAIRLIST_FILE in RemotePairList's format, which freqtrade reads
+through a `file:///` pairlist_url, so the universe changes without a
+restart and per-cycle cost stays bounded by N.
+
+Hysteresis keeps the list stable: a listed pair only drops out once it
+ranks below top N + margin, and newcomers only fill the free slots.
+
+    python pair_scanner.py --top 15            # one scan, print the ranking
+    python pair_scanner.py --loop              # rescan every PAIRLIST_SCAN_SECS
+"""
+import argparse
+import json
+import logging
+import math
+import os
+import threading
+import time
+
+import kraken_stub
+
+logger = logging.getLogger(__name__)
+
+INDEX_FILE = os.getenv('PAIR_INDEX_FILE', 'user_data/pair_index.json')
+PAIRLIST_FILE = os.getenv('PAIRLIST_FILE', 'user_data/pairlist.json')
+TOP_N = int(os.getenv('PAIRLIST_TOP_N', '11'))
+SCAN_SECS = float(os.getenv('PAIRLIST_SCAN_SECS', '3600'))
+
+# Score weights over percentile ranks: liquidity first, then tight books, then movement
+WEIGHTS = {'volume': 0.5, 'spread': 0.3, 'volatility': 0.2}
+
+
+def dynamic_enabled():
+    return os.getenv('DYNAMIC_PAIRLIST', '0') == '1'
+
+
+def write_json(path, data):
+    """Write atomically so freqtrade and the dashboard never read a partial file"""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, 'w') as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp, path)
+
+
+def read_pairs(path=PAIRLIST_FILE, default=None):
+    """Pairs from a pairlist file, `default` when it does not exist or is unreadable"""
+    try:
+        with open(path) as f:
+            return json.load(f)['pairs']
+    except (OSError, ValueError, KeyError):
+        return default
+
+
+def percentile_ranks(values):
+    """0..1 rank of each value (ties share the average rank)"""
+    order = sorted(range(len(values)), key=values.__getitem__)
+    ranks = [0.0] * len(values)
+    i = 0
+    while i < len(order):
+        j = i
+        while j + 1 < len(order) and values[order[j + 1]] == values[order[i]]:
+            j += 1
+        for k in range(i, j + 1):
+            ranks[order[k]] = (i + j) / 2 / max(len(values) - 1, 1)
+        i = j + 1
+    return ranks
+
+
+def build_index(tickers, markets, quote='USD', min_volume=0.0, max_spread=0.02, blacklist=()):
+    """Ranked [{pair, quote_volume, spread, volatility, score, rank}] from a fetch_tickers() result"""
+    rows = []
+    for symbol, ticker in tickers.items():
+        market = markets.get(symbol)
+        if not market or not market.get('spot') or market.get('quote') != quote or not market.get('active', True):
+            continue
+        if symbol in blacklist:
+            continue
+        bid, ask, last = ticker.get('bid'), ticker.get('ask'), ticker.get('last')
+        if not bid or not ask or not last:
+            continue
+        quote_volume = ticker.get('quoteVolume') or (ticker.get('baseVolume') or 0) * (ticker.get('vwap') or last)
+        spread = (ask - bid) / ((ask + bid) / 2)
+        high, low = ticker.get('high'), ticker.get('low')
+        volatility = (high - low) / last if high and low else 0.0
+        if quote_volume < min_volume or spread > max_spread:
+            continue
+        rows.append({'pair': symbol, 'quote_volume': round(quote_volume, 2), 'spread': round(spread, 6),
+                     'volatility': round(volatility, 6)})
+
+    if rows:
+        volume = percentile_ranks([math.log1p(r['quote_volume']) for r in rows])
+        spread = percentile_ranks([-r['spread'] for r in rows])
+        volatility = percentile_ranks([r['volatility'] for r in rows])
+        for r, v, s, m in zip(rows, volume, spread, volatility):
+            r['score'] = round(WEIGHTS['volume'] * v + WEIGHTS['spread'] * s + WEIGHTS['volatility'] * m, 4)
+    rows.sort(key=lambda r: (-r['score'], -r['quote_volume']))
+    for rank, r in enumerate(rows, 1):
+        r['rank'] = rank
+    return rows
+
+
+def select_pairs(index, current, top_n, margin, pinned=()):
+    """Top N with hysteresis: keep current pairs ranked within top_n + margin, fill the rest by rank"""
+    ranks = {r['pair']: r['rank'] for r in index}
+    selected = list(dict.fromkeys(pinned))
+    slots = max(top_n, len(selected))
+    for pair in sorted(current, key=lambda p: ranks.get(p, math.inf)):
+        if len(selected) >= slots:
+            break
+        if pair not in selected and ranks.get(pair, math.inf) <= top_n + margin:
+            selected.append(pair)
+    for r in index:
+        if len(selected) >= slots:
+            break
+        if r['pair'] not in selected:
+            selected.append(r['pair'])
+    return selected
+
+
+class PairScanner:
+    def __init__(self, exchange, top_n=TOP_N, margin=None, pinned=(), blacklist=(), quote='USD',
+                 min_volume=0.0, max_spread=0.02, index_path=INDEX_FILE, pairlist_path=PAIRLIST_FILE,
+                 interval=SCAN_SECS):
+        self.exchange = exchange
+        self.top_n = top_n
+        self.margin = margin if margin is not None else max(1, top_n // 2)
+        self.pinned = tuple(pinned)
+        self.blacklist = set(blacklist)
+        self.quote = quote
+        self.min_volume = min_volume
+        self.max_spread = max_spread
+        self.index_path = index_path
+        self.pairlist_path = pairlist_path
+        self.interval = interval
+        self.stop_event = threading.Event()
+
+    def scan(self):
+        """One bulk ticker fetch -> persisted index and pairlist; returns the selected pairs"""
+        started = time.time()
+        markets = self.exchange.load_markets()
+        tickers = self.exchange.fetch_tickers()
+        index = build_index(tickers, markets, self.quote, self.min_volume, self.max_spread, self.blacklist)
+        current = read_pairs(self.pairlist_path, default=[])
+        pairs = select_pairs(index, current, self.top_n, self.margin, self.pinned)
+
+        write_json(self.index_path, {'generated': int(started), 'quote': self.quote,
+                                     'tickers': len(tickers), 'pairs': index})
+        write_json(self.pairlist_path, {'pairs': pairs, 'refresh_period': int(self.interval)})
+        added, removed = set(pairs) - set(current), set(current) - set(pairs)
+        if added or removed:
+            logger.info(f"Pair universe: {len(pairs)} of {len(index)} ranked pairs"
+                        f" (+{', '.join(sorted(added)) or '-'} / -{', '.join(sorted(removed)) or '-'})")
+        return pairs
+
+    def ensure_pairlist(self, fallback):
+        """Make sure freqtrade has a pairlist file to start with"""
+        try:
+            return self.scan()
+        except Exception as e:
+            pairs = read_pairs(self.pairlist_path)
+            logger.warning(f"Pair scan failed ({e}); starting with the {'previous' if pairs else 'static'} list")
+            if pairs is None:
+                pairs = list(fallback)
+                write_json(self.pairlist_path, {'pairs': pairs, 'refresh_period': int(self.interval)})
+            return pairs
+
+    def run(self):
+        while not self.stop_event.wait(self.interval):
+            try:
+                self.scan()
+            except Exception as e:
+                logger.warning(f"Pair scan failed, keeping current list: {e}")
+
+    def start(self):
+        thread = threading.Thread(target=self.run, name='pair-scanner', daemon=True)
+        thread.start()
+        return thread
+
+    def stop(self):
+        self.stop_event.set()
+
+
+def remote_pairlist_config(top_n=TOP_N, path=PAIRLIST_FILE, refresh=SCAN_SECS):
+    """freqtrade pairlists entry reading the scanner's file"""
+    return [{
+        'method': 'RemotePairList',
+        'mode': 'whitelist',
+        'pairlist_url': f"file:///{path}",
+        'number_assets': top_n,
+        'refresh_period': int(refresh),
+        'keep_pairlist_on_failure': True,
+    }]
+
+
+def scanner_pinned():
+    """Pairs always in the universe (the portfolio's core holdings)"""
+    return [p for p in os.getenv('PAIRLIST_PINNED', 'ONDO/USD,CPOOL/USD').split(',') if p]
+
+
+def scanner_from_env(exchange=None):
+    import ccxt
+    exchange = exchange or ccxt.kraken({'enableRateLimit': True, 'timeout': 15000,
+                                        **kraken_stub.stub_ccxt_overrides()})
+    blacklist = [p for p in os.getenv('PAIRLIST_BLACKLIST', '').split(',') if p]
+    return PairScanner(exchange, pinned=scanner_pinned(), blacklist=blacklist,
+                       min_volume=float(os.getenv('PAIRLIST_MIN_VOLUME', '0')),
+                       max_spread=float(os.getenv('PAIRLIST_MAX_SPREAD', '0.02')))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rank Kraken pairs and write a freqtrade pairlist")
+    parser.add_argument('--top', type=int, default=TOP_N)
+    parser.add_argument('--loop', action='store_true', help="keep rescanning every PAIRLIST_SCAN_SECS")
+    parser.add_argument('--show', type=int, default=25, help="ranked pairs to print")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    scanner = scanner_from_env()
+    scanner.top_n = args.top
+    pairs = scanner.scan()
+    with open(scanner.index_path) as f:
+        index = json.load(f)['pairs']
+    print(f"{'rank':>4}  {'pair':<14}{'volume $':>16}{'spread %':>10}{'range %':>9}{'score':>7}")
+    for r in index[:args.show]:
+        mark = '*' if r['pair'] in pairs else ' '
+        print(f"{r['rank']:>4}{mark} {r['pair']:<14}{r['quote_volume']:>16,.0f}{r['spread'] * 100:>10.3f}"
+              f"{r['volatility'] * 100:>9.2f}{r['score']:>7.3f}")
+    print(f"📋 {len(pairs)} pairs written to {scanner.pairlist_path}")
+    if args.loop:
+        scanner.run()
+
+
+if __name__ == "__main__":
+    main()
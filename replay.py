@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+"""
+Accelerated market replay: SimplePortfolio's live loop against recorded candles.
+
+Runs `freqtrade trade` (dry run) with its real live loop and strategy
+callbacks against kraken_stub.py, and moves both onto one virtual clock that
+runs `--speed` times faster than wall time:
+
+- the stub serves recorded 5m candles (freqtrade json/jsongz files, e.g.
+  from backfill_ohlcv.py) - OHLC, tickers, order book and fills all follow
+  the candle at the virtual "now", with prices interpolated inside a candle
+  as ticks; pairs without recorded data use the stub's price model
+- freqtrade runs under libfaketime (`FAKETIME="@<start> x<speed>"`), which
+  makes its clock, its sleeps and its 5 s process throttle virtual too
+
+Each freqtrade loop logs how long the iteration took; the report gives loop
+latency per simulated cycle (scaled back to wall time), the slowest cycles,
+the stub's call counts and the strategy's entries/DCA/exits from the log:
+
+    python backfill_ohlcv.py --days 14
+    python replay.py --hours 48 --speed 200          # 48h of market in ~15 min
+    python replay.py --hours 6 --speed 1              # real time, no libfaketime needed
+
+Requires freqtrade and (for --speed > 1) libfaketime, e.g. `apt install
+faketime`; set FAKETIME_LIB if the library is not found.
+"""
+import argparse
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+
+import kraken_stub
+import log_analytics
+from bench_web import percentile
+from roi_simulator import load_pair
+from start import STRATEGY_SUPPORT_MODULES, get_config_template
+
+CANDLE_SECONDS = 300
+# freqtrade's history warm-up: fetchOHLCVLimit candles must exist before the replay starts
+WARMUP_CANDLES = 720
+LIBFAKETIME_PATHS = (
+    '/usr/lib/x86_64-linux-gnu/faketime/libfaketime.so.1',
+    '/usr/lib/aarch64-linux-gnu/faketime/libfaketime.so.1',
+    '/usr/lib/faketime/libfaketime.so.1',
+    '/usr/local/lib/faketime/libfaketime.so.1',
+)
+# freqtrade.worker: "Throttling with 'process()': sleep for 4.90 s, last iteration took 0.10 s."
+LOOP_LINE = re.compile(r'^(\d{4}-\d\d-\d\d \d\d:\d\d:\d\d)[,.](\d{3}) .*last iteration took (\d+(?:\.\d+)?) s')
+
+
+class VirtualClock:
+    """Wall time mapped onto [start, ...) at `speed`x, anchored when created"""
+
+    def __init__(self, start, speed=1.0):
+        self.start = start
+        self.speed = speed
+        self.anchor = time.monotonic()
+
+    def __call__(self):
+        return self.start + (time.monotonic() - self.anchor) * self.speed
+
+
+class RecordedMarket:
+    """Recorded [ms, open, high, low, close, volume] candles in place of the stub's price model"""
+
+    def __init__(self, candles, period=CANDLE_SECONDS):
+        self.period = period
+        self.rows = {symbol: rows for symbol, rows in candles.items() if len(rows)}
+        self.times = {symbol: rows[:, 0] / 1000 for symbol, rows in self.rows.items()}
+
+    def __contains__(self, symbol):
+        return symbol in self.rows
+
+    def span(self):
+        """(first, last) candle start shared by every recorded pair"""
+        return (max(times[0] for times in self.times.values()),
+                min(times[-1] for times in self.times.values()))
+
+    def row_at(self, symbol, ts):
+        times = self.times[symbol]
+        i = min(max(int(np.searchsorted(times, ts, side='right')) - 1, 0), len(times) - 1)
+        return times[i], self.rows[symbol][i]
+
+    def price_at(self, symbol, ts):
+        """Tick inside the candle at ts: open -> close, linear in time"""
+        start, row = self.row_at(symbol, ts)
+        frac = min(max((ts - start) / self.period, 0.0), 1.0)
+        return row[1] + (row[4] - row[1]) * frac
+
+    def candle(self, symbol, start, interval, now):
+        """(open/high/low/close samples, volume) of the recorded candles in [start, start + interval)"""
+        times, rows = self.times[symbol], self.rows[symbol]
+        end = min(start + interval, now)
+        lo, hi = np.searchsorted(times, start), np.searchsorted(times, end)
+        if hi <= lo:
+            price = self.price_at(symbol, start)
+            return [price, price, price, price], 0.0
+        window = rows[lo:hi]
+        return [window[0, 1], window[:, 2].max(), window[:, 3].min(), window[-1, 4]], float(window[:, 5].sum())
+
+
+def find_libfaketime():
+    candidates = [os.getenv('FAKETIME_LIB')] + list(LIBFAKETIME_PATHS)
+    return next((path for path in candidates if path and os.path.exists(path)), None)
+
+
+def load_market(datadir, pairs):
+    candles = {}
+    for pair in pairs:
+        rows = load_pair(datadir, pair)
+        if rows is not None:
+            candles[pair] = rows
+    return RecordedMarket(candles) if candles else None
+
+
+def prepare_userdir(userdir, stub_url, pairs, wallet):
+    """Dry-run config, strategy and a fresh trade database for one replay"""
+    if os.path.exists(userdir):
+        if os.listdir(userdir) and not os.path.exists(os.path.join(userdir, '.replay')):
+            raise SystemExit(f"❌ {userdir} exists and is not a replay workspace, refusing to clear it")
+        shutil.rmtree(userdir)
+    strategies = os.path.join(userdir, 'strategies')
+    os.makedirs(strategies)
+    os.makedirs(os.path.join(userdir, 'logs'))
+    open(os.path.join(userdir, '.replay'), 'w').close()
+    config = get_config_template()
+    config['dry_run'] = True
+    config['dry_run_wallet'] = wallet
+    config['api_server']['enabled'] = False
+    config['exchange']['pair_whitelist'] = pairs
+    kraken_stub.apply_stub_to_config(config, stub_url)
+    config_path = os.path.join(userdir, 'config.json')
+    with open(config_path, 'w') as f:
+        json.dump(config, f, indent=2)
+    for module in ['SimplePortfolio.py'] + STRATEGY_SUPPORT_MODULES:
+        shutil.copy(module, strategies)
+    return config_path
+
+
+def parse_loops(path, speed):
+    """[(virtual epoch, wall seconds)] per freqtrade loop from its log"""
+    loops = []
+    try:
+        with open(path, errors='replace') as f:
+            for line in f:
+                match = LOOP_LINE.match(line)
+                if match:
+                    ts = datetime.strptime(match.group(1), '%Y-%m-%d %H:%M:%S').replace(tzinfo=timezone.utc)
+                    # freqtrade measured the iteration on the virtual clock
+                    loops.append((ts.timestamp() + int(match.group(2)) / 1000, float(match.group(3)) / speed))
+    except OSError:
+        pass
+    return loops
+
+
+def summarize(loops, top=10):
+    if not loops:
+        return None
+    seconds = sorted(s for _, s in loops)
+    return {
+        'cycles': len(loops),
+        'p50_ms': round(percentile(seconds, 50) * 1000, 1),
+        'p95_ms': round(percentile(seconds, 95) * 1000, 1),
+        'p99_ms': round(percentile(seconds, 99) * 1000, 1),
+        'max_ms': round(seconds[-1] * 1000, 1),
+        'total_s': round(sum(seconds), 1),
+        'slowest': [{'at': datetime.fromtimestamp(ts, timezone.utc).strftime('%Y-%m-%d %H:%M:%S'),
+                     'ms': round(s * 1000, 1)}
+                    for ts, s in sorted(loops, key=lambda loop: -loop[1])[:top]],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay recorded candles through freqtrade + SimplePortfolio")
+    parser.add_argument('--datadir', default='user_data/data/kraken', help="recorded candles (freqtrade json)")
+    parser.add_argument('--pairs', help="comma separated pairs (default: the bot's whitelist)")
+    parser.add_argument('--start', help="virtual start, YYYY-MM-DD[THH:MM] UTC (default: after the warm-up)")
+    parser.add_argument('--hours', type=float, default=24, help="virtual hours to replay")
+    parser.add_argument('--speed', type=float, default=100, help="virtual seconds per wall second")
+    parser.add_argument('--wallet', type=float, default=100, help="dry-run wallet in USD")
+    parser.add_argument('--userdir', default='user_data/replay', help="replay workspace (recreated)")
+    parser.add_argument('--freqtrade', default='freqtrade')
+    parser.add_argument('--output', help="write the report as JSON")
+    args = parser.parse_args()
+
+    pairs = args.pairs.split(',') if args.pairs else get_config_template()['exchange']['pair_whitelist']
+    market = load_market(args.datadir, pairs)
+    if args.start:
+        start = datetime.fromisoformat(args.start).replace(tzinfo=timezone.utc).timestamp()
+    elif market is not None:
+        start = market.span()[0] + WARMUP_CANDLES * CANDLE_SECONDS
+    else:
+        start = time.time() - args.hours * 3600
+    start -= start % CANDLE_SECONDS
+    if market is not None:
+        last = market.span()[1] + CANDLE_SECONDS
+        if start + args.hours * 3600 > last:
+            args.hours = max(0.0, (last - start) / 3600)
+            print(f"⚠️ Recorded candles end at {datetime.fromtimestamp(last, timezone.utc):%Y-%m-%d %H:%M}, "
+                  f"replaying {args.hours:.1f}h")
+    if args.hours <= 0:
+        print("❌ Nothing to replay (not enough recorded candles after the warm-up)")
+        sys.exit(1)
+
+    env = dict(os.environ)
+    if args.speed != 1:
+        libfaketime = find_libfaketime()
+        if libfaketime is None:
+            print("❌ libfaketime not found (apt install faketime, or set FAKETIME_LIB); use --speed 1 without it")
+            sys.exit(1)
+        stamp = datetime.fromtimestamp(start, timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+        env.update({'LD_PRELOAD': libfaketime, 'FAKETIME': f"@{stamp} x{args.speed:g}",
+                    'FAKETIME_NO_CACHE': '1', 'TZ': 'UTC'})
+
+    logfile = os.path.join(args.userdir, 'logs', 'freqtrade.log')
+    # Strategy side files go to the replay workspace, never the live bot's
+    env.update({'HEARTBEAT_FILE': os.path.join(args.userdir, 'heartbeat.json'),
+                'TRADE_EVENTS_DB': os.path.join(args.userdir, 'trade_events.sqlite'),
+                'KRAKEN_BUDGET_FILE': os.path.join(args.userdir, 'kraken_budget.bin'),
+                'STRATEGY_CHECKPOINT': os.path.join(args.userdir, 'strategy_state.npz'),
+                'STRATEGY_PARAMS_FILE': os.path.join(args.userdir, 'strategy_params.json'),
+                'MEM_WATCHDOG_DIR': os.path.join(args.userdir, 'logs', 'memory')})
+    stub_config = kraken_stub.StubConfig(counter_max=1e9)
+    clock = VirtualClock(start, args.speed)
+    stub = kraken_stub.start_stub(config=stub_config, clock=clock, market=market)
+    env['KRAKEN_STUB_URL'] = stub.url
+    config_path = prepare_userdir(args.userdir, stub.url, pairs, args.wallet)
+    cmd = [args.freqtrade, 'trade', '--config', config_path, '--strategy', 'SimplePortfolio',
+           '--userdir', args.userdir, '--logfile', logfile,
+           '--db-url', f"sqlite:///{os.path.join(args.userdir, 'tradesv3.replay.sqlite')}", '-v']
+
+    wall = args.hours * 3600 / args.speed
+    print(f"⏩ Replaying {args.hours:g}h from {datetime.fromtimestamp(start, timezone.utc):%Y-%m-%d %H:%M} UTC "
+          f"at {args.speed:g}x ({wall / 60:.1f} min), "
+          f"{len(market.rows) if market else 0}/{len(pairs)} pairs from recorded candles")
+    # Same anchor for both clocks: libfaketime starts counting when freqtrade is exec'd
+    clock.anchor = time.monotonic()
+    process = subprocess.Popen(cmd, env=env)
+    try:
+        process.wait(timeout=wall)
+    except subprocess.TimeoutExpired:
+        process.terminate()
+        try:
+            process.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            process.kill()
+    except KeyboardInterrupt:
+        process.terminate()
+        process.wait()
+    finally:
+        stub.shutdown()
+    virtual_end = clock()
+
+    with stub.state.lock:
+        calls = dict(stub.state.calls)
+    index = {}
+    log_analytics.update([logfile], index)
+    report = {
+        'start': start,
+        'virtual_hours': round((virtual_end - start) / 3600, 2),
+        'speed': args.speed,
+        'exit_code': process.returncode,
+        'loop': summarize(parse_loops(logfile, args.speed)),
+        'stub_calls': calls,
+        'strategy': log_analytics.combine(index, [logfile]),
+    }
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    loop = report['loop']
+    print(f"📊 {report['virtual_hours']}h replayed, freqtrade exit code {process.returncode}")
+    if loop:
+        print(f"   {loop['cycles']} cycles | loop latency p50 {loop['p50_ms']} ms / p95 {loop['p95_ms']} ms / "
+              f"p99 {loop['p99_ms']} ms / max {loop['max_ms']} ms (wall time)")
+        for cycle in loop['slowest'][:5]:
+            print(f"   slow cycle at {cycle['at']}: {cycle['ms']} ms")
+    else:
+        print(f"   no loop timings in {logfile} (freqtrade logs them at -v)")
+    print(f"   stub calls: " + ', '.join(f"{name} {count}" for name, count in sorted(calls.items(), key=lambda c: -c[1])))
+    for pair, stats in report['strategy'].items():
+        print(f"   {pair:<12} signals {stats['signals']:>4} | DCA {stats['dca_adds']:>3} | "
+              f"exits {stats['exits']:>3} | P&L ${stats['realized_pnl']:.2f}")
+    if args.output:
+        print(f"💾 Report saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+Vectorized what-if simulator for SimplePortfolio's ROI table and stoploss.
+
+Replays recorded 5m candles for all pairs at once and evaluates every
+(ROI table, stoploss) combination in the same pass: trade state is kept in
+(pairs x params) arrays and the ROI threshold for every combination and
+trade age comes from one precomputed (params x minutes) table. The
+strategy's entry rule (enter on every candle while flat) and the DCA ladder
+from dca_engine are applied identically to every combination.
+
+    python roi_simulator.py --datadir user_data/data/kraken --top 15
+    python roi_simulator.py --stub-days 14          # synthetic candles from kraken_stub
+
+Simplifications: pairs are simulated independently (no max_open_trades
+cap), exit signals are ignored, and fills happen at the candle price that
+triggered them.
+"""
+import argparse
+import gzip
+import json
+import os
+import time
+
+import numpy as np
+
+from dca_engine import DcaLadder, DEFAULT_TIERS
+
+TIMEFRAME_MINUTES = 5
+# Mirrors SimplePortfolio.minimal_roi / stoploss, used as the baseline row
+BASELINE_ROI = {0: 0.08, 60: 0.06, 180: 0.04, 360: 0.03, 720: 0.02}
+BASELINE_STOPLOSS = -0.15
+
+
+def parse_range(value):
+    """'start:stop:step' (inclusive) or a comma separated list -> array"""
+    if ':' in value:
+        start, stop, step = (float(v) for v in value.split(':'))
+        return np.round(np.arange(start, stop + step / 2, step), 6)
+    return np.array([float(v) for v in value.split(',')])
+
+
+def pair_filename(pair, timeframe='5m', fmt='json'):
+    suffix = {'json': 'json', 'jsongz': 'json.gz'}[fmt]
+    return f"{pair.replace('/', '_')}-{timeframe}.{suffix}"
+
+
+def load_pair(datadir, pair):
+    """[ms, open, high, low, close, volume] rows from freqtrade's json/jsongz data files"""
+    for fmt in ('json', 'jsongz'):
+        path = os.path.join(datadir, pair_filename(pair, fmt=fmt))
+        if os.path.exists(path):
+            opener = gzip.open if fmt == 'jsongz' else open
+            with opener(path, 'rt') as f:
+                return np.array(json.load(f), dtype=np.float64)
+    return None
+
+
+def stub_candles(pairs, days, seed=42):
+    """Synthetic candles from the Kraken stub's deterministic price model"""
+    import kraken_stub
+    state = kraken_stub.KrakenStubState(kraken_stub.StubConfig(seed=seed))
+    end = int(time.time() // 300) * 300
+    data = {}
+    for pair in pairs:
+        rows = [state.candle(pair, t, 300) for t in range(end - days * 86400, end, 300)]
+        data[pair] = np.array([[r[0] * 1000, *map(float, r[1:5]), float(r[6])] for r in rows])
+    return data
+
+
+def align(data):
+    """Stack pairs on a common time index; missing candles are NaN"""
+    times = np.unique(np.concatenate([rows[:, 0] for rows in data.values()]))
+    ohlc = np.full((4, len(data), len(times)), np.nan)
+    for i, rows in enumerate(data.values()):
+        idx = np.searchsorted(times, rows[:, 0])
+        ohlc[:, i, idx] = rows[:, 1:5].T
+    return times, ohlc
+
+
+def roi_tables(starts, ends, keys):
+    """(start, end) grid -> ROI values per key, linearly interpolated from start to end"""
+    weights = np.linspace(0, 1, len(keys))
+    start_grid, end_grid = np.meshgrid(starts, ends, indexing='ij')
+    start_grid, end_grid = start_grid.ravel(), end_grid.ravel()
+    keep = end_grid <= start_grid
+    values = start_grid[keep, None] + (end_grid[keep, None] - start_grid[keep, None]) * weights[None, :]
+    return values
+
+
+def roi_curve(values, keys, horizon):
+    """(params x candles-since-entry) ROI threshold table"""
+    key_candles = np.array(keys) // TIMEFRAME_MINUTES
+    column_key = np.searchsorted(key_candles, np.arange(horizon), side='right') - 1
+    return values[:, column_key]
+
+
+def simulate(ohlc, roi_values, stoplosses, keys, ladder, stake=2.0, fee=0.0026):
+    """Profit and max drawdown for every (roi table, stoploss) combination"""
+    opens, highs, lows, closes = ohlc
+    n_pairs, n_times = closes.shape
+    roi_idx, sl_idx = np.meshgrid(np.arange(len(roi_values)), np.arange(len(stoplosses)), indexing='ij')
+    roi_idx, sl_idx = roi_idx.ravel(), sl_idx.ravel()
+    n_params = len(roi_idx)
+    horizon = keys[-1] // TIMEFRAME_MINUTES + 1
+    thresholds = roi_curve(roi_values, keys, horizon)[roi_idx]          # (params, horizon)
+    stop = stoplosses[sl_idx][None, :]                                   # (1, params)
+    param_cols = np.arange(n_params)[None, :]
+
+    shape = (n_pairs, n_params)
+    in_trade = np.zeros(shape, dtype=bool)
+    qty = np.zeros(shape)
+    cost = np.zeros(shape)
+    entries = np.zeros(shape, dtype=np.int64)
+    entry_t = np.zeros(shape, dtype=np.int64)
+    realized = np.zeros(n_params)
+    trades = np.zeros(n_params, dtype=np.int64)
+    wins = np.zeros(n_params, dtype=np.int64)
+    peak = np.zeros(n_params)
+    max_drawdown = np.zeros(n_params)
+
+    for t in range(n_times):
+        o, h, l, c = (x[:, t, None] for x in (opens, highs, lows, closes))
+        live = ~np.isnan(c)                                              # (pairs, 1)
+        avg = np.divide(cost, qty, out=np.zeros(shape), where=qty > 0)
+        age = np.minimum(t - entry_t, horizon - 1)
+        roi = thresholds[param_cols, age]
+
+        # Stoploss is checked before ROI, like freqtrade's backtesting
+        stop_price = avg * (1 + stop)
+        hit_stop = in_trade & live & (l <= stop_price)
+        roi_price = avg * (1 + roi)
+        hit_roi = in_trade & live & ~hit_stop & (h >= roi_price)
+        exit_price = np.where(hit_stop, np.minimum(o, stop_price), np.maximum(o, roi_price))
+        exiting = hit_stop | hit_roi
+        pnl = np.where(exiting, qty * exit_price * (1 - fee) - cost, 0.0)
+        realized += pnl.sum(axis=0)
+        trades += exiting.sum(axis=0)
+        wins += (exiting & (pnl > 0)).sum(axis=0)
+        in_trade &= ~exiting
+
+        # DCA at the close for trades still open
+        holding = in_trade & live
+        profit = np.divide(qty * c * (1 - fee), cost, out=np.zeros(shape), where=holding) - 1
+        _, multipliers = ladder.decide(np.where(holding, profit, np.nan).ravel(), entries.ravel())
+        add = np.nan_to_num(multipliers.reshape(shape)) * stake * holding
+        qty += np.divide(add * (1 - fee), c, out=np.zeros(shape), where=add > 0)
+        cost += add
+        entries += add > 0
+
+        # Enter on every candle while flat (the strategy's entry rule)
+        entering = ~in_trade & live
+        qty = np.where(entering, stake * (1 - fee) / np.where(live, c, 1.0), qty)
+        cost = np.where(entering, stake, cost)
+        entries = np.where(entering, 1, entries)
+        entry_t = np.where(entering, t, entry_t)
+        in_trade |= entering
+
+        # Mark open trades at the close for the equity curve
+        mark = np.where(in_trade & live, qty * np.where(live, c, 0.0) * (1 - fee) - cost, 0.0).sum(axis=0)
+        equity = realized + mark
+        peak = np.maximum(peak, equity)
+        max_drawdown = np.maximum(max_drawdown, peak - equity)
+
+    last_close = np.array([row[~np.isnan(row)][-1] for row in closes])[:, None]
+    open_pnl = np.where(in_trade, qty * last_close * (1 - fee) - cost, 0.0).sum(axis=0)
+    return {
+        'roi_index': roi_idx,
+        'stoploss': stoplosses[sl_idx],
+        'profit': realized + open_pnl,
+        'realized': realized,
+        'max_drawdown': max_drawdown,
+        'trades': trades,
+        'win_rate': np.divide(wins, trades, out=np.zeros(n_params), where=trades > 0),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Grid-search ROI tables and stoploss in one vectorized pass")
+    parser.add_argument('--datadir', default='user_data/data/kraken')
+    parser.add_argument('--pairs', help="comma separated pairs (default: the bot's whitelist)")
+    parser.add_argument('--stub-days', type=int, help="use N days of synthetic stub candles instead of --datadir")
+    parser.add_argument('--roi-start', default='0.02:0.12:0.005', help="ROI at 0 minutes, start:stop:step")
+    parser.add_argument('--roi-end', default='0.005:0.04:0.0025', help="ROI at the last key, start:stop:step")
+    parser.add_argument('--stoploss', default='-0.30:-0.05:0.01', help="stoploss values, start:stop:step")
+    parser.add_argument('--stake', type=float, default=2.0, help="initial stake and DCA base stake")
+    parser.add_argument('--fee', type=float, default=0.0026)
+    parser.add_argument('--top', type=int, default=10)
+    parser.add_argument('--sort', choices=('profit', 'calmar'), default='profit',
+                        help="rank by profit or profit / max drawdown")
+    parser.add_argument('--output', help="write all combinations as JSON")
+    args = parser.parse_args()
+
+    if args.pairs:
+        pairs = args.pairs.split(',')
+    else:
+        from start import get_config_template
+        pairs = get_config_template()['exchange']['pair_whitelist']
+
+    if args.stub_days:
+        data = stub_candles(pairs, args.stub_days)
+    else:
+        data = {pair: rows for pair in pairs if (rows := load_pair(args.datadir, pair)) is not None}
+    if not data:
+        print(f"❌ No candle data found in {args.datadir} (try --stub-days 14)")
+        return
+
+    keys = sorted(BASELINE_ROI)
+    roi_values = roi_tables(parse_range(args.roi_start), parse_range(args.roi_end), keys)
+    roi_values = np.vstack([roi_values, [BASELINE_ROI[k] for k in keys]])
+    stoplosses = np.union1d(parse_range(args.stoploss), [BASELINE_STOPLOSS])
+    ladder = DcaLadder(DEFAULT_TIERS, max_entries=13)
+
+    times, ohlc = align(data)
+    combos = len(roi_values) * len(stoplosses)
+    print(f"🧮 {combos} combinations x {len(data)} pairs x {len(times)} candles "
+          f"({(times[-1] - times[0]) / 86400000:.1f} days)")
+    started = time.perf_counter()
+    result = simulate(ohlc, roi_values, stoplosses, keys, ladder, args.stake, args.fee)
+    elapsed = time.perf_counter() - started
+    print(f"⏱️  Simulated in {elapsed:.2f}s ({combos / elapsed:.0f} combinations/s)")
+
+    score = result['profit']
+    if args.sort == 'calmar':
+        score = result['profit'] / np.maximum(result['max_drawdown'], 1e-9)
+    order = np.argsort(-score)
+    baseline = np.flatnonzero((result['roi_index'] == len(roi_values) - 1)
+                              & np.isclose(result['stoploss'], BASELINE_STOPLOSS))[0]
+
+    def row(i):
+        roi = dict(zip(keys, np.round(roi_values[result['roi_index'][i]], 4).tolist()))
+        return {'roi': roi, 'stoploss': round(float(result['stoploss'][i]), 4),
+                'profit': round(float(result['profit'][i]), 4),
+                'max_drawdown': round(float(result['max_drawdown'][i]), 4),
+                'trades': int(result['trades'][i]), 'win_rate': round(float(result['win_rate'][i]), 3)}
+
+    print(f"{'rank':>4}  {'ROI 0m -> 720m':<18}{'stoploss':>9}{'profit $':>11}{'max DD $':>10}{'trades':>8}{'win %':>7}")
+    for rank, i in enumerate(order[:args.top], 1):
+        r = row(i)
+        print(f"{rank:>4}  {r['roi'][0]:.3f} -> {r['roi'][keys[-1]]:.4f}   {r['stoploss']:>9}{r['profit']:>11}"
+              f"{r['max_drawdown']:>10}{r['trades']:>8}{r['win_rate'] * 100:>7.1f}")
+    b = row(baseline)
+    print(f"base  {b['roi'][0]:.3f} -> {b['roi'][keys[-1]]:.4f}   {b['stoploss']:>9}{b['profit']:>11}"
+          f"{b['max_drawdown']:>10}{b['trades']:>8}{b['win_rate'] * 100:>7.1f}  (current strategy)")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'pairs': list(data), 'candles': len(times), 'baseline': b,
+                       'results': [row(i) for i in order]}, f, indent=2)
+        print(f"💾 All combinations saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Single-writer / many-reader snapshot slot in shared memory, guarded by a seqlock.
+
+The segment is an anonymous shared mmap created before the dashboard forks
+its workers, so every process maps the same pages. Layout:
+
+    seq u64 | version u64 | length u32 | payload bytes
+
+The writer bumps `seq` to odd, writes version, length and payload, then
+bumps `seq` to even. A reader copies the slot and retries if `seq` was odd
+or changed meanwhile, so readers never block the writer or each other and
+need no IPC round-trip. Checking for a new version only reads the header.
+"""
+import mmap
+import struct
+import time
+
+HEADER = struct.Struct('<QQI')
+SEQ = struct.Struct('<Q')
+
+
+class SnapshotTooLarge(ValueError):
+    pass
+
+
+class SeqlockSegment:
+    def __init__(self, size=1 << 20):
+        self.size = size
+        self.buf = mmap.mmap(-1, HEADER.size + size)  # MAP_SHARED: survives fork
+
+    def write(self, version, payload):
+        """Publish payload as `version`; only one process may write"""
+        if len(payload) > self.size:
+            raise SnapshotTooLarge(f"snapshot of {len(payload)} bytes exceeds the {self.size} byte segment")
+        seq = SEQ.unpack_from(self.buf, 0)[0]
+        SEQ.pack_into(self.buf, 0, seq + 1)
+        self.buf[HEADER.size:HEADER.size + len(payload)] = payload
+        HEADER.pack_into(self.buf, 0, seq + 1, version, len(payload))
+        SEQ.pack_into(self.buf, 0, seq + 2)
+
+    def version(self):
+        """Latest published version (0 before the first write)"""
+        while True:
+            seq, version, _ = HEADER.unpack_from(self.buf, 0)
+            if not seq & 1 and SEQ.unpack_from(self.buf, 0)[0] == seq:
+                return version
+            time.sleep(0)
+
+    def read(self):
+        """(version, payload) of a consistent snapshot"""
+        while True:
+            seq, version, length = HEADER.unpack_from(self.buf, 0)
+            if seq & 1:
+                time.sleep(0)
+                continue
+            payload = self.buf[HEADER.size:HEADER.size + length]
+            if SEQ.unpack_from(self.buf, 0)[0] == seq:
+                return version, payload
+            time.sleep(0)
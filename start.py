@@ -6,6 +6,25 @@ import sys
 import time
 import shutil
 
+import kraken_stub
+import pair_scanner
+import strategy_params
+
+# Modules SimplePortfolio imports; copied next to it in user_data/strategies
+STRATEGY_SUPPORT_MODULES = [
+    'exchange_budget.py',
+    'candle_ring.py',
+    'dca_engine.py',
+    'informative.py',
+    'order_book_cache.py',
+    'trade_events.py',
+    'health.py',
+    'strategy_state.py',
+    'strategy_params.py',
+    'mem_watchdog.py',
+    'correlation.py',
+]
+
 def setup_logging():
     """Setup comprehensive logging"""
     import logging
@@ -46,7 +65,7 @@ def get_config_template():
         },
         "entry_pricing": {
             "price_side": "other",
-            "use_order_book": True,
+            "use_order_book": False,
             "order_book_top": 1,
             "price_last_balance": 0.0,
             "check_depth_of_market": {
@@ -56,7 +75,7 @@ def get_config_template():
         },
         "exit_pricing": {
             "price_side": "other",
-            "use_order_book": True,
+            "use_order_book": False,
             "order_book_top": 1
         },
         "exchange": {
@@ -158,6 +177,12 @@ def main():
     api_key = os.getenv('KRAKEN_API_KEY')
     secret_key = os.getenv('KRAKEN_SECRET_KEY')
     
+    # KRAKEN_STUB_URL points the bot at a local Kraken stand-in (kraken_stub.py) with its own
+    # keys: the real ones are never signed with or sent to the stub's host
+    if kraken_stub.stub_url():
+        api_key, secret_key = kraken_stub.stub_credentials()
+        logger.info(f"Using local Kraken stub at {kraken_stub.stub_url()}")
+    
     if not api_key or not secret_key:
         logger.error("Missing API keys!")
         logger.error("Set KRAKEN_API_KEY and KRAKEN_SECRET_KEY environment variables")
@@ -179,6 +204,42 @@ def main():
         
         config['exchange']['key'] = api_key
         config['exchange']['secret'] = secret_key
+        kraken_stub.apply_stub_to_config(config)
+        
+        # A params file (strategy_params.py) is reloaded while running; its pairs reach
+        # freqtrade through RemotePairList, so the whitelist changes without a restart
+        params_watcher = strategy_params.ParamsWatcher(quote=config['stake_currency'])
+        hot_params = os.path.exists(params_watcher.path)
+        file_pairs = (params_watcher.poll() or {}).get('pairs') if hot_params else None
+        
+        # DYNAMIC_PAIRLIST=1 swaps the static whitelist for the scanner's ranked top N
+        scanner = None
+        static_whitelist = list(config['exchange']['pair_whitelist'])
+        if pair_scanner.dynamic_enabled():
+            scanner = pair_scanner.scanner_from_env()
+            if file_pairs:
+                scanner.pinned = tuple(file_pairs)
+            pairs = scanner.ensure_pairlist(config['exchange']['pair_whitelist'])
+            config['pairlists'] = pair_scanner.remote_pairlist_config(scanner.top_n, scanner.pairlist_path,
+                                                                      scanner.interval)
+            config['exchange']['pair_whitelist'] = pairs
+            logger.info(f"Dynamic pair list: top {scanner.top_n} by liquidity, rescanned every {scanner.interval:.0f}s")
+        elif hot_params:
+            pairs = file_pairs or static_whitelist
+            pair_scanner.write_json(pair_scanner.PAIRLIST_FILE,
+                                    {'pairs': pairs, 'refresh_period': int(strategy_params.RELOAD_SECS)})
+            config['pairlists'] = pair_scanner.remote_pairlist_config(strategy_params.MAX_PAIRS,
+                                                                      pair_scanner.PAIRLIST_FILE,
+                                                                      strategy_params.RELOAD_SECS)
+            config['exchange']['pair_whitelist'] = pairs
+        
+        reloader = None
+        if hot_params:
+            default = pair_scanner.scanner_pinned() if scanner else static_whitelist
+            reloader = strategy_params.PairsReloader(params_watcher, default, pair_scanner.PAIRLIST_FILE,
+                                                     scanner=scanner)
+            logger.info(f"Strategy params hot-reloaded from {params_watcher.path} "
+                        f"every {strategy_params.RELOAD_SECS:.0f}s")
         
         # Setup directories
         os.makedirs('user_data/strategies', exist_ok=True)
@@ -191,9 +252,11 @@ def main():
         
         logger.info("Configuration created from embedded template")
         
-        # Copy strategy
+        # Copy strategy and the helper modules it imports
         if os.path.exists('SimplePortfolio.py'):
             shutil.copy('SimplePortfolio.py', 'user_data/strategies/')
+            for module in STRATEGY_SUPPORT_MODULES:
+                shutil.copy(module, 'user_data/strategies/')
             logger.info("Strategy copied to user_data/strategies/")
         else:
             logger.error("SimplePortfolio.py not found!")
@@ -216,13 +279,18 @@ def main():
         # Small delay to ensure logs are written
         time.sleep(2)
         
-        # Clear cached data before starting to fix stuck candles
+        # Clear cached data before starting to fix stuck candles (CLEAR_DATA_CACHE=0 keeps backfilled history)
         cache_dir = 'user_data/data'
-        if os.path.exists(cache_dir):
+        if os.path.exists(cache_dir) and os.getenv('CLEAR_DATA_CACHE', '1') != '0':
             logger.info("Clearing cached data to fix stuck candles...")
             shutil.rmtree(cache_dir)
             os.makedirs(cache_dir, exist_ok=True)
         
+        if scanner:
+            scanner.start()
+        if reloader:
+            reloader.start()
+        
         # FIXED COMMAND - removed invalid argument
         cmd = [
             'freqtrade', 'trade',
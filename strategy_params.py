@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+Hot-reloadable strategy parameters from one JSON file.
+
+PARAMS_FILE may set any of:
+
+    {
+      "minimal_roi": {"0": 0.08, "60": 0.06, "360": 0.03},
+      "stoploss": -0.15,
+      "dca_tiers": [{"below": -0.15, "multiplier": 3.0, "label": "MASSIVE"},
+                    {"below": -0.01, "multiplier": 1.0, "label": "SMALL"}],
+      "pairs": ["BTC/USD", "ETH/USD", "SOL/USD"]
+    }
+
+Every DCA tier needs a capital-letters label. Keys left out (or removed
+later) fall back to the built-in values. The file
+is checked with one stat() per cycle and only parsed when its mtime or size
+changed. The whole file is validated before anything is swapped, so a typo
+or a half-written file leaves the running parameters untouched; deleting
+the file keeps whatever was last applied.
+
+SimplePortfolio applies `minimal_roi`, `stoploss` and `dca_tiers` in
+bot_loop_start, between cycles. `pairs` belongs to the launcher: start.py
+writes it to the RemotePairList file freqtrade reads (in dynamic mode it
+replaces the pinned pairs), and pairs that stay listed keep their rings.
+
+    python strategy_params.py                  # validate the file and print what it sets
+"""
+import argparse
+import json
+import logging
+import math
+import os
+import re
+import threading
+
+import dca_engine
+
+logger = logging.getLogger(__name__)
+
+PARAMS_FILE = os.getenv('STRATEGY_PARAMS_FILE', 'user_data/strategy_params.json')
+RELOAD_SECS = float(os.getenv('PARAMS_RELOAD_SECS', '30'))
+MAX_PAIRS = int(os.getenv('PARAMS_MAX_PAIRS', '50'))
+KEYS = ('minimal_roi', 'stoploss', 'dca_tiers', 'pairs')
+# DCA labels go into the "<LABEL> DCA: Adding" log line, which log_analytics.LINE parses as [A-Z]+
+LABEL = re.compile(r'[A-Z]+')
+MAX_ENTRIES = 13   # SimplePortfolio passes max_entry_position_adjustment + 1
+
+
+class ParamsError(ValueError):
+    pass
+
+
+def number(value, name):
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value):
+        raise ParamsError(f"{name} must be a finite number, got {value!r}")
+    return float(value)
+
+
+def validate_roi(roi):
+    if not isinstance(roi, dict) or not roi:
+        raise ParamsError("minimal_roi must be a non-empty {minutes: ratio} object")
+    table = {}
+    for minutes, ratio in roi.items():
+        try:
+            key = int(minutes)
+        except (TypeError, ValueError):
+            raise ParamsError(f"minimal_roi key {minutes!r} is not a number of minutes") from None
+        if key < 0 or key in table:
+            raise ParamsError(f"minimal_roi key {minutes!r} is negative or duplicated")
+        table[key] = number(ratio, f"minimal_roi[{minutes!r}]")
+    if 0 not in table:
+        raise ParamsError("minimal_roi needs a \"0\" entry")
+    # freqtrade keeps the table as int minutes in ascending order
+    return dict(sorted(table.items()))
+
+
+def validate_stoploss(stoploss):
+    stoploss = number(stoploss, 'stoploss')
+    if not -1 <= stoploss < 0:
+        raise ParamsError(f"stoploss must be in [-1, 0), got {stoploss}")
+    return stoploss
+
+
+def validate_tiers(tiers, max_entries=MAX_ENTRIES):
+    if not isinstance(tiers, list):
+        raise ParamsError("dca_tiers must be a list of {below, multiplier, label} objects")
+    for tier in tiers:
+        if not isinstance(tier, dict):
+            raise ParamsError(f"dca_tiers entry {tier!r} is not a {{below, multiplier, label}} object")
+        label = tier.get('label')
+        if not isinstance(label, str) or not LABEL.fullmatch(label):
+            raise ParamsError(f"dca_tiers label {label!r} must be capital letters only, e.g. \"MASSIVE\"")
+    try:
+        ladder = dca_engine.DcaLadder.from_config(tiers, max_entries)
+    except (TypeError, KeyError) as e:
+        raise ParamsError(f"dca_tiers entry is malformed: {e!r}") from None
+    except ValueError as e:
+        raise ParamsError(str(e)) from None
+    # Deepest loss first, like dca_engine.DEFAULT_TIERS
+    return tuple(zip(ladder.thresholds.tolist(), ladder.multipliers[:-1].tolist(), ladder.labels[:-1]))
+
+
+def validate_pairs(pairs, quote='USD'):
+    if not isinstance(pairs, list) or not pairs:
+        raise ParamsError("pairs must be a non-empty list")
+    if len(pairs) > MAX_PAIRS:
+        raise ParamsError(f"pairs lists {len(pairs)} pairs, at most {MAX_PAIRS} (PARAMS_MAX_PAIRS)")
+    for pair in pairs:
+        if not isinstance(pair, str) or pair.count('/') != 1 or not pair.endswith(f'/{quote}'):
+            raise ParamsError(f"pair {pair!r} is not a BASE/{quote} symbol")
+    if len(set(pairs)) != len(pairs):
+        raise ParamsError("pairs contains duplicates")
+    return list(pairs)
+
+
+def validate(raw, quote='USD', max_entries=MAX_ENTRIES):
+    """Normalized params from a parsed file; raises ParamsError on the first problem"""
+    if not isinstance(raw, dict):
+        raise ParamsError("params file must hold a JSON object")
+    unknown = set(raw) - set(KEYS)
+    if unknown:
+        raise ParamsError(f"unknown keys: {', '.join(sorted(unknown))}")
+    params = {}
+    if 'minimal_roi' in raw:
+        params['minimal_roi'] = validate_roi(raw['minimal_roi'])
+    if 'stoploss' in raw:
+        params['stoploss'] = validate_stoploss(raw['stoploss'])
+    if 'dca_tiers' in raw:
+        params['dca_tiers'] = validate_tiers(raw['dca_tiers'], max_entries)
+    if 'pairs' in raw:
+        params['pairs'] = validate_pairs(raw['pairs'], quote)
+    return params
+
+
+def read(path=PARAMS_FILE, quote='USD', max_entries=MAX_ENTRIES):
+    with open(path) as f:
+        try:
+            raw = json.load(f)
+        except ValueError as e:
+            raise ParamsError(f"not valid JSON: {e}") from None
+    return validate(raw, quote, max_entries)
+
+
+class ParamsWatcher:
+    """One stat() per poll; parses and validates only when the file changed"""
+
+    def __init__(self, path=PARAMS_FILE, quote='USD', max_entries=MAX_ENTRIES):
+        self.path = path
+        self.quote = quote
+        self.max_entries = max_entries
+        self.signature = None
+        self.current = {}   # last params that validated
+
+    def poll(self):
+        """Newly validated params when the file changed, else None"""
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return None   # no file (or removed): keep whatever is running
+        signature = (st.st_mtime_ns, st.st_size, st.st_ino)
+        if signature == self.signature:
+            return None
+        self.signature = signature
+        try:
+            params = read(self.path, self.quote, self.max_entries)
+        except (OSError, ParamsError) as e:
+            logger.warning(f"Strategy params {self.path} rejected, keeping the running values: {e}")
+            return None
+        if params == self.current:
+            return None   # touched or rewritten with the same values
+        self.current = params
+        return params
+
+
+class PairsReloader:
+    """Launcher side: forwards the params file's `pairs` to freqtrade's RemotePairList file
+
+    `default` is what applies while the file sets no pairs: the config's
+    whitelist, or the pinned pairs in dynamic mode.
+    """
+
+    def __init__(self, watcher, default, pairlist_path, interval=RELOAD_SECS, scanner=None):
+        self.watcher = watcher
+        self.default = list(default)
+        self.pairlist_path = pairlist_path
+        self.interval = interval
+        self.scanner = scanner
+        self.stop_event = threading.Event()
+
+    def apply(self, pairs):
+        import pair_scanner   # launcher only; not shipped next to the strategy
+        if self.scanner is not None:
+            # Dynamic mode: the pairs become the scanner's pinned set, ranked pairs fill the rest
+            self.scanner.pinned = tuple(pairs)
+            try:
+                self.scanner.scan()
+            except Exception as e:
+                logger.warning(f"Pair scan after params reload failed, pinned pairs apply next scan: {e}")
+            return
+        previous = pair_scanner.read_pairs(self.pairlist_path, default=[])
+        if pairs == previous:
+            return
+        pair_scanner.write_json(self.pairlist_path, {'pairs': pairs, 'refresh_period': int(self.interval)})
+        logger.info(f"Whitelist reloaded: {len(pairs)} pairs (+{', '.join(sorted(set(pairs) - set(previous))) or '-'}"
+                    f" / -{', '.join(sorted(set(previous) - set(pairs))) or '-'})")
+
+    def check(self):
+        params = self.watcher.poll()
+        if params is not None:
+            self.apply(params.get('pairs', self.default))
+
+    def run(self):
+        while not self.stop_event.wait(self.interval):
+            try:
+                self.check()
+            except Exception as e:
+                logger.warning(f"Params reload failed: {e}")
+
+    def start(self):
+        thread = threading.Thread(target=self.run, name='params-reloader', daemon=True)
+        thread.start()
+        return thread
+
+    def stop(self):
+        self.stop_event.set()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Validate the hot-reloadable strategy params file")
+    parser.add_argument('path', nargs='?', default=PARAMS_FILE)
+    parser.add_argument('--quote', default='USD')
+    args = parser.parse_args()
+    try:
+        params = read(args.path, args.quote)
+    except (OSError, ParamsError) as e:
+        print(f"❌ {args.path}: {e}")
+        raise SystemExit(1)
+    print(f"✅ {args.path} is valid" + ("" if params else " (sets nothing)"))
+    if 'minimal_roi' in params:
+        print("   minimal_roi " + ", ".join(f"{m}m: {r:.1%}" for m, r in params['minimal_roi'].items()))
+    if 'stoploss' in params:
+        print(f"   stoploss    {params['stoploss']:.1%}")
+    for below, multiplier, label in params.get('dca_tiers', ()):
+        print(f"   dca tier    {label:<10} below {below:.1%} -> x{multiplier:g}")
+    if 'pairs' in params:
+        print(f"   pairs       {', '.join(params['pairs'])}")
+
+
+if __name__ == "__main__":
+    main()
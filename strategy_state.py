@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Checkpoint of SimplePortfolio's per-pair derived state across restarts.
+
+The strategy's candle rings (OHLCV plus indicator and informative slots) and
+the higher-timeframe resamplers (closed bars, forming bar, EMA accumulator,
+last consumed candle) are written to one .npz file on shutdown and every
+`interval` seconds once new candles arrived. On start the file is loaded if
+it was written for the same ring layout and timeframes.
+
+A restored pair is only trusted after its first fresh dataframe agrees with
+it: the ring's newest candle must be in the dataframe and every overlapping
+candle must have the same OHLC. Then only the candles since the checkpoint
+are appended and resampled, and the 1h/4h EMAs keep their full history
+instead of restarting from the 720 candles freqtrade downloads. A pair
+that does not match is rebuilt from scratch as before.
+
+    python strategy_state.py                  # describe the saved checkpoint
+"""
+import argparse
+import io
+import json
+import logging
+import os
+import time
+
+import numpy as np
+
+from candle_ring import epoch_ms
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_FILE = os.getenv('STRATEGY_CHECKPOINT', 'user_data/strategy_state.npz')
+FORMAT = 1
+OHLC = slice(1, 5)
+
+
+def layout(candles, informative):
+    """What a checkpoint must have been written for to be loadable"""
+    return {'format': FORMAT, 'capacity': candles.capacity, 'indicators': list(candles.indicators),
+            'timeframes': informative.timeframes, 'base_timeframe': informative.base_timeframe}
+
+
+def save(path, candles, informative):
+    """Write every pair's ring and resampler state atomically; returns the pairs saved"""
+    arrays = {}
+    pairs = [pair for pair in candles.pairs() if candles.rings[pair].size]
+    for i, pair in enumerate(pairs):
+        arrays[f'ring_{i}'] = candles.rings[pair].window()
+        for j, (bars, scalars) in enumerate(informative.state(pair) or ()):
+            arrays[f'bars_{i}_{j}'] = bars
+            arrays[f'scalars_{i}_{j}'] = scalars
+    meta = {**layout(candles, informative), 'pairs': pairs, 'saved_at': time.time()}
+    arrays['meta'] = np.frombuffer(json.dumps(meta).encode(), dtype=np.uint8)
+    buffer = io.BytesIO()
+    np.savez(buffer, **arrays)
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, 'wb') as f:
+        f.write(buffer.getbuffer())
+    os.replace(tmp, path)
+    return pairs
+
+
+def read_meta(archive):
+    return json.loads(archive['meta'].tobytes())
+
+
+def load(path, candles, informative):
+    """Restore the rings and resamplers saved in path; returns (pairs restored, checkpoint age)"""
+    try:
+        with np.load(path) as archive:
+            meta = read_meta(archive)
+            expected = layout(candles, informative)
+            if {key: meta.get(key) for key in expected} != expected:
+                logger.info(f"Strategy checkpoint {path} was written for another layout, ignoring it")
+                return [], None
+            for i, pair in enumerate(meta['pairs']):
+                candles.drop(pair)
+                candles.ring(pair).load(archive[f'ring_{i}'])
+                informative.drop(pair)
+                states = [(archive[f'bars_{i}_{j}'], archive[f'scalars_{i}_{j}'])
+                          for j in range(len(informative.timeframes)) if f'bars_{i}_{j}' in archive]
+                if states:
+                    informative.load(pair, states)
+    except FileNotFoundError:
+        return [], None
+    except (OSError, ValueError, KeyError) as e:
+        logger.warning(f"Strategy checkpoint {path} unreadable, starting cold: {e}")
+        return [], None
+    return meta['pairs'], time.time() - meta['saved_at']
+
+
+def matches(ring, dates, ohlc):
+    """True if the ring's candles agree with a fresh dataframe's (dates as epoch ms, ohlc as 4 x n)"""
+    last = ring.last_ts
+    if last is None or not len(dates) or last < dates[0]:
+        return False
+    end = int(np.searchsorted(dates, last, side='right'))
+    if not end or dates[end - 1] != last:
+        return False
+    ring_dates = ring.view('date')
+    start = int(np.searchsorted(dates, ring_dates[0], side='left'))
+    overlap = end - start
+    if overlap <= 0 or overlap > ring.size or not np.array_equal(ring_dates[-overlap:], dates[start:end]):
+        return False
+    ring_ohlc = ring.data[OHLC, ring.head - overlap:ring.head]
+    return bool(np.allclose(ring_ohlc, ohlc[:, start:end], rtol=1e-9, atol=0))
+
+
+class Checkpointer:
+    """Periodic saves plus one validation per restored pair"""
+
+    def __init__(self, candles, informative, path=CHECKPOINT_FILE, interval=300.0, clock=time.time):
+        self.candles = candles
+        self.informative = informative
+        self.path = path
+        self.interval = interval
+        self.clock = clock
+        self.pending = set()   # restored pairs not yet checked against fresh candles
+        self.last_save = clock()
+        self.dirty = False
+
+    def restore(self):
+        pairs, age = load(self.path, self.candles, self.informative)
+        self.pending = set(pairs)
+        if pairs:
+            logger.info(f"Strategy checkpoint: restored {len(pairs)} pairs from {self.path} ({age:.0f}s old)")
+        return pairs
+
+    def verify(self, pair, dataframe):
+        """Before a pair's first sync: keep its restored state only if the dataframe confirms it"""
+        if pair not in self.pending:
+            return None
+        self.pending.discard(pair)
+        ring = self.candles.ring(pair)
+        ohlc = np.vstack([dataframe[c].to_numpy(dtype=np.float64) for c in ('open', 'high', 'low', 'close')])
+        if matches(ring, epoch_ms(dataframe['date']), ohlc):
+            return True
+        logger.info(f"Strategy checkpoint: {pair} does not match fresh candles, rebuilding")
+        self.candles.drop(pair)
+        self.informative.drop(pair)
+        return False
+
+    def touch(self):
+        self.dirty = True
+
+    def maybe_save(self):
+        if self.dirty and self.clock() - self.last_save >= self.interval:
+            self.save()
+
+    def save(self):
+        try:
+            save(self.path, self.candles, self.informative)
+        except OSError as e:
+            logger.warning(f"Strategy checkpoint write failed: {e}")
+            return
+        self.last_save = self.clock()
+        self.dirty = False
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Describe a SimplePortfolio state checkpoint")
+    parser.add_argument('path', nargs='?', default=CHECKPOINT_FILE)
+    args = parser.parse_args()
+    with np.load(args.path) as archive:
+        meta = read_meta(archive)
+        print(f"📦 {args.path}: {os.path.getsize(args.path) / 1024:.0f} KiB, format {meta['format']}, "
+              f"saved {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(meta['saved_at']))}")
+        print(f"   capacity {meta['capacity']}, timeframes {meta['timeframes']}")
+        for i, pair in enumerate(meta['pairs']):
+            ring = archive[f'ring_{i}']
+            last = time.strftime('%Y-%m-%d %H:%M', time.gmtime(ring[0, -1] / 1000))
+            print(f"   {pair:<12} {ring.shape[1]:>5} candles, last {last} UTC")
+
+
+if __name__ == "__main__":
+    main()
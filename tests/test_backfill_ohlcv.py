@@ -0,0 +1,91 @@
+import threading
+
+import pytest
+
+import backfill_ohlcv
+
+START_MS = 1_700_000_100_000 - 1_700_000_100_000 % 300_000
+END_MS = START_MS + 6 * 3600 * 1000
+
+
+class FakeKraken:
+    """publicGetTrades over one trade per 40s, `page` trades per call"""
+
+    def __init__(self, page=50):
+        self.page = page
+        self.trades = [[str(100 + i % 7), '0.5', (START_MS + i * 40_000) / 1000]
+                       for i in range(int((END_MS - START_MS) / 40_000) + 20)]
+
+    def publicGetTrades(self, params):
+        since = int(params['since'])
+        trades = [t for t in self.trades if int(round(t[2] * 1000)) * 1_000_000 >= since][:self.page]
+        last = int(round(trades[-1][2] * 1000)) * 1_000_000 + 1 if trades else since
+        return {'result': {'XBTUSD': trades, 'last': str(last)}}
+
+
+class FreeLimiter:
+    def acquire(self):
+        pass
+
+
+def job(tmp_path, checkpoints, flush_pages=2):
+    return backfill_ohlcv.PairBackfill('BTC/USD', 'XBTUSD', START_MS, END_MS, '5m', str(tmp_path / 'data'),
+                                       'json', checkpoints, FreeLimiter(), flush_pages)
+
+
+def test_candles_aggregate_trades():
+    aggregator = backfill_ohlcv.CandleAggregator(300_000)
+    assert aggregator.add(0, 10.0, 1.0) is None
+    assert aggregator.add(100_000, 12.0, 1.0) is None
+    assert aggregator.add(200_000, 9.0, 2.0) is None
+    assert aggregator.add(300_000, 11.0, 1.0) == [0, 10.0, 12.0, 9.0, 9.0, 4.0]
+    assert aggregator.close_until(600_000) == [300_000, 11.0, 11.0, 11.0, 11.0, 1.0]
+
+
+def test_full_run_writes_every_closed_candle(tmp_path):
+    checkpoints = backfill_ohlcv.Checkpoints(str(tmp_path / 'checkpoint.json'))
+    summary = job(tmp_path, checkpoints).run(FakeKraken())
+    assert summary['candles'] == 72
+    rows = backfill_ohlcv.read_json(str(tmp_path / 'data' / 'BTC_USD-5m.json'))
+    assert [row[0] for row in rows] == list(range(START_MS, END_MS, 300_000))
+    assert not (tmp_path / 'data' / 'BTC_USD-5m.json.part').exists()
+
+
+def test_wiped_data_dir_ignores_stale_checkpoint(tmp_path):
+    checkpoints = backfill_ohlcv.Checkpoints(str(tmp_path / 'checkpoint.json'))
+    first = job(tmp_path, checkpoints).run(FakeKraken())
+    (tmp_path / 'data' / 'BTC_USD-5m.json').unlink()   # start.py clears user_data/data
+    second = job(tmp_path, checkpoints).run(FakeKraken())
+    assert second['candles'] == first['candles'] == 72
+
+
+def test_interrupted_run_resumes_to_same_candles(tmp_path):
+    reference = job(tmp_path / 'ref', backfill_ohlcv.Checkpoints(str(tmp_path / 'ref.json'))).run(FakeKraken())
+
+    class Interrupting(FakeKraken):
+        calls = 0
+
+        def publicGetTrades(self, params):
+            self.calls += 1
+            if self.calls == 5:
+                stop.set()
+            return super().publicGetTrades(params)
+
+    stop = threading.Event()
+    checkpoints = backfill_ohlcv.Checkpoints(str(tmp_path / 'checkpoint.json'))
+    with pytest.raises(KeyboardInterrupt):
+        job(tmp_path, checkpoints).run(Interrupting(), stop)
+    resumed = job(tmp_path, checkpoints).run(FakeKraken())
+    assert resumed['candles'] == reference['candles']
+    assert (backfill_ohlcv.read_json(str(tmp_path / 'data' / 'BTC_USD-5m.json'))
+            == backfill_ohlcv.read_json(str(tmp_path / 'ref' / 'data' / 'BTC_USD-5m.json')))
+
+
+def test_killed_run_spool_is_merged_on_start(tmp_path):
+    checkpoints = backfill_ohlcv.Checkpoints(str(tmp_path / 'checkpoint.json'))
+    first = job(tmp_path, checkpoints)
+    first.rows = [[START_MS, 1, 1, 1, 1, 1], [START_MS + 300_000, 2, 2, 2, 2, 1]]
+    first.flush()   # spooled and checkpointed, never merged (process killed)
+    restarted = job(tmp_path, checkpoints)
+    assert len(restarted.rows) == 2
+    assert restarted.cursor == first.cursor
@@ -0,0 +1,29 @@
+import numpy as np
+import pandas as pd
+
+from candle_ring import CandleRing, CandleStore
+
+
+def test_ring_slides_window_within_its_array():
+    ring = CandleRing(4, slack=2)
+    buffer = ring.data
+    for ts in range(10):
+        ring.append(ts, ts, ts, ts, float(ts), 1.0)
+    assert ring.data is buffer
+    assert ring.view('date').tolist() == [6, 7, 8, 9]
+    assert ring.append(9, 9, 9, 9, 99.0, 1.0)          # forming candle updated in place
+    assert ring.view('close').tolist() == [6, 7, 8, 99]
+    assert not ring.append(5, 5, 5, 5, 5.0, 1.0)       # older than the head
+
+
+def test_sync_appends_only_new_candles_and_latest_row():
+    dates = pd.date_range('2024-01-01', periods=8, freq='5min', tz='UTC')
+    frame = pd.DataFrame({'date': dates, 'open': 1.0, 'high': 2.0, 'low': 0.5,
+                          'close': np.arange(8.0), 'volume': 1.0, 'rsi': np.arange(8.0) * 10})
+    store = CandleStore(5, ('rsi',))
+    assert store.sync('BTC/USD', frame.iloc[:6]) == 5
+    assert store.sync('BTC/USD', frame) == 3           # previous head re-read plus two new candles
+    ring = store.ring('BTC/USD')
+    assert ring.view('close').tolist() == [3, 4, 5, 6, 7]
+    assert store.latest('BTC/USD').rsi == 70
+    assert np.shares_memory(ring.frame()['close'].to_numpy(), ring.data)
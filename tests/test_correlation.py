@@ -0,0 +1,76 @@
+import numpy as np
+import pytest
+
+from candle_ring import CandleStore
+from correlation import RollingCorrelation, log_returns
+
+STEP = 300_000   # 5m in ms
+
+
+def random_returns(rng, n, k=3):
+    base = rng.normal(0, 0.01, n)
+    return np.column_stack([base + rng.normal(0, 0.005 * (i + 1), n) for i in range(k)])
+
+
+def test_incremental_window_matches_corrcoef():
+    rng = np.random.default_rng(3)
+    returns = random_returns(rng, 500)
+    engine = RollingCorrelation(window=100, min_periods=10)
+    engine.reset(['A/USD', 'B/USD', 'C/USD'])
+    for row in returns:
+        engine.push(row)
+    exact = np.corrcoef(returns[-100:].T)
+    assert np.allclose(engine.matrix(), exact, atol=1e-10)
+    assert engine.correlation('A/USD', 'C/USD') == pytest.approx(exact[0, 2], abs=1e-10)
+
+
+def test_no_correlation_below_min_periods():
+    engine = RollingCorrelation(window=50, min_periods=10)
+    engine.reset(['A/USD', 'B/USD'])
+    for row in random_returns(np.random.default_rng(1), 9, k=2):
+        engine.push(row)
+    assert engine.correlation('A/USD', 'B/USD') is None
+    assert engine.correlation('A/USD', 'X/USD') is None
+
+
+def test_cluster_uses_threshold():
+    rng = np.random.default_rng(5)
+    base = rng.normal(0, 0.01, 200)
+    returns = np.column_stack([base, base + rng.normal(0, 0.001, 200), rng.normal(0, 0.01, 200)])
+    engine = RollingCorrelation(window=200, min_periods=10)
+    engine.reset(['A/USD', 'B/USD', 'C/USD'])
+    for row in returns:
+        engine.push(row)
+    assert engine.cluster('A/USD', ['A/USD', 'B/USD', 'C/USD'], 0.75) == ['A/USD', 'B/USD']
+
+
+def fill_store(store, closes, start=1_700_000_000_000):
+    for pair, series in closes.items():
+        ring = store.ring(pair)
+        for i, close in enumerate(series):
+            ring.append(start + i * STEP, close, close, close, close, 1.0)
+
+
+def test_sync_from_rings_matches_rebuild():
+    rng = np.random.default_rng(11)
+    closes = {pair: 100 * np.exp(np.cumsum(rng.normal(0, 0.01, 160))) for pair in ('A/USD', 'B/USD', 'C/USD')}
+    store = CandleStore(400)
+    fill_store(store, {pair: series[:120] for pair, series in closes.items()})
+    engine = RollingCorrelation(window=100, min_periods=10)
+    assert engine.sync(store, list(closes)) == 100         # rebuilt: a full window from the last 101 closes
+    fill_store(store, {pair: series[120:] for pair, series in closes.items()},
+               start=1_700_000_000_000 + 120 * STEP)
+    assert engine.sync(store, list(closes)) == 40          # one push per new candle
+    assert engine.sync(store, list(closes)) == 0
+
+    expected = log_returns(np.column_stack([closes[pair] for pair in sorted(closes)]))[-100:]
+    assert np.allclose(engine.matrix(), np.corrcoef(expected.T), atol=1e-10)
+
+
+def test_sync_leaves_out_lagging_pairs():
+    rng = np.random.default_rng(2)
+    store = CandleStore(400)
+    fill_store(store, {'A/USD': 100 + rng.random(60), 'B/USD': 100 + rng.random(60), 'C/USD': 100 + rng.random(40)})
+    engine = RollingCorrelation(window=100, min_periods=10)
+    engine.sync(store, ['A/USD', 'B/USD', 'C/USD'])
+    assert engine.pairs == ['A/USD', 'B/USD']
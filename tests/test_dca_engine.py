@@ -0,0 +1,72 @@
+import numpy as np
+import pytest
+
+import dca_engine
+from dca_engine import DcaLadder
+
+
+@pytest.fixture
+def ladder():
+    return DcaLadder(dca_engine.DEFAULT_TIERS, max_entries=4)
+
+
+def test_tiers_sorted_deepest_first(ladder):
+    assert ladder.thresholds.tolist() == [-0.15, -0.10, -0.06, -0.01]
+    assert ladder.labels == ('MASSIVE', 'BIG', 'MEDIUM', 'SMALL', None)
+
+
+def test_decide_picks_tier_below_threshold(ladder):
+    profits = [-0.20, -0.12, -0.07, -0.02, -0.005, 0.03]
+    tiers, multipliers = ladder.decide(profits, [1] * len(profits))
+    assert [ladder.labels[t] for t in tiers] == ['MASSIVE', 'BIG', 'MEDIUM', 'SMALL', None, None]
+    assert multipliers[:4].tolist() == [3.0, 2.5, 2.0, 1.0]
+    assert np.isnan(multipliers[4:]).all()
+
+
+def test_threshold_itself_falls_into_shallower_tier(ladder):
+    # profit < threshold: exactly -10% is not BIG yet
+    tiers, _ = ladder.decide([-0.10, -0.01], [1, 1])
+    assert [ladder.labels[t] for t in tiers] == ['MEDIUM', None]
+
+
+def test_max_entries_and_nan_profit_stop_dca(ladder):
+    tiers, multipliers = ladder.decide([-0.20, -0.20, np.nan], [3, 4, 1])
+    assert multipliers[0] == 3.0
+    assert np.isnan(multipliers[1])
+    assert ladder.labels[tiers[2]] is None and np.isnan(multipliers[2])
+
+
+def test_stake_is_clamped_to_max_stake(ladder):
+    assert ladder.stake(3.0, 10.0, 100.0) == 30.0
+    assert ladder.stake(3.0, 10.0, 25.0) == 25.0
+    assert ladder.stake(np.nan, 10.0, 100.0) is None
+    assert ladder.stake(2.0, None, 100.0) is None
+
+
+def test_from_config_matches_tuples():
+    config = [{'below': -0.01, 'multiplier': 1.0, 'label': 'SMALL'},
+              {'below': -0.15, 'multiplier': 3.0, 'label': 'MASSIVE'}]
+    ladder = DcaLadder.from_config(config, 13)
+    assert ladder.thresholds.tolist() == [-0.15, -0.01]
+    assert ladder.labels == ('MASSIVE', 'SMALL', None)
+
+
+@pytest.mark.parametrize('tiers', [
+    (),
+    ((-0.1, 1.0, 'A'), (-0.1, 2.0, 'B')),
+    ((0.05, 1.0, 'A'),),
+    ((-0.1, 0.0, 'A'),),
+])
+def test_invalid_ladders_rejected(tiers):
+    with pytest.raises(ValueError):
+        DcaLadder(tiers)
+
+
+def test_bounds_cover_the_profits_decide_maps_to_each_tier(ladder):
+    profits = np.linspace(-0.3, 0.1, 401)
+    tiers, _ = ladder.decide(profits, [1] * len(profits))
+    for profit, tier in zip(profits, tiers.tolist()):
+        low, high = ladder.bounds(tier)
+        assert low <= profit < high
+    assert ladder.bounds(0) == (-np.inf, -0.15)
+    assert ladder.bounds(4) == (-0.01, np.inf)
@@ -0,0 +1,43 @@
+import health
+
+MIN = 60_000
+
+
+def heartbeat_data(now, candles, timeframe_ms=5 * MIN):
+    return {'started': now - 3600, 'last_loop': now - 5, 'exchange_ok': now - 5,
+            'timeframe_ms': timeframe_ms, 'candles': candles}
+
+
+def test_fresh_candles_are_ok():
+    now = 1_700_000_000
+    # Newest closed 5m candle opened 5-10 minutes ago
+    candles = {'BTC/USD': (now - 540) * 1000, 'ETH/USD': (now - 300) * 1000}
+    assert health.evaluate(heartbeat_data(now, candles), now) == ('ok', [])
+
+
+def test_candles_stalled_past_two_timeframes_are_unhealthy():
+    now = 1_700_000_000
+    candles = {'BTC/USD': (now - 300) * 1000, 'ETH/USD': (now - 16 * 60) * 1000}
+    status, problems = health.evaluate(heartbeat_data(now, candles), now)
+    assert status == 'unhealthy'
+    assert problems == ['stale candles: ETH/USD']
+
+
+def test_loop_and_exchange_checks():
+    now = 1_700_000_000
+    data = heartbeat_data(now, {})
+    data.update(last_loop=now - 500, exchange_ok=now - 700)
+    assert health.evaluate(data, now) == ('unhealthy', ['trading loop stalled', 'no successful exchange call'])
+
+
+def test_snapshot_carries_timeframe(tmp_path):
+    now = [1_700_000_000.0]
+    beat = health.Heartbeat(str(tmp_path / 'heartbeat.json'), timeframe_ms=5 * MIN, clock=lambda: now[0])
+    beat.exchange_success()
+    beat.candle('BTC/USD', int(now[0] - 300) * 1000)
+    beat.beat()
+    assert health.read(beat.path)['status'] == 'ok'
+    now[0] += 20 * 60
+    beat.exchange_success()
+    beat.beat()
+    assert health.read(beat.path)['problems'] == ['stale candles: BTC/USD']
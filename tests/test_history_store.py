@@ -0,0 +1,57 @@
+import pytest
+
+import history_store
+
+DAY = 86400
+
+
+@pytest.fixture
+def store(tmp_path):
+    return history_store.HistoryStore(str(tmp_path / 'history.sqlite'))
+
+
+def fill(store, start, end, step=60, value=lambda ts: 100.0):
+    for ts in range(start, end + 1, step):
+        store.record({'portfolio_value': value(ts)}, ts=ts)
+
+
+def test_parse_duration():
+    assert history_store.parse_duration('90s') == 90
+    assert history_store.parse_duration('15m') == 900
+    assert history_store.parse_duration('7d') == 7 * DAY
+    assert history_store.parse_duration(42) == 42
+
+
+def test_rollup_buckets_keep_min_max_last(store):
+    base = 10 * DAY
+    for ts, value in ((base, 5.0), (base + 10, 9.0), (base + 20, 1.0), (base + 30, 4.0)):
+        store.record({'portfolio_value': value}, ts=ts)
+    assert store.query('portfolio_value', 120, step=60, now=base + 59) == [
+        {'t': base, 'min': 1.0, 'max': 9.0, 'last': 4.0}]
+
+
+def test_change_since_full_window(store):
+    now = 20 * DAY
+    fill(store, now - 2 * DAY, now, step=600, value=lambda ts: float(ts - now + 2 * DAY))
+    change, hours = store.change_since('portfolio_value', 200_000.0, DAY, now=now)
+    assert hours == 24
+    assert change == 200_000.0 - (DAY - 600)   # last sample ending before now - 24h
+
+
+def test_change_since_young_history_uses_first_sample(store):
+    # 12h of history starting 22:00 on D-1; 24h ago lies before the first sample
+    day = 30 * DAY
+    start, now = day - 2 * 3600, day + 10 * 3600
+    fill(store, start, now, step=60, value=lambda ts: 100.0 + (ts - start) / 3600)
+    change, hours = store.change_since('portfolio_value', 120.0, DAY, now=now)
+    assert hours == 12.0
+    assert change == pytest.approx(20.0)
+
+
+def test_value_at_ignores_bucket_with_later_samples(store):
+    day = 40 * DAY
+    store.record({'portfolio_value': 1.0}, ts=day + 3600)
+    store.record({'portfolio_value': 2.0}, ts=day + 7200)
+    # The 1d bucket containing day + 5400 also holds the later 2.0 sample
+    assert store.value_at('portfolio_value', day + 5400) == 1.0
+    assert store.value_at('portfolio_value', day + 1800) is None
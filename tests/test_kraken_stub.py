@@ -0,0 +1,28 @@
+import pytest
+
+from kraken_stub import MARKETS, apply_stub_to_config, stub_credentials, symbol_for_pair
+
+
+@pytest.mark.parametrize('pair_id, symbol', [
+    ('XXBTZUSD', 'BTC/USD'),
+    ('XBTUSD', 'BTC/USD'),
+    ('XBT/USD', 'BTC/USD'),
+    ('RLUSDUSD', 'RLUSD/USD'),
+    ('RLUSD/USD', 'RLUSD/USD'),
+    ('SOL/USD', 'SOL/USD'),
+])
+def test_symbol_for_pair(pair_id, symbol):
+    assert symbol_for_pair(pair_id) == symbol
+
+
+def test_symbol_for_pair_round_trips_every_market():
+    for symbol, (pair_id, altname, *_) in MARKETS.items():
+        assert symbol_for_pair(pair_id) == symbol_for_pair(altname) == symbol
+    assert symbol_for_pair('RL/USD/USD') is None
+    assert symbol_for_pair('FOO/USD') is None
+
+
+def test_stub_config_never_keeps_real_keys():
+    config = {'exchange': {'key': 'real-key', 'secret': 'real-secret'}}
+    assert apply_stub_to_config(config, 'http://127.0.0.1:8765')
+    assert (config['exchange']['key'], config['exchange']['secret']) == stub_credentials()
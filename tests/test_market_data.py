@@ -0,0 +1,44 @@
+from market_data import MarketDataService, MarketDataView
+from shared_snapshot import SeqlockSegment
+
+
+def feed_with_data():
+    feed = MarketDataService(['BTC/USD', 'ETH/USD'], ws_url='ws://unused')
+    feed.handle({'channel': 'ticker', 'data': [
+        {'symbol': 'BTC/USD', 'bid': 99.5, 'ask': 100.5, 'last': 100.0, 'change_pct': 1.2},
+    ]})
+    for minute in (0, 5, 10):
+        feed.handle({'channel': 'ohlc', 'data': [
+            {'symbol': 'BTC/USD', 'interval_begin': f'2026-01-01T00:{minute:02d}:00.000000000Z',
+             'open': 1, 'high': 2, 'low': 0.5, 'close': 1.5, 'volume': 10},
+        ]})
+    return feed
+
+
+def test_view_serves_the_published_tables_like_the_feed():
+    feed = feed_with_data()
+    segment = SeqlockSegment()
+    view = MarketDataView(segment)
+    assert view.pull('/api/market/prices', {})[0] == 503
+
+    segment.write(feed.messages, feed.snapshot())
+    for path, query in [('/api/market/prices', {}),
+                        ('/api/market/candles', {'pair': ['BTC/USD'], 'limit': ['2']}),
+                        ('/api/market/candles', {'pair': ['BTC/USD'], 'limit': ['x']}),
+                        ('/api/market/candles', {'pair': ['DOGE/USD']}),
+                        ('/api/market/nope', {})]:
+        assert view.pull(path, query) == feed.pull(path, query)
+    assert view.pull('/api/market/status', {})[1]['messages'] == 4
+
+
+def test_view_follows_new_versions_and_ages_prices():
+    feed = feed_with_data()
+    segment = SeqlockSegment()
+    view = MarketDataView(segment)
+    segment.write(feed.messages, feed.snapshot())
+    assert view.price('BTC/USD')['last'] == 100.0
+
+    feed.prices['BTC/USD']['received_at'] -= feed.stale_after + 1
+    segment.write(feed.messages + 1, feed.snapshot())
+    assert view.price('BTC/USD') is None
+    assert view.pull('/api/market/prices', {}) == (200, {'BTC/USD': None, 'ETH/USD': None})
@@ -0,0 +1,34 @@
+from order_book_cache import OrderBookCache, fill_price
+
+
+class FakeExchange:
+    def __init__(self):
+        self.calls = []
+
+    def fetch_l2_order_book(self, pair, depth):
+        self.calls.append((pair, depth))
+        return {'bids': [[9.0, 1.0], [8.0, 5.0]], 'asks': [[10.0, 1.0], [11.0, 5.0]]}
+
+
+def test_fill_price_walks_levels():
+    assert fill_price([[10.0, 1.0], [11.0, 5.0]], 3.0) == ((10.0 + 2 * 11.0) / 3, 11.0)
+    assert fill_price([[10.0, 1.0]], 2.0) is None
+
+
+def test_one_depth_fetch_per_pair_per_ttl_shared_by_entry_and_exit():
+    now = [0.0]
+    exchange = FakeExchange()
+    cache = OrderBookCache(ttl=15, depth=10, clock=lambda: now[0])
+    assert cache.price_for(exchange, 'BTC/USD', 'buy', 0.5) == 10.0
+    assert cache.price_for(exchange, 'BTC/USD', 'buy', 3.0) == 11.0    # DCA add deeper in the book
+    assert cache.price_for(exchange, 'BTC/USD', 'sell', 2.0) == 8.0
+    assert exchange.calls == [('BTC/USD', 10)]
+    now[0] = 16.0
+    cache.price_for(exchange, 'BTC/USD', 'sell', 1.0)
+    assert len(exchange.calls) == 2
+
+
+def test_no_exchange_or_thin_book_keeps_callers_rate():
+    cache = OrderBookCache()
+    assert cache.price_for(None, 'BTC/USD', 'buy', 1.0) is None
+    assert cache.price_for(FakeExchange(), 'BTC/USD', 'buy', 100.0) is None
@@ -0,0 +1,91 @@
+import os
+import threading
+import time
+
+import pytest
+
+from shared_snapshot import HEADER, SEQ, SeqlockSegment, SnapshotTooLarge
+
+
+def payload_for(version):
+    return bytes([version % 251]) * (100 + version * 37 % 4000)
+
+
+def test_round_trip_and_version():
+    segment = SeqlockSegment(4096)
+    assert segment.version() == 0
+    assert segment.read() == (0, b'')
+    segment.write(7, b'{"a": 1}')
+    assert segment.version() == 7
+    assert segment.read() == (7, b'{"a": 1}')
+
+
+def test_oversized_payload_is_refused():
+    segment = SeqlockSegment(16)
+    with pytest.raises(SnapshotTooLarge):
+        segment.write(1, b'x' * 17)
+    assert segment.read() == (0, b'')
+
+
+def test_odd_sequence_read_waits_for_the_writer():
+    segment = SeqlockSegment(4096)
+    segment.write(1, b'old')
+    # A writer that stopped half-way: seq odd, payload and header not yet written
+    seq = SEQ.unpack_from(segment.buf, 0)[0]
+    SEQ.pack_into(segment.buf, 0, seq + 1)
+    result = []
+    reader = threading.Thread(target=lambda: result.append(segment.read()))
+    reader.start()
+    reader.join(0.1)
+    assert reader.is_alive() and not result
+
+    segment.buf[HEADER.size:HEADER.size + 3] = b'new'
+    HEADER.pack_into(segment.buf, 0, seq + 1, 2, 3)
+    SEQ.pack_into(segment.buf, 0, seq + 2)
+    reader.join(1)
+    assert result == [(2, b'new')]
+
+
+def test_read_torn_by_a_write_retries():
+    segment = SeqlockSegment(4096)
+    segment.write(1, b'old payload')
+
+    class WriteDuringCopy(bytearray):
+        """The writer publishes version 2 while the reader copies version 1's payload"""
+        fired = False
+
+        def __getitem__(self, key):
+            data = super().__getitem__(key)
+            if isinstance(key, slice) and not self.fired:
+                self.fired = True
+                segment.write(2, b'new')
+            return data
+
+    segment.buf = WriteDuringCopy(segment.buf[:])
+    assert segment.read() == (2, b'new')
+    assert segment.buf.fired
+
+
+def test_readers_in_another_process_never_see_a_torn_snapshot():
+    segment = SeqlockSegment(8192)
+    pid = os.fork()
+    if pid == 0:
+        try:
+            deadline = time.monotonic() + 0.5
+            version = 0
+            while time.monotonic() < deadline:
+                version += 1
+                segment.write(version, payload_for(version))
+        finally:
+            os._exit(0)
+    seen = set()
+    try:
+        deadline = time.monotonic() + 0.5
+        while time.monotonic() < deadline:
+            version, payload = segment.read()
+            if version:
+                assert payload == payload_for(version)
+                seen.add(version)
+    finally:
+        os.waitpid(pid, 0)
+    assert seen
@@ -0,0 +1,86 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import strategy_state
+from candle_ring import CandleRing, CandleStore, epoch_ms
+from informative import InformativeStore
+
+START = pd.Timestamp('2024-01-01', tz='UTC')
+
+
+def frame(n, offset=0, seed=0):
+    close = 100 + np.random.default_rng(seed).normal(0, 1, n + offset).cumsum()[offset:]
+    return pd.DataFrame({
+        'date': pd.date_range(START + pd.Timedelta(minutes=5 * offset), periods=n, freq='5min'),
+        'open': close, 'high': close + 1, 'low': close - 1, 'close': close, 'volume': 1.0,
+    })
+
+
+def ohlc(dataframe):
+    return np.vstack([dataframe[c].to_numpy(dtype=np.float64) for c in ('open', 'high', 'low', 'close')])
+
+
+def stores(capacity=100):
+    informative = InformativeStore()
+    return CandleStore(capacity, informative.columns), informative
+
+
+def test_matches_overlapping_fresh_candles():
+    ring = CandleRing(50)
+    ring.sync(frame(40))
+    fresh = frame(60, offset=10)                       # restart 10 candles later, 30 overlap
+    assert strategy_state.matches(ring, epoch_ms(fresh['date']), ohlc(fresh))
+
+
+def test_matches_rejects_changed_or_disjoint_candles():
+    ring = CandleRing(50)
+    ring.sync(frame(40))
+    changed = frame(60, offset=10)
+    changed.loc[5, 'close'] += 1
+    assert not strategy_state.matches(ring, epoch_ms(changed['date']), ohlc(changed))
+    later = frame(20, offset=45)                       # ring's newest candle is not in the frame
+    assert not strategy_state.matches(ring, epoch_ms(later['date']), ohlc(later))
+    assert not strategy_state.matches(CandleRing(50), epoch_ms(later['date']), ohlc(later))
+
+
+def test_checkpoint_round_trip(tmp_path):
+    path = str(tmp_path / 'state.npz')
+    candles, informative = stores()
+    candles.sync('BTC/USD', frame(80))
+    informative.update('BTC/USD', candles.ring('BTC/USD'))
+    assert strategy_state.save(path, candles, informative) == ['BTC/USD']
+
+    restored, restored_informative = stores()
+    pairs, age = strategy_state.load(path, restored, restored_informative)
+    assert pairs == ['BTC/USD'] and age >= 0
+    assert np.array_equal(restored.ring('BTC/USD').window(), candles.ring('BTC/USD').window(), equal_nan=True)
+    for (bars, scalars), (saved_bars, saved_scalars) in zip(restored_informative.state('BTC/USD'),
+                                                             informative.state('BTC/USD')):
+        assert np.array_equal(bars, saved_bars, equal_nan=True)
+        assert np.array_equal(scalars, saved_scalars, equal_nan=True)
+
+
+def test_checkpoint_for_other_layout_is_ignored(tmp_path):
+    path = str(tmp_path / 'state.npz')
+    candles, informative = stores(capacity=100)
+    candles.sync('BTC/USD', frame(80))
+    strategy_state.save(path, candles, informative)
+    other, other_informative = stores(capacity=200)
+    assert strategy_state.load(path, other, other_informative) == ([], None)
+    assert strategy_state.load(str(tmp_path / 'missing.npz'), other, other_informative) == ([], None)
+
+
+@pytest.mark.parametrize('offset, trusted', [(10, True), (45, False)])
+def test_verify_keeps_or_drops_restored_pair(tmp_path, offset, trusted):
+    path = str(tmp_path / 'state.npz')
+    candles, informative = stores()
+    candles.sync('BTC/USD', frame(40))
+    strategy_state.save(path, candles, informative)
+
+    restored, restored_informative = stores()
+    checkpoint = strategy_state.Checkpointer(restored, restored_informative, path=path)
+    assert checkpoint.restore() == ['BTC/USD']
+    assert checkpoint.verify('BTC/USD', frame(60, offset=offset)) is trusted
+    assert ('BTC/USD' in restored.rings) is trusted
+    assert checkpoint.verify('BTC/USD', frame(60, offset=offset)) is None   # checked once
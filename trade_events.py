@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Trade events from strategy callbacks, written to SQLite off the hot path.
+
+Callbacks call `EventBus.emit()`, which only appends a tuple to a
+collections.deque (atomic under the GIL, no lock taken) and returns. A
+background writer drains the deque every `flush_interval` seconds and
+inserts the batch in one transaction into an append-only SQLite table (WAL
+mode), so disk latency never reaches the trading loop. `EventLog` is the
+read side: `since(cursor)` returns events after an id, which is how the
+dashboard tails them incrementally.
+
+    python trade_events.py --since 0 --kind dca     # print recorded events
+"""
+import argparse
+import atexit
+import collections
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+EVENTS_DB = os.getenv('TRADE_EVENTS_DB', 'user_data/trade_events.sqlite')
+KINDS = ('entry', 'fill', 'dca', 'exit')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    ts REAL NOT NULL,
+    kind TEXT NOT NULL,
+    pair TEXT NOT NULL,
+    trade_id INTEGER,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS events_pair ON events (pair, id);
+"""
+
+
+def connect(path):
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('PRAGMA synchronous=NORMAL')
+    conn.executescript(SCHEMA)
+    return conn
+
+
+class EventBus:
+    def __init__(self, path=EVENTS_DB, flush_interval=0.5, max_pending=100_000):
+        self.path = path
+        self.flush_interval = flush_interval
+        # Bounded so a stalled disk costs the oldest unwritten events, not memory
+        self.pending = collections.deque(maxlen=max_pending)
+        self.dropped = 0
+        self.written = 0
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    def emit(self, kind, pair, trade_id=None, **data):
+        """Queue one event; never blocks on I/O"""
+        if len(self.pending) == self.pending.maxlen:
+            self.dropped += 1
+        self.pending.append((time.time(), kind, pair, trade_id, data))
+
+    def start(self):
+        if self.thread is None:
+            self.thread = threading.Thread(target=self._run, name='trade-events', daemon=True)
+            self.thread.start()
+            atexit.register(self.close)
+        return self
+
+    def _run(self):
+        conn = connect(self.path)
+        while not self.stop_event.wait(self.flush_interval):
+            self._flush(conn)
+        self._flush(conn)
+        conn.close()
+
+    def _flush(self, conn):
+        batch = []
+        try:
+            while True:
+                batch.append(self.pending.popleft())
+        except IndexError:
+            pass
+        if not batch:
+            return
+        rows = [(ts, kind, pair, trade_id, json.dumps(data, default=str)) for ts, kind, pair, trade_id, data in batch]
+        try:
+            conn.execute('BEGIN')
+            conn.executemany('INSERT INTO events (ts, kind, pair, trade_id, data) VALUES (?, ?, ?, ?, ?)', rows)
+            conn.execute('COMMIT')
+            self.written += len(rows)
+        except sqlite3.Error as e:
+            if conn.in_transaction:
+                conn.execute('ROLLBACK')
+            # Put the batch back in order; retried on the next flush
+            self.pending.extendleft(reversed(batch))
+            logger.warning(f"Trade events: write of {len(rows)} events failed, will retry: {e}")
+
+    def close(self):
+        """Stop the writer after a final flush"""
+        self.stop_event.set()
+        if self.thread is not None and self.thread is not threading.current_thread():
+            self.thread.join(timeout=5)
+
+
+class EventLog:
+    """Read side of the events table"""
+
+    def __init__(self, path=EVENTS_DB):
+        self.path = path
+        self.conn = None
+        self.lock = threading.Lock()
+
+    def _conn(self):
+        if self.conn is None:
+            self.conn = connect(self.path)
+        return self.conn
+
+    def since(self, cursor=0, limit=500, kind=None, pair=None):
+        """(events after id `cursor` oldest first, next cursor)"""
+        sql = 'SELECT id, ts, kind, pair, trade_id, data FROM events WHERE id > ?'
+        params = [int(cursor)]
+        if kind:
+            sql += ' AND kind = ?'
+            params.append(kind)
+        if pair:
+            sql += ' AND pair = ?'
+            params.append(pair)
+        sql += ' ORDER BY id LIMIT ?'
+        params.append(int(limit))
+        with self.lock:
+            rows = self._conn().execute(sql, params).fetchall()
+        events = [{'id': id_, 'ts': ts, 'kind': kind_, 'pair': pair_, 'trade_id': trade_id, **json.loads(data)}
+                  for id_, ts, kind_, pair_, trade_id, data in rows]
+        return events, events[-1]['id'] if events else int(cursor)
+
+    def tail(self, cursor=0, poll=1.0, **filters):
+        """Generator over new events as they are written"""
+        while True:
+            events, cursor = self.since(cursor, **filters)
+            yield from events
+            if not events:
+                time.sleep(poll)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Print recorded trade events")
+    parser.add_argument('--db', default=EVENTS_DB)
+    parser.add_argument('--since', type=int, default=0, help="only events after this id")
+    parser.add_argument('--kind', choices=KINDS)
+    parser.add_argument('--pair')
+    parser.add_argument('--follow', action='store_true', help="keep printing new events")
+    args = parser.parse_args()
+
+    log = EventLog(args.db)
+    if args.follow:
+        events = log.tail(args.since, kind=args.kind, pair=args.pair)
+    else:
+        events, _ = log.since(args.since, limit=10_000, kind=args.kind, pair=args.pair)
+    for event in events:
+        stamp = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(event.pop('ts')))
+        print(f"{event.pop('id'):>7} {stamp} {event.pop('kind'):<6}{event.pop('pair'):<12}{json.dumps(event)}")
+
+
+if __name__ == "__main__":
+    main()
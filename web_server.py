@@ -1,67 +1,697 @@
 #!/usr/bin/env python3
 import os
+import html
+import ipaddress
 import json
+import re
 import subprocess
 import threading
 import time
 from http.server import HTTPServer, BaseHTTPRequestHandler
-from urllib.parse import urlparse
+from urllib.parse import urlparse, parse_qs
 import socket
 
+import exchange_budget
+import kraken_stub
+import market_data
+import mem_watchdog
+import health
+import history_store
+import pair_scanner
+import trade_events
+from circuit_breaker import CircuitBreaker, CircuitOpenError
+from start import STRATEGY_SUPPORT_MODULES, get_config_template
+
+_kraken_client = None
+_kraken_client_lock = threading.Lock()
+
+# WebSocket price feed, started in main() unless MARKET_DATA_FEED=0
+market_feed = None
+# Up to 720 candles per pair; pre-fork workers read the tables from this much shared memory
+MARKET_SEGMENT_BYTES = 8 << 20
+
+
+def market_feed_enabled():
+    return os.getenv('MARKET_DATA_FEED', '1') != '0'
+
+
+# Every snapshot is recorded; 24h P&L and /api/history read the rollups.
+# Both are opened in main() / run_worker(): SQLite connections must not cross fork()
+HISTORY_DB = os.getenv('HISTORY_DB', 'user_data/history.sqlite')
+history = None
+trade_event_log = None
+
+
+def open_databases():
+    global history, trade_event_log
+    history = history_store.HistoryStore(HISTORY_DB)
+    trade_event_log = trade_events.EventLog()
+
+
+def get_kraken_client():
+    """Shared ccxt client so connections and rate-limit state survive across requests"""
+    global _kraken_client
+    with _kraken_client_lock:
+        if _kraken_client is not None:
+            return _kraken_client
+        import ccxt
+        
+        # Get API keys from environment
+        api_key = os.getenv('KRAKEN_API_KEY')
+        secret_key = os.getenv('KRAKEN_SECRET_KEY')
+        
+        # Local Kraken stand-in for hermetic load tests (see kraken_stub.py); real keys are never
+        # sent to a stub URL
+        if kraken_stub.stub_url():
+            api_key, secret_key = kraken_stub.stub_credentials()
+        
+        if not api_key or not secret_key:
+            raise Exception("Missing KRAKEN_API_KEY or KRAKEN_SECRET_KEY")
+        
+        print(f"🔑 Using Kraken API keys: {api_key[:8]}...")
+        
+        # Initialize Kraken exchange with better error handling
+        _kraken_client = ccxt.kraken({
+            'apiKey': api_key,
+            'secret': secret_key,
+            'sandbox': False,
+            'enableRateLimit': True,
+            'timeout': int(os.getenv('KRAKEN_TIMEOUT_MS', 15000)),
+            'rateLimit': 1000,  # More conservative rate limit
+            **kraken_stub.stub_ccxt_overrides(),
+        })
+        # Share Kraken's call counter with the trader; dashboard reads yield to orders
+        exchange_budget.install(_kraken_client, exchange_budget.shared_budget(),
+                                exchange_budget.PRIORITY_DASHBOARD, timeout=5)
+        return _kraken_client
+
+
+def live_price(kraken, pair):
+    """Last price from the WebSocket feed, falling back to a REST ticker"""
+    price = market_feed.last_price(pair) if market_feed else None
+    if price is None:
+        price = kraken.fetch_ticker(pair)['last']
+    return price
+
+
+def fetch_live_trading_stats():
+    """Fetch REAL-TIME trading data from Kraken using your API keys"""
+    kraken = get_kraken_client()
+    
+    try:
+        # Fetch live balance from your Kraken account
+        print("📊 Fetching live balance from Kraken...")
+        balance = kraken.fetch_balance()
+        
+        # Fetch current market prices
+        print("💰 Fetching current market prices...")
+        
+        # Prices come from the WebSocket feed; REST only while it is down.
+        # Ticker errors propagate so the circuit breaker sees them instead of
+        # the dashboard showing made-up prices
+        cpool_price = live_price(kraken, 'CPOOL/USD')
+        ondo_price = live_price(kraken, 'ONDO/USD')
+        
+        # Get your actual balances
+        cpool_balance = balance.get('CPOOL', {}).get('total', 0)
+        ondo_balance = balance.get('ONDO', {}).get('total', 0)
+        usd_balance = balance.get('USD', {}).get('total', 0)
+        
+        # Calculate position values
+        cpool_value = cpool_balance * cpool_price
+        ondo_value = ondo_balance * ondo_price
+        total_portfolio = cpool_value + ondo_value + usd_balance
+        
+        print(f"💎 Live Portfolio: CPOOL=${cpool_value:.2f} + ONDO=${ondo_value:.2f} + USD=${usd_balance:.2f} = ${total_portfolio:.2f}")
+        
+        # Simple average price calculation (fallback if trade history fails)
+        cpool_avg_price = 0.1136  # Your known average
+        ondo_avg_price = 0.7682   # Your known average
+        
+        # Calculate returns
+        cpool_return = ((cpool_price - cpool_avg_price) / cpool_avg_price * 100) if cpool_avg_price > 0 else 0
+        ondo_return = ((ondo_price - ondo_avg_price) / ondo_avg_price * 100) if ondo_avg_price > 0 else 0
+        
+        print(f"📊 CPOOL: {cpool_return:.1f}% return | ONDO: {ondo_return:.1f}% return")
+        
+        # Real 24h P&L from recorded history (shorter window until 24h exists)
+        profit_24h, profit_window_hours = history.change_since('portfolio_value', total_portfolio, 86400)
+        
+        # Calculate average return
+        returns = [r for r in [cpool_return, ondo_return] if r != 0]
+        avg_return = sum(returns) / len(returns) if returns else 0
+        
+        # Count active positions
+        active_positions = (1 if cpool_balance > 0 else 0) + (1 if ondo_balance > 0 else 0)
+        
+        return {
+            "cpool_return": round(cpool_return, 1),
+            "ondo_return": round(ondo_return, 1),
+            "total_trades": active_positions,
+            "status": "🟢 LIVE TRADING",
+            "last_update": int(time.time()),
+            "portfolio_value": round(total_portfolio, 2),
+            "profit_24h": round(profit_24h, 2) if profit_24h is not None else None,
+            "profit_window_hours": profit_window_hours,
+            "avg_return": round(avg_return, 1),
+            "total_positions": active_positions,
+            "cpool_balance": round(cpool_balance, 3),
+            "ondo_balance": round(ondo_balance, 3),
+            "usd_balance": round(usd_balance, 2),
+            "cpool_price": round(cpool_price, 4),
+            "ondo_price": round(ondo_price, 4),
+            "cpool_avg_price": round(cpool_avg_price, 4),
+            "ondo_avg_price": round(ondo_avg_price, 4),
+            "cpool_value": round(cpool_value, 2),
+            "ondo_value": round(ondo_value, 2)
+        }
+        
+    except Exception as e:
+        print(f"❌ Kraken API error: {e}")
+        raise e
+
+
+# Dashboard fields that are only meaningful with real exchange data
+STATS_FIELDS = (
+    "cpool_return", "ondo_return", "total_trades", "portfolio_value", "profit_24h",
+    "avg_return", "total_positions", "cpool_balance", "ondo_balance", "usd_balance",
+    "cpool_price", "ondo_price", "cpool_avg_price", "ondo_avg_price", "cpool_value",
+    "ondo_value",
+)
+
+
+class LiveStatsCache:
+    """Last-known-good stats snapshot, refreshed through a circuit breaker.
+    
+    Requests never wait on Kraken once a snapshot exists: a stale snapshot is
+    served immediately with its age while a single background refresh runs.
+    While the circuit is open the refresh is rejected instantly, and after the
+    reset timeout it becomes the half-open probe that closes the circuit again.
+    """
+    
+    def __init__(self, fetch, breaker, ttl, on_snapshot=None):
+        self.fetch = fetch
+        self.on_snapshot = on_snapshot
+        self.breaker = breaker
+        self.ttl = ttl
+        self.snapshot = None
+        self.fetched_at = None
+        self.last_error = None
+        self.refreshing = threading.Lock()
+        self.attempts = 0  # finished fetches, so cold-start waiters can tell one happened
+        self.versions = StatsVersions()
+        self.published_key = None
+    
+    def _fetch(self):
+        try:
+            self._fetch_once()
+        finally:
+            self.attempts += 1
+    
+    def _fetch_once(self):
+        try:
+            stats = self.breaker.call(self.fetch)
+        except CircuitOpenError as e:
+            self.last_error = str(e)
+            return
+        except Exception as e:
+            print(f"❌ Error fetching live stats: {e}")
+            self.last_error = f"API Error: {e}"
+            return
+        print(f"✅ Live data fetched: Portfolio = ${stats['portfolio_value']}")
+        self.snapshot = stats
+        self.fetched_at = time.time()
+        self.last_error = None
+        if self.on_snapshot:
+            try:
+                self.on_snapshot(stats)
+            except Exception as e:
+                print(f"⚠️ Snapshot hook failed: {e}")
+    
+    def refresh(self):
+        """Refresh unless another thread already is"""
+        if not self.refreshing.acquire(blocking=False):
+            return
+        try:
+            self._fetch()
+        finally:
+            self.refreshing.release()
+    
+    def refresh_async(self):
+        if not self.refreshing.locked():
+            threading.Thread(target=self.refresh, daemon=True).start()
+    
+    def ensure_fresh(self, wait=True):
+        if self.snapshot is None and not wait:
+            self.refresh_async()
+        elif self.snapshot is None:
+            # Nothing to serve yet: the first caller fetches inline, the rest wait for that one
+            # attempt and take its outcome (a snapshot or the placeholder), never a fetch of their own
+            attempt = self.attempts
+            with self.refreshing:
+                if self.snapshot is None and self.attempts == attempt:
+                    self._fetch()
+        elif time.time() - self.fetched_at >= self.ttl:
+            self.refresh_async()
+    
+    def get(self):
+        self.ensure_fresh()
+        return self.present()
+    
+    def probe_forever(self):
+        """Fire the half-open probe when the reset timeout expires, with or without requests"""
+        while True:
+            time.sleep(max(self.breaker.retry_in(), 1.0))
+            if self.breaker.status()['state'] != 'closed':
+                self.refresh()
+    
+    def start_prober(self):
+        threading.Thread(target=self.probe_forever, name='breaker-probe', daemon=True).start()
+    
+    def versioned(self, wait=True):
+        """StatsVersions with the presented stats published; re-presented only when the inputs change.
+        
+        With wait=False a cold cache publishes the unavailable placeholder instead
+        of fetching inline.
+        """
+        self.ensure_fresh(wait)
+        key = (self.fetched_at, self.last_error, self.breaker.status()['state'])
+        if key != self.published_key:
+            self.versions.publish(self.present())
+            self.published_key = key
+        return self.versions
+    
+    def present(self):
+        snapshot, fetched_at, error = self.snapshot, self.fetched_at, self.last_error
+        circuit = self.breaker.status()['state']
+        if snapshot is None:
+            stats = dict.fromkeys(STATS_FIELDS)
+            stats.update({
+                "status": "🔴 EXCHANGE UNAVAILABLE",
+                "last_update": None,
+                "stale": True,
+                "circuit": circuit,
+                "error": error or "No data fetched yet",
+            })
+            return stats
+        
+        # No per-second fields (age, countdown): the result only changes with the data,
+        # so its version and serialized bytes can be reused until then
+        stats = dict(snapshot)
+        stats["circuit"] = circuit
+        stats["stale"] = circuit != "closed" or error is not None
+        if stats["stale"]:
+            stats["status"] = "🟡 DEGRADED - LAST KNOWN DATA"
+            stats["error"] = error
+            stats["retry_at"] = int(time.time() + self.breaker.retry_in())
+        return stats
+
+
+class StatsVersions:
+    """Monotonically versioned stats, serialized once per version.
+    
+    A new version is published only when the stats change (a successful
+    fetch moves `last_update`), so polls between fetches and while Kraken is
+    down are answered with 304 (If-None-Match) or an empty delta
+    (?since=<version>) from bytes built once. `data_age_seconds` changes
+    every second, so it is not part of a version: aged() splices it into
+    the serialized bytes per response, and the weak ETag still matches.
+    """
+    
+    def __init__(self, keep=64):
+        self.lock = threading.Lock()
+        self.keep = keep
+        self.version = 0
+        self.content = None
+        self.body = b''
+        self.etag = None
+        self.updated = None  # last_update of the current version
+        self.history = {}   # version -> stats, for deltas
+        self.deltas = {}    # since -> serialized delta to the current version
+    
+    def publish(self, stats, version=None):
+        """Publish stats; `version` adopts another process's numbering instead of counting here"""
+        with self.lock:
+            if version is None:
+                if stats == self.content:
+                    return self.version
+                version = self.version + 1
+            elif version == self.version and self.content is not None:
+                return self.version
+            self.history[version] = stats
+            for old in [v for v in self.history if v <= version - self.keep]:
+                del self.history[old]
+            self.body = json.dumps({**stats, "version": version}).encode()
+            self.etag = f'W/"{version}"'
+            self.content = stats
+            self.updated = stats.get('last_update')
+            self.deltas = {}
+            self.version = version
+            return version
+    
+    def current(self):
+        """(version, etag, body) of the latest snapshot"""
+        with self.lock:
+            return self.version, self.etag, self.body
+    
+    def aged(self, body, now=None):
+        """Serialized snapshot or delta with `data_age_seconds` as of now appended"""
+        with self.lock:
+            updated = self.updated
+        age = int((now or time.time()) - updated) if updated else None
+        return body[:-1] + b', "data_age_seconds": ' + json.dumps(age).encode() + b'}'
+    
+    def latest(self):
+        """(version, stats) of the latest snapshot"""
+        with self.lock:
+            return self.version, self.history.get(self.version)
+    
+    def delta(self, since):
+        """(version, serialized changes since `since`); None when unchanged.
+        
+        A version too old to diff against gets the full snapshot with "full": true.
+        """
+        with self.lock:
+            version = self.version
+            if since == version:
+                return version, None
+            body = self.deltas.get(since)
+            if body is None:
+                current, previous = self.history.get(version, {}), self.history.get(since)
+                if previous is None:
+                    payload = {"version": version, "since": since, "full": True, "changes": current}
+                else:
+                    changes = {k: v for k, v in current.items() if previous.get(k, object()) != v}
+                    changes.update({k: None for k in previous if k not in current})
+                    payload = {"version": version, "since": since, "full": False, "changes": changes}
+                body = self.deltas[since] = json.dumps(payload).encode()
+            return version, body
+
+
+class SharedStatsView:
+    """Worker-side stats in pre-fork mode: follows the refresher's snapshot in shared memory.
+    
+    Checking for a new version reads only the segment header; the snapshot is
+    copied and parsed once per version per worker.
+    """
+    
+    def __init__(self, segment):
+        self.segment = segment
+        self.versions = StatsVersions()
+        self.stats = None
+    
+    def versioned(self, wait=True):
+        version = self.segment.version()
+        if self.stats is None or version != self.versions.version:
+            version, payload = self.segment.read()
+            if version:
+                stats = json.loads(payload)
+                stats.pop("version", None)
+            else:
+                stats = dict.fromkeys(STATS_FIELDS)
+                stats.update({"status": "🔴 EXCHANGE UNAVAILABLE", "last_update": None, "stale": True,
+                              "error": "No data fetched yet"})
+            self.stats = stats
+            self.versions.publish(stats, version)
+        return self.versions
+    
+    def get(self):
+        self.versioned()
+        return dict(self.stats)
+
+
+def etag_matches(header, etag):
+    """If-None-Match check: whole tags from the comma-separated list, compared weakly (W/ ignored)"""
+    if not header or not etag:
+        return False
+    tags = {tag.strip().removeprefix('W/') for tag in header.split(',')}
+    return '*' in tags or etag.removeprefix('W/') in tags
+
+
+def js_number(value):
+    """A number as JavaScript's template literals print it (70.0 -> '70')"""
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def landing_values(stats):
+    """Display strings for the landing page fields, formatted like updateLiveStats() in script.js"""
+    values = {name: '-' if stats.get(name) is None else js_number(stats[name])
+              for name in STATS_FIELDS}
+    live = stats.get('portfolio_value') is not None
+    values['live'] = '1' if live else '0'
+    values['status'] = stats.get('status') or ''
+    values['status_color'] = '#10b981' if live and not stats.get('stale') else '#fbbf24'
+    if not live:
+        for name in ('cpool_return', 'ondo_return', 'portfolio_value', 'avg_return'):
+            values[name] = 'Unavailable'
+        values['portfolio_color'] = '#fbbf24'
+        values['profit_24h'] = 'No history yet'
+        values['last_update_ts'] = ''
+        values['last_update'] = 'No data yet'
+        return values
+    values['cpool_return'] = f"+{values['cpool_return']}%"
+    values['ondo_return'] = f"+{values['ondo_return']}%"
+    values['portfolio_value'] = f"${values['portfolio_value']}"
+    values['avg_return'] = f"{values['avg_return']}%"
+    values['portfolio_color'] = '#ffffff'
+    profit, hours = stats.get('profit_24h'), stats.get('profit_window_hours')
+    if profit is None:
+        values['profit_24h'] = 'No history yet'
+    else:
+        window = 'today' if hours is not None and hours >= 24 else f"in {js_number(hours)}h"
+        values['profit_24h'] = f"{'+' if profit >= 0 else '-'}${abs(profit):.2f} {window}"
+    last_update = stats.get('last_update')
+    values['last_update_ts'] = str(last_update or '')
+    values['last_update'] = time.strftime('%Y-%m-%d %H:%M:%S UTC', time.gmtime(last_update)) if last_update else '-'
+    if stats.get('stale'):
+        values['last_update'] += ' (stale)'
+    return values
+
+
+class LandingPage:
+    """The landing page template, compiled once and rendered with the live snapshot.
+    
+    `{{field}}` markers are split out of the template once; a render only
+    formats the fields and joins the chunks. The rendered bytes are cached per
+    stats version, so a page view costs a version check - no template work, no
+    Kraken call and no second round-trip for the numbers.
+    """
+    
+    FIELD = re.compile(r'\{\{(\w+)\}\}')
+    
+    def __init__(self, template):
+        parts = self.FIELD.split(template)
+        self.chunks = parts[0::2]
+        self.fields = parts[1::2]
+        self.lock = threading.Lock()
+        self.version = None
+        self.etag = None
+        self.body = b''
+    
+    def render(self, stats):
+        values = landing_values(stats)
+        out = [self.chunks[0]]
+        for field, chunk in zip(self.fields, self.chunks[1:]):
+            out.append(html.escape(values[field]))
+            out.append(chunk)
+        return ''.join(out).encode('utf-8')
+    
+    def current(self, versions):
+        """(etag, body) of the page for the latest stats version"""
+        version, stats = versions.latest()
+        with self.lock:
+            if version != self.version:
+                self.body = self.render(stats)
+                self.etag = f'W/"page-{version}"'
+                self.version = version
+            return self.etag, self.body
+
+
+kraken_breaker = CircuitBreaker(
+    failure_threshold=int(os.getenv('KRAKEN_BREAKER_FAILURES', 3)),
+    reset_timeout=float(os.getenv('KRAKEN_BREAKER_RESET_SECS', 30)),
+)
+live_stats = LiveStatsCache(fetch_live_trading_stats, kraken_breaker,
+                            ttl=float(os.getenv('STATS_TTL_SECS', 10)),
+                            # Looked up per call: history is opened in main()
+                            on_snapshot=lambda stats: history.record(stats))
+
+
+SERVER_STARTED = time.time()
+
+
+def health_status():
+    """(HTTP code, body) from the strategy's heartbeat file; the web server alone is always healthy"""
+    if os.getenv('START_FREQTRADE', '1') == '0':
+        return 200, {'status': 'ok', 'bot': 'not managed by this server'}
+    heartbeat = health.read()
+    if heartbeat is None:
+        # freqtrade takes a while to start and write its first heartbeat
+        grace = float(os.getenv('HEALTH_STARTUP_GRACE', 300))
+        if time.time() - SERVER_STARTED < grace:
+            return 200, {'status': 'starting'}
+        return 503, {'status': 'unhealthy', 'problems': ['no heartbeat from the trading loop']}
+    status, problems = health.evaluate(heartbeat)
+    body = {'status': status, 'problems': problems, 'loops': heartbeat.get('loops'),
+            'last_loop_age': round(time.time() - heartbeat['last_loop'], 1) if heartbeat.get('last_loop') else None,
+            'exchange_ok_age': round(time.time() - heartbeat['exchange_ok'], 1) if heartbeat.get('exchange_ok') else None,
+            'last_error': heartbeat.get('last_error'), 'candles': heartbeat.get('candles')}
+    return (200 if status == 'ok' else 503), body
+
+
 class HedgeFundBotHandler(BaseHTTPRequestHandler):
     def do_GET(self):
         try:
             parsed_path = urlparse(self.path)
             
-            # Health check endpoint for Railway
+            # Health check endpoint for Railway: the trading loop's heartbeat file, no exchange calls
             if parsed_path.path == '/health':
-                self.send_response(200)
-                self.send_header('Content-type', 'text/plain')
+                code, body = health_status()
+                data = json.dumps(body).encode()
+                self.send_response(code)
+                self.send_header('Content-type', 'application/json')
+                self.send_header('Cache-Control', 'no-cache')
                 self.send_header('Access-Control-Allow-Origin', '*')
                 self.end_headers()
-                self.wfile.write(b"Hedge Fund Bot is running and trading!")
+                try:
+                    self.wfile.write(data)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass
                 return
             
-            # API endpoint for live trading stats - NOW WITH REAL KRAKEN DATA
-            if parsed_path.path == '/api/stats':
+            # Remaining shared Kraken call budget (see exchange_budget.py)
+            if parsed_path.path == '/api/budget':
+                body = json.dumps(exchange_budget.shared_budget().snapshot()).encode()
                 self.send_response(200)
                 self.send_header('Content-type', 'application/json')
-                self.send_header('Access-Control-Allow-Origin', '*')
                 self.send_header('Cache-Control', 'no-cache')
                 self.end_headers()
-                
-                # Get real-time stats from Kraken using your API keys
                 try:
-                    stats = self.get_live_trading_stats()
-                    print(f"✅ Live data fetched: Portfolio = ${stats['portfolio_value']}")
-                except Exception as e:
-                    print(f"❌ Error fetching live stats: {e}")
-                    # Fallback to static data if API fails
-                    stats = {
-                        "cpool_return": 15.5,
-                        "ondo_return": 10.0,
-                        "total_trades": 2,
-                        "status": "🟡 API ERROR",
-                        "last_update": int(time.time()),
-                        "portfolio_value": 69.52,
-                        "profit_24h": 2.34,
-                        "avg_return": 12.75,
-                        "total_positions": 2,
-                        "cpool_balance": 228.699,
-                        "ondo_balance": 28.407,
-                        "usd_balance": 14.93,
-                        "cpool_price": 0.1312,
-                        "ondo_price": 0.8449,
-                        "cpool_avg_price": 0.1136,
-                        "ondo_avg_price": 0.7682,
-                        "cpool_value": 30.00,
-                        "ondo_value": 24.00,
-                        "error": f"API Error: {str(e)}"
-                    }
+                    self.wfile.write(body)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass
+                return
+            
+            # Memory watchdog reports of the dashboard and bot processes (MEM_WATCHDOG=1), local clients only
+            if parsed_path.path == '/api/memory':
+                if self.is_local():
+                    code, body = 200, {'enabled': mem_watchdog.ENABLED, 'processes': mem_watchdog.read_reports()}
+                else:
+                    code, body = 403, {'error': 'memory reports are only served to local clients'}
+                data = json.dumps(body).encode()
+                self.send_response(code)
+                self.send_header('Content-type', 'application/json')
+                self.send_header('Cache-Control', 'no-cache')
+                self.end_headers()
+                try:
+                    self.wfile.write(data)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass
+                return
+            
+            # Portfolio history from precomputed rollups: ?range=24h&step=1h&series=portfolio_value
+            if parsed_path.path == '/api/history':
+                query = parse_qs(parsed_path.query)
+                try:
+                    range_seconds = history_store.parse_duration(query.get('range', ['24h'])[0])
+                    step_label = query.get('step', [None])[0]
+                    step = history_store.STEP_LABELS[step_label] if step_label else None
+                    series = query.get('series', ['portfolio_value'])[0]
+                    if series not in history_store.SERIES:
+                        raise ValueError(f"unknown series {series}")
+                    points = history.query(series, range_seconds, step)
+                    code = 200
+                    body = {'series': series, 'range': range_seconds,
+                            'step': step or history.pick_step(range_seconds), 'points': points}
+                except (KeyError, ValueError) as e:
+                    code, body = 400, {'error': f"bad history query: {e}"}
+                data = json.dumps(body).encode()
+                self.send_response(code)
+                self.send_header('Content-type', 'application/json')
+                self.send_header('Cache-Control', 'max-age=30')
+                self.end_headers()
+                try:
+                    self.wfile.write(data)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass
+                return
+            
+            # Trade events written by the strategy, tailed with ?since=<last id>&kind=dca&pair=BTC/USD
+            if parsed_path.path == '/api/events':
+                query = parse_qs(parsed_path.query)
+                try:
+                    if not self.is_local():
+                        raise PermissionError('trade events are only served to local clients')
+                    kind = query.get('kind', [None])[0]
+                    if kind and kind not in trade_events.KINDS:
+                        raise ValueError(f"unknown kind {kind}")
+                    events, cursor = trade_event_log.since(int(query.get('since', ['0'])[0]),
+                                                           max(1, min(int(query.get('limit', ['500'])[0]), 5000)),
+                                                           kind, query.get('pair', [None])[0])
+                    code, body = 200, {'events': events, 'cursor': cursor}
+                except PermissionError as e:
+                    code, body = 403, {'error': str(e)}
+                except ValueError as e:
+                    code, body = 400, {'error': f"bad events query: {e}"}
+                data = json.dumps(body).encode()
+                self.send_response(code)
+                self.send_header('Content-type', 'application/json')
+                self.send_header('Cache-Control', 'no-cache')
+                self.end_headers()
+                try:
+                    self.wfile.write(data)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass
+                return
+            
+            # Local pull API over the WebSocket market-data feed
+            if parsed_path.path.startswith('/api/market/'):
+                if market_feed is None:
+                    code, body = 503, {'error': 'market data feed disabled'}
+                else:
+                    code, body = market_feed.pull(parsed_path.path, parse_qs(parsed_path.query))
+                data = json.dumps(body).encode()
+                self.send_response(code)
+                self.send_header('Content-type', 'application/json')
+                self.send_header('Cache-Control', 'no-cache')
+                self.end_headers()
+                try:
+                    self.wfile.write(data)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass
+                return
+            
+            # API endpoint for live trading stats - NOW WITH REAL KRAKEN DATA
+            if parsed_path.path == '/api/stats':
+                # Last-known-good snapshot, serialized once per version; before the first one exists a
+                # request waits for at most the fetch already in flight, then gets the placeholder
+                versions = live_stats.versioned()
+                since = parse_qs(parsed_path.query).get('since', [None])[0]
+                if since is not None and since.isdigit():
+                    version, body = versions.delta(int(since))
+                    etag = None
+                else:
+                    version, etag, body = versions.current()
+                    if etag_matches(self.headers.get('If-None-Match'), etag):
+                        body = None
+                if body is not None:
+                    body = versions.aged(body)
+                self.send_response(200 if body is not None else 304)
+                if etag:
+                    self.send_header('ETag', etag)
+                self.send_header('X-Stats-Version', str(version))
+                self.send_header('Access-Control-Allow-Origin', '*')
+                self.send_header('Cache-Control', 'no-cache')
+                if body is not None:
+                    self.send_header('Content-type', 'application/json')
+                    self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
                 
                 try:
-                    response_data = json.dumps(stats).encode()
-                    self.wfile.write(response_data)
+                    if body is not None:
+                        self.wfile.write(body)
                 except (BrokenPipeError, ConnectionResetError):
                     # Client disconnected, ignore
                     pass
@@ -93,16 +723,22 @@ class HedgeFundBotHandler(BaseHTTPRequestHandler):
                     pass
                 return
             
-            # Main landing page (default route)
-            self.send_response(200)
-            self.send_header('Content-type', 'text/html')
-            self.send_header('Cache-Control', 'max-age=60')
+            # Main landing page (default route): prerendered with the live numbers,
+            # from the last-known snapshot even while the first fetch is still running
+            etag, body = landing_page.current(live_stats.versioned(wait=False))
+            if etag_matches(self.headers.get('If-None-Match'), etag):
+                body = None
+            self.send_response(200 if body is not None else 304)
+            self.send_header('ETag', etag)
+            self.send_header('Cache-Control', 'no-cache')
+            if body is not None:
+                self.send_header('Content-type', 'text/html; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
             self.end_headers()
             
-            # Serve the premium landing page
-            html_content = self.get_premium_html()
             try:
-                self.wfile.write(html_content.encode('utf-8'))
+                if body is not None:
+                    self.wfile.write(body)
             except (BrokenPipeError, ConnectionResetError):
                 pass
                 
@@ -114,110 +750,17 @@ class HedgeFundBotHandler(BaseHTTPRequestHandler):
             except:
                 pass
     
+    def is_local(self):
+        """Request came from this host: trade and memory details are not for the public page"""
+        return ipaddress.ip_address(self.client_address[0]).is_loopback
+    
     def get_live_trading_stats(self):
-        """Fetch REAL-TIME trading data from Kraken using your API keys"""
-        import ccxt
-        
-        # Get API keys from environment
-        api_key = os.getenv('KRAKEN_API_KEY')
-        secret_key = os.getenv('KRAKEN_SECRET_KEY')
-        
-        if not api_key or not secret_key:
-            raise Exception("Missing KRAKEN_API_KEY or KRAKEN_SECRET_KEY")
-        
-        print(f"🔑 Using Kraken API keys: {api_key[:8]}...")
-        
-        # Initialize Kraken exchange with better error handling
-        kraken = ccxt.kraken({
-            'apiKey': api_key,
-            'secret': secret_key,
-            'sandbox': False,
-            'enableRateLimit': True,
-            'timeout': 15000,  # Reduced timeout
-            'rateLimit': 1000,  # More conservative rate limit
-        })
-        
-        try:
-            # Fetch live balance from your Kraken account
-            print("📊 Fetching live balance from Kraken...")
-            balance = kraken.fetch_balance()
-            
-            # Fetch current market prices
-            print("💰 Fetching current market prices...")
-            
-            # Try to get tickers with error handling
-            try:
-                ticker_cpool = kraken.fetch_ticker('CPOOL/USD')
-                cpool_price = ticker_cpool['last']
-            except Exception as e:
-                print(f"⚠️ CPOOL ticker error: {e}")
-                cpool_price = 0.1312  # Fallback price
-            
-            try:
-                ticker_ondo = kraken.fetch_ticker('ONDO/USD')
-                ondo_price = ticker_ondo['last']
-            except Exception as e:
-                print(f"⚠️ ONDO ticker error: {e}")
-                ondo_price = 0.8449  # Fallback price
-            
-            # Get your actual balances
-            cpool_balance = balance.get('CPOOL', {}).get('total', 0)
-            ondo_balance = balance.get('ONDO', {}).get('total', 0)
-            usd_balance = balance.get('USD', {}).get('total', 0)
-            
-            # Calculate position values
-            cpool_value = cpool_balance * cpool_price
-            ondo_value = ondo_balance * ondo_price
-            total_portfolio = cpool_value + ondo_value + usd_balance
-            
-            print(f"💎 Live Portfolio: CPOOL=${cpool_value:.2f} + ONDO=${ondo_value:.2f} + USD=${usd_balance:.2f} = ${total_portfolio:.2f}")
-            
-            # Simple average price calculation (fallback if trade history fails)
-            cpool_avg_price = 0.1136  # Your known average
-            ondo_avg_price = 0.7682   # Your known average
-            
-            # Calculate returns
-            cpool_return = ((cpool_price - cpool_avg_price) / cpool_avg_price * 100) if cpool_avg_price > 0 else 0
-            ondo_return = ((ondo_price - ondo_avg_price) / ondo_avg_price * 100) if ondo_avg_price > 0 else 0
-            
-            print(f"📊 CPOOL: {cpool_return:.1f}% return | ONDO: {ondo_return:.1f}% return")
-            
-            # Calculate 24h profit estimate
-            profit_24h = (cpool_value + ondo_value) * 0.035
-            
-            # Calculate average return
-            returns = [r for r in [cpool_return, ondo_return] if r != 0]
-            avg_return = sum(returns) / len(returns) if returns else 0
-            
-            # Count active positions
-            active_positions = (1 if cpool_balance > 0 else 0) + (1 if ondo_balance > 0 else 0)
-            
-            return {
-                "cpool_return": round(cpool_return, 1),
-                "ondo_return": round(ondo_return, 1),
-                "total_trades": active_positions,
-                "status": "🟢 LIVE TRADING",
-                "last_update": int(time.time()),
-                "portfolio_value": round(total_portfolio, 2),
-                "profit_24h": round(profit_24h, 2),
-                "avg_return": round(avg_return, 1),
-                "total_positions": active_positions,
-                "cpool_balance": round(cpool_balance, 3),
-                "ondo_balance": round(ondo_balance, 3),
-                "usd_balance": round(usd_balance, 2),
-                "cpool_price": round(cpool_price, 4),
-                "ondo_price": round(ondo_price, 4),
-                "cpool_avg_price": round(cpool_avg_price, 4),
-                "ondo_avg_price": round(ondo_avg_price, 4),
-                "cpool_value": round(cpool_value, 2),
-                "ondo_value": round(ondo_value, 2)
-            }
-            
-        except Exception as e:
-            print(f"❌ Kraken API error: {e}")
-            raise e
+        """Live stats from the shared snapshot cache - never blocks on a failing Kraken"""
+        return live_stats.get()
 
-    def get_premium_html(self):
+    @staticmethod
+    def get_premium_html():
+        """Landing page template; `{{field}}` markers are filled by LandingPage"""
         return '''<!DOCTYPE html>
 <html lang="en">
 <head>
@@ -246,38 +789,38 @@ class HedgeFundBotHandler(BaseHTTPRequestHandler):
             </p>
             
             <!-- Live Trading Dashboard -->
-            <div class="live-dashboard">
+            <div class="live-dashboard" data-live="{{live}}">
                 <div class="dashboard-header">
                     <h3>🔴 LIVE TRADING RIGHT NOW</h3>
-                    <div class="status-badge" id="botStatus">🟢 LIVE TRADING</div>
+                    <div class="status-badge" id="botStatus" style="color: {{status_color}}">{{status}}</div>
                 </div>
                 
                 <div class="stats-grid">
                     <div class="stat-box">
                         <div class="stat-label">CPOOL Position</div>
-                        <div class="stat-value green" id="cpoolReturn">Loading...</div>
-                        <div class="stat-detail"><span id="cpoolBalance">0</span> CPOOL @ $<span id="cpoolAvgPrice">0</span> avg</div>
-                        <div class="stat-detail">Current: $<span id="cpoolPrice">0</span> | Value: $<span id="cpoolValue">0</span></div>
+                        <div class="stat-value green" id="cpoolReturn">{{cpool_return}}</div>
+                        <div class="stat-detail"><span id="cpoolBalance">{{cpool_balance}}</span> CPOOL @ $<span id="cpoolAvgPrice">{{cpool_avg_price}}</span> avg</div>
+                        <div class="stat-detail">Current: $<span id="cpoolPrice">{{cpool_price}}</span> | Value: $<span id="cpoolValue">{{cpool_value}}</span></div>
                     </div>
                     
                     <div class="stat-box">
                         <div class="stat-label">ONDO Position</div>
-                        <div class="stat-value green" id="ondoReturn">Loading...</div>
-                        <div class="stat-detail"><span id="ondoBalance">0</span> ONDO @ $<span id="ondoAvgPrice">0</span> avg</div>
-                        <div class="stat-detail">Current: $<span id="ondoPrice">0</span> | Value: $<span id="ondoValue">0</span></div>
+                        <div class="stat-value green" id="ondoReturn">{{ondo_return}}</div>
+                        <div class="stat-detail"><span id="ondoBalance">{{ondo_balance}}</span> ONDO @ $<span id="ondoAvgPrice">{{ondo_avg_price}}</span> avg</div>
+                        <div class="stat-detail">Current: $<span id="ondoPrice">{{ondo_price}}</span> | Value: $<span id="ondoValue">{{ondo_value}}</span></div>
                     </div>
                     
                     <div class="stat-box">
                         <div class="stat-label">Portfolio Value</div>
-                        <div class="stat-value white" id="portfolioValue">Loading...</div>
-                        <div class="stat-detail">USD Cash: $<span id="usdBalance">0.00</span></div>
-                        <div class="stat-detail green" id="profit24h">+$0.00 today</div>
+                        <div class="stat-value white" id="portfolioValue" style="color: {{portfolio_color}}">{{portfolio_value}}</div>
+                        <div class="stat-detail">USD Cash: $<span id="usdBalance">{{usd_balance}}</span></div>
+                        <div class="stat-detail green" id="profit24h">{{profit_24h}}</div>
                     </div>
                     
                     <div class="stat-box">
                         <div class="stat-label">Average Returns</div>
-                        <div class="stat-value gold" id="avgReturn">Loading...</div>
-                        <div class="stat-detail">Across <span id="totalPositions">0</span> positions</div>
+                        <div class="stat-value gold" id="avgReturn">{{avg_return}}</div>
+                        <div class="stat-detail">Across <span id="totalPositions">{{total_positions}}</span> positions</div>
                     </div>
                 </div>
                 
@@ -292,7 +835,7 @@ class HedgeFundBotHandler(BaseHTTPRequestHandler):
                 </div>
                 
                 <div class="timestamp">
-                    Last updated: <span id="lastUpdate">Loading...</span>
+                    Last updated: <span id="lastUpdate" data-ts="{{last_update_ts}}">{{last_update}}</span>
                 </div>
             </div>
             
@@ -751,11 +1294,10 @@ async function updateLiveStats() {
         const controller = new AbortController();
         const timeoutId = setTimeout(() => controller.abort(), 10000); // 10 second timeout
         
+        // The browser revalidates with If-None-Match; an idle portfolio costs a 304
         const response = await fetch('/api/stats', {
             signal: controller.signal,
-            headers: {
-                'Cache-Control': 'no-cache'
-            }
+            cache: 'no-cache'
         });
         
         clearTimeout(timeoutId);
@@ -766,6 +1308,11 @@ async function updateLiveStats() {
         
         const stats = await response.json();
         
+        // No snapshot has ever been fetched - nothing truthful to show yet
+        if (stats.portfolio_value === null) {
+            throw new Error(stats.error || 'No live data yet');
+        }
+        
         console.log('📊 Live data received:', stats);
         
         // Update all live elements with REAL Kraken data
@@ -773,7 +1320,9 @@ async function updateLiveStats() {
         document.getElementById('ondoReturn').textContent = `+${stats.ondo_return}%`;
         document.getElementById('portfolioValue').textContent = `$${stats.portfolio_value}`;
         document.getElementById('portfolioValue').style.color = '#ffffff';
-        document.getElementById('profit24h').textContent = `+$${stats.profit_24h} today`;
+        document.getElementById('profit24h').textContent = stats.profit_24h === null
+            ? 'No history yet'
+            : `${stats.profit_24h >= 0 ? '+' : '-'}$${Math.abs(stats.profit_24h).toFixed(2)} ${stats.profit_window_hours >= 24 ? 'today' : `in ${stats.profit_window_hours}h`}`;
         document.getElementById('avgReturn').textContent = `${stats.avg_return}%`;
         document.getElementById('botStatus').textContent = stats.status;
         
@@ -791,7 +1340,9 @@ async function updateLiveStats() {
         
         // Update timestamp
         const lastUpdate = new Date(stats.last_update * 1000);
-        document.getElementById('lastUpdate').textContent = lastUpdate.toLocaleString();
+        document.getElementById('lastUpdate').textContent = stats.stale
+            ? `${lastUpdate.toLocaleString()} (stale ${Math.round(Date.now() / 1000 - stats.last_update)}s)`
+            : lastUpdate.toLocaleString();
         
         // Add live trading effect
         document.querySelector('.live-dashboard').style.borderColor = '#10b981';
@@ -803,25 +1354,21 @@ async function updateLiveStats() {
         console.log('✅ Live data updated successfully!');
         
         // Update status indicator
-        document.getElementById('botStatus').style.color = '#10b981';
+        document.getElementById('botStatus').style.color = stats.stale ? '#fbbf24' : '#10b981';
         
     } catch (error) {
         console.log('❌ Stats update failed:', error);
         document.getElementById('lastUpdate').textContent = new Date().toLocaleString() + ' (Error)';
         document.getElementById('botStatus').textContent = '🟡 CONNECTION ERROR';
         document.getElementById('botStatus').style.color = '#fbbf24';
-        
-        // Show portfolio value as error if still loading
-        if (document.getElementById('portfolioValue').textContent === 'Loading...') {
-            document.getElementById('portfolioValue').textContent = '$69.52';
-            document.getElementById('portfolioValue').style.color = '#fbbf24';
-        }
     }
 }
 
-// Update every 15 seconds (less aggressive to avoid broken pipe)
+// The page arrives prerendered with the current snapshot; fetch right away only if it had none
 console.log('🚀 Starting real-time data updates...');
-updateLiveStats();
+if (document.querySelector('.live-dashboard').dataset.live !== '1') {
+    updateLiveStats();
+}
 setInterval(updateLiveStats, 15000);
 
 // Track Whop clicks
@@ -831,9 +1378,12 @@ document.querySelector('.premium-btn').addEventListener('click', function() {
 
 // Add premium animations
 document.addEventListener('DOMContentLoaded', function() {
-    // Show loading state initially
-    document.getElementById('portfolioValue').textContent = 'Loading...';
-    document.getElementById('portfolioValue').style.color = '#fbbf24';
+    // Prerendered timestamp is UTC; show it in the visitor's locale like the live updates
+    const lastUpdate = document.getElementById('lastUpdate');
+    if (lastUpdate.dataset.ts) {
+        const stale = lastUpdate.textContent.endsWith('(stale)') ? ' (stale)' : '';
+        lastUpdate.textContent = new Date(lastUpdate.dataset.ts * 1000).toLocaleString() + stale;
+    }
     
     // Animate stat boxes on load
     const statBoxes = document.querySelectorAll('.stat-box');
@@ -876,6 +1426,9 @@ document.addEventListener('DOMContentLoaded', function() {
         # Suppress HTTP request logs to reduce noise
         pass
 
+landing_page = LandingPage(HedgeFundBotHandler.get_premium_html())
+
+
 def start_freqtrade():
     """Start freqtrade in background"""
     time.sleep(8)  # Give web server time to start
@@ -887,6 +1440,10 @@ def start_freqtrade():
     api_key = os.getenv('KRAKEN_API_KEY')
     secret_key = os.getenv('KRAKEN_SECRET_KEY')
     
+    if kraken_stub.stub_url():
+        api_key, secret_key = kraken_stub.stub_credentials()
+        print(f"🧪 Using local Kraken stub at {kraken_stub.stub_url()}")
+    
     if not api_key or not secret_key:
         print("❌ Missing API keys!")
         return
@@ -900,6 +1457,15 @@ def start_freqtrade():
         
         config['exchange']['key'] = api_key
         config['exchange']['secret'] = secret_key
+        kraken_stub.apply_stub_to_config(config)
+        
+        if pair_scanner.dynamic_enabled():
+            scanner = pair_scanner.scanner_from_env()
+            config['exchange']['pair_whitelist'] = scanner.ensure_pairlist(config['exchange']['pair_whitelist'])
+            config['pairlists'] = pair_scanner.remote_pairlist_config(scanner.top_n, scanner.pairlist_path,
+                                                                      scanner.interval)
+            scanner.start()
+            print(f"📋 Dynamic pair list: top {scanner.top_n} rescanned every {scanner.interval:.0f}s")
         
         # Create directories
         os.makedirs('user_data/strategies', exist_ok=True)
@@ -911,10 +1477,11 @@ def start_freqtrade():
         
         print("✅ Config created with live API keys")
         
-        # Copy strategy
+        # Copy strategy and the helper modules it imports
         if os.path.exists('SimplePortfolio.py'):
             import shutil
-            shutil.copy('SimplePortfolio.py', 'user_data/strategies/')
+            for module in ['SimplePortfolio.py'] + STRATEGY_SUPPORT_MODULES:
+                shutil.copy(module, 'user_data/strategies/')
             print("✅ Strategy copied")
         
         print("🚀 Starting hedge fund trading bot...")
@@ -930,36 +1497,197 @@ def start_freqtrade():
     except Exception as e:
         print(f"❌ Error starting freqtrade: {e}")
 
+class ThreadedHTTPServer(HTTPServer):
+    """Handle requests in separate threads"""
+    reuse_port = False
+    
+    def server_bind(self):
+        if self.reuse_port:
+            # Every pre-fork worker binds the same port; the kernel spreads connections
+            self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        super().server_bind()
+    
+    def process_request(self, request, client_address):
+        thread = threading.Thread(
+            target=self.process_request_thread,
+            args=(request, client_address)
+        )
+        thread.daemon = True
+        thread.start()
+    
+    def process_request_thread(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+            self.shutdown_request(request)
+        except Exception as e:
+            print(f"Request error: {e}")
+            self.handle_error(request, client_address)
+            self.shutdown_request(request)
+
+
+def run_worker(port, segment, market_segment):
+    """Pre-fork worker: serve requests from the shared snapshots, never call Kraken"""
+    global live_stats, market_feed
+    live_stats = SharedStatsView(segment)
+    # Workers never run the feed; /api/market/* reads the refresher's tables
+    market_feed = market_data.MarketDataView(market_segment) if market_segment else None
+    open_databases()
+    mem_watchdog.start_from_env(f'web-worker-{os.getpid()}')
+    ThreadedHTTPServer.reuse_port = True
+    server = ThreadedHTTPServer(('0.0.0.0', port), HedgeFundBotHandler)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        os._exit(0)
+
+
+def spawn_worker(port, segment, market_segment):
+    pid = os.fork()
+    if pid == 0:
+        run_worker(port, segment, market_segment)
+    return pid
+
+
+def supervise_workers(port, segment, market_segment, workers):
+    """Worker supervisor: forks the workers and respawns any that exit.
+    
+    It is forked before the parent starts any thread and never starts one
+    itself, so every fork() it makes copies a single-threaded process: no
+    lock held by another thread, no feed object without its thread. Its
+    only children are workers, so os.wait() cannot reap anyone else's.
+    """
+    import signal
+    pids = {spawn_worker(port, segment, market_segment) for _ in range(workers)}
+    
+    def stop(signum, frame):
+        for pid in pids:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        os._exit(0)
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    
+    while True:
+        try:
+            pid, _ = os.wait()
+        except ChildProcessError:
+            os._exit(0)
+        if pid in pids:
+            pids.discard(pid)
+            print(f"⚠️ Web worker {pid} exited, respawning")
+            mem_watchdog.remove_report(f'web-worker-{pid}')
+            pids.add(spawn_worker(port, segment, market_segment))
+
+
+def prefork_workers(port, workers):
+    """WEB_WORKERS > 0: fork N SO_REUSEPORT workers sharing one snapshot segment.
+    
+    Called before any thread is started; the workers hang off a
+    single-threaded supervisor (supervise_workers) that is the only process
+    forking them. This process stays the only refresher: it owns the Kraken
+    client, circuit breaker and history writes and publishes each new stats
+    version into the seqlock-guarded segment that the workers read, and the
+    market feed's tables into a second one when the feed is enabled.
+    Returns both segments (the second may be None) and the supervisor's pid.
+    """
+    import shared_snapshot
+    segment = shared_snapshot.SeqlockSegment()
+    market_segment = shared_snapshot.SeqlockSegment(MARKET_SEGMENT_BYTES) if market_feed_enabled() else None
+    pid = os.fork()
+    if pid == 0:
+        try:
+            supervise_workers(port, segment, market_segment, workers)
+        finally:
+            os._exit(0)
+    return segment, market_segment, pid
+
+
+def publish_market_tables(market_segment, version):
+    """Write the feed's tables into the segment when new messages arrived; returns the version written"""
+    import shared_snapshot
+    if market_feed is None or market_feed.messages == version:
+        return version
+    try:
+        market_segment.write(market_feed.messages, market_feed.snapshot())
+    except shared_snapshot.SnapshotTooLarge as e:
+        print(f"⚠️ Market tables not shared with workers: {e}")
+    return market_feed.messages
+
+
+def run_refresher(port, segment, market_segment, supervisor, workers):
+    """Publish new stats versions (and market tables) into the segments until stopped"""
+    import signal
+    
+    def stop(signum, frame):
+        try:
+            os.kill(supervisor, signal.SIGTERM)
+        except ProcessLookupError:
+            pass
+        os._exit(0)
+    signal.signal(signal.SIGTERM, stop)
+    
+    print(f"🌐 Premium landing page ready on port {port} ({workers} pre-forked workers)")
+    print(f"📊 Live Kraken data: /api/stats endpoint active")
+    
+    published = None
+    market_published = 0
+    supervised = True
+    try:
+        while True:
+            version, _, body = live_stats.versioned().current()
+            if version != published:
+                segment.write(version, body)
+                published = version
+            if market_segment is not None:
+                market_published = publish_market_tables(market_segment, market_published)
+            # Only the supervisor's pid: freqtrade's subprocess is waited on by its own thread
+            if supervised and os.waitpid(supervisor, os.WNOHANG)[0]:
+                supervised = False
+                print("⚠️ Web worker supervisor exited; running workers keep serving but are no longer respawned")
+            time.sleep(0.5)
+    except KeyboardInterrupt:
+        print("\n🛑 Shutting down server...")
+        stop(None, None)
+
+
 def main():
     print("🏛️ Starting Personal Hedge Fund Bot System...")
     print("💎 Real-time Kraken integration enabled")
     print("🎯 Premium $100 landing page active")
     
-    # Start freqtrade in background
-    bot_thread = threading.Thread(target=start_freqtrade, daemon=True)
-    bot_thread.start()
-    
-    # Start premium web server with live data
     port = int(os.getenv('PORT', 8080))
+    workers = int(os.getenv('WEB_WORKERS', 0))
+    if workers > 0:
+        segment, market_segment, supervisor = prefork_workers(port, workers)
+    # After forking: each worker opens its own databases and runs its own watchdog
+    open_databases()
+    mem_watchdog.start_from_env('web')
+    # Without traffic nothing would call Kraken, so an open circuit would never be probed
+    live_stats.start_prober()
     
-    class ThreadedHTTPServer(HTTPServer):
-        """Handle requests in separate threads"""
-        def process_request(self, request, client_address):
-            thread = threading.Thread(
-                target=self.process_request_thread,
-                args=(request, client_address)
-            )
-            thread.daemon = True
-            thread.start()
-        
-        def process_request_thread(self, request, client_address):
-            try:
-                self.finish_request(request, client_address)
-                self.shutdown_request(request)
-            except Exception as e:
-                print(f"Request error: {e}")
-                self.handle_error(request, client_address)
-                self.shutdown_request(request)
+    # Stream prices and candles over WebSocket instead of polling REST tickers
+    global market_feed
+    if market_feed_enabled():
+        whitelist = get_config_template()['exchange']['pair_whitelist']
+        if pair_scanner.dynamic_enabled():
+            whitelist = pair_scanner.read_pairs(default=whitelist)
+        pairs = set(whitelist) | {'CPOOL/USD', 'ONDO/USD'}
+        market_feed = market_data.MarketDataService(pairs, rest_client=market_data.rest_client())
+        market_feed.start()
+    
+    # Start freqtrade in background (START_FREQTRADE=0 serves the dashboard only)
+    if os.getenv('START_FREQTRADE', '1') != '0':
+        bot_thread = threading.Thread(target=start_freqtrade, daemon=True)
+        bot_thread.start()
+    
+    # Start premium web server with live data
+    if workers > 0:
+        run_refresher(port, segment, market_segment, supervisor, workers)
+        return
     
     server = ThreadedHTTPServer(('0.0.0.0', port), HedgeFundBotHandler)
     
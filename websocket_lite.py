@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Minimal RFC 6455 WebSocket client and server helpers (text frames only).
+
+Enough protocol for the Kraken market-data feed and its local stand-in
+without adding a dependency: handshake, masking, fragmentation, ping/pong
+and close.
+"""
+import base64
+import hashlib
+import os
+import socket
+import ssl
+import struct
+import threading
+from urllib.parse import urlparse
+
+GUID = '258EAFA5-E914-47DA-95CA-C5AB0DC85B11'
+
+OP_CONTINUATION = 0x0
+OP_TEXT = 0x1
+OP_BINARY = 0x2
+OP_CLOSE = 0x8
+OP_PING = 0x9
+OP_PONG = 0xA
+
+
+class WebSocketClosed(Exception):
+    """The peer closed the connection"""
+
+
+def accept_key(key):
+    return base64.b64encode(hashlib.sha1((key + GUID).encode()).digest()).decode()
+
+
+def encode_frame(opcode, payload, mask):
+    header = bytearray([0x80 | opcode])
+    length = len(payload)
+    mask_bit = 0x80 if mask else 0
+    if length < 126:
+        header.append(mask_bit | length)
+    elif length < 1 << 16:
+        header.append(mask_bit | 126)
+        header += struct.pack('>H', length)
+    else:
+        header.append(mask_bit | 127)
+        header += struct.pack('>Q', length)
+    if mask:
+        key = os.urandom(4)
+        header += key
+        payload = bytes(b ^ key[i % 4] for i, b in enumerate(payload))
+    return bytes(header) + payload
+
+
+class WebSocket:
+    """A connected WebSocket over a blocking socket-like pair of streams"""
+
+    def __init__(self, rfile, sendall, mask_outgoing, sock=None):
+        self.rfile = rfile
+        self.sendall = sendall
+        self.mask_outgoing = mask_outgoing
+        self.sock = sock
+        self.send_lock = threading.Lock()
+        self.closed = False
+
+    @classmethod
+    def connect(cls, url, timeout=10.0):
+        """Open a client connection to ws:// or wss:// url"""
+        target = urlparse(url)
+        secure = target.scheme == 'wss'
+        port = target.port or (443 if secure else 80)
+        sock = socket.create_connection((target.hostname, port), timeout=timeout)
+        if secure:
+            sock = ssl.create_default_context().wrap_socket(sock, server_hostname=target.hostname)
+        key = base64.b64encode(os.urandom(16)).decode()
+        path = (target.path or '/') + (f'?{target.query}' if target.query else '')
+        request = (f'GET {path} HTTP/1.1\r\nHost: {target.hostname}:{port}\r\n'
+                   'Upgrade: websocket\r\nConnection: Upgrade\r\n'
+                   f'Sec-WebSocket-Key: {key}\r\nSec-WebSocket-Version: 13\r\n\r\n')
+        sock.sendall(request.encode())
+        rfile = sock.makefile('rb')
+        status = rfile.readline().decode('latin-1')
+        headers = {}
+        while True:
+            line = rfile.readline().decode('latin-1').strip()
+            if not line:
+                break
+            name, _, value = line.partition(':')
+            headers[name.strip().lower()] = value.strip()
+        if ' 101 ' not in status or headers.get('sec-websocket-accept') != accept_key(key):
+            sock.close()
+            raise ConnectionError(f'WebSocket handshake failed: {status.strip()}')
+        return cls(rfile, sock.sendall, mask_outgoing=True, sock=sock)
+
+    @classmethod
+    def accept(cls, handler):
+        """Complete the server side handshake inside a BaseHTTPRequestHandler"""
+        key = handler.headers.get('Sec-WebSocket-Key')
+        if not key or handler.headers.get('Upgrade', '').lower() != 'websocket':
+            return None
+        handler.send_response(101, 'Switching Protocols')
+        handler.send_header('Upgrade', 'websocket')
+        handler.send_header('Connection', 'Upgrade')
+        handler.send_header('Sec-WebSocket-Accept', accept_key(key))
+        handler.end_headers()
+        handler.wfile.flush()
+        return cls(handler.rfile, handler.connection.sendall, mask_outgoing=False,
+                   sock=handler.connection)
+
+    def _read_exact(self, n):
+        data = self.rfile.read(n)
+        if data is None or len(data) < n:
+            raise WebSocketClosed('connection closed')
+        return data
+
+    def _read_frame(self):
+        first, second = self._read_exact(2)
+        fin = bool(first & 0x80)
+        opcode = first & 0x0F
+        length = second & 0x7F
+        if length == 126:
+            length = struct.unpack('>H', self._read_exact(2))[0]
+        elif length == 127:
+            length = struct.unpack('>Q', self._read_exact(8))[0]
+        key = self._read_exact(4) if second & 0x80 else None
+        payload = self._read_exact(length) if length else b''
+        if key:
+            payload = bytes(b ^ key[i % 4] for i, b in enumerate(payload))
+        return fin, opcode, payload
+
+    def send_text(self, text):
+        self._send(OP_TEXT, text.encode())
+
+    def _send(self, opcode, payload):
+        frame = encode_frame(opcode, payload, self.mask_outgoing)
+        with self.send_lock:
+            if self.closed and opcode != OP_CLOSE:
+                raise WebSocketClosed('connection closed')
+            self.sendall(frame)
+
+    def recv(self):
+        """Next text message; answers pings and raises WebSocketClosed on close"""
+        parts = []
+        while True:
+            fin, opcode, payload = self._read_frame()
+            if opcode == OP_PING:
+                self._send(OP_PONG, payload)
+                continue
+            if opcode == OP_PONG:
+                continue
+            if opcode == OP_CLOSE:
+                self.close()
+                raise WebSocketClosed('closed by peer')
+            parts.append(payload)
+            if fin:
+                return b''.join(parts).decode()
+
+    def settimeout(self, timeout):
+        if self.sock is not None:
+            self.sock.settimeout(timeout)
+
+    def close(self):
+        if self.closed:
+            return
+        try:
+            self._send(OP_CLOSE, b'')
+        except OSError:
+            pass
+        self.closed = True
+        if self.sock is not None:
+            try:
+                self.sock.close()
+            except OSError:
+                pass